@@ -20,13 +20,16 @@ from app.models.course import (
 )
 from app.models.course_version import CourseVersion, CourseContent
 from app.models.module import Module
-from app.models.lesson import Lesson
+from app.models.lesson import Lesson, LessonQuiz, QuizAttempt
 from app.models.enrollment import CourseEnrollment
 from app.models.purchase import CourseLicense
 from app.models.review import CourseReview
 from app.models.scoped_models import SuperAdminScopedModel, SchoolScopedModel
-from app.models.progress import LessonProgress, UserProgress
+from app.models.progress import LessonProgress, UserProgress, TimeSpentFlush
 from app.models.purchase import CoursePurchase
+from app.models.learning_event import LearningEvent, EventCompactionState
+from app.models.certificate import CertificateJob
+from app.models.token import RevokedToken
 
 
 # this is the Alembic Config object, which provides
@@ -0,0 +1,102 @@
+"""add license seat counter
+
+Revision ID: 4e2a9c71d5b3
+Revises: 282a7ba7357b
+Create Date: 2025-04-01 09:00:00.000000+00:00
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "4e2a9c71d5b3"
+down_revision: Union[str, None] = "282a7ba7357b"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "course_licenses",
+        sa.Column(
+            "seats_used",
+            sa.Integer(),
+            server_default=sa.text("0"),
+            nullable=False,
+            comment="Number of enrollments currently holding a seat on this license",
+        ),
+    )
+    op.add_column(
+        "course_enrollments",
+        sa.Column("license_id", postgresql.UUID(as_uuid=True), nullable=True),
+    )
+    op.create_foreign_key(
+        "course_enrollments_license_id_fkey",
+        "course_enrollments",
+        "course_licenses",
+        ["license_id"],
+        ["id"],
+        ondelete="SET NULL",
+    )
+    op.create_index(
+        "idx_course_enrollments_license_id", "course_enrollments", ["license_id"]
+    )
+
+    # Attach existing active B2B enrollments to the most recent license of their
+    # school; only these are counted in seats_used below
+    op.execute(
+        """
+        UPDATE course_enrollments ce
+        SET license_id = (
+            SELECT cl.id
+            FROM course_licenses cl
+            JOIN student_profiles sp ON sp.school_id = cl.school_id
+            WHERE sp.id = ce.student_id AND cl.course_id = ce.course_id
+            ORDER BY cl.valid_from DESC
+            LIMIT 1
+        )
+        WHERE ce.student_id IS NOT NULL AND ce.is_active
+        """
+    )
+    # Backfill the counter from the enrollments that now hold a seat
+    op.execute(
+        """
+        UPDATE course_licenses cl
+        SET seats_used = sub.seats
+        FROM (
+            SELECT license_id, count(*) AS seats
+            FROM course_enrollments
+            WHERE license_id IS NOT NULL AND is_active
+            GROUP BY license_id
+        ) sub
+        WHERE sub.license_id = cl.id
+        """
+    )
+    # Oversubscribed licenses predate enforcement; raise the cap instead of failing
+    op.execute(
+        """
+        UPDATE course_licenses
+        SET max_students = seats_used
+        WHERE max_students IS NOT NULL AND seats_used > max_students
+        """
+    )
+    op.create_check_constraint(
+        "license_seats_range_check",
+        "course_licenses",
+        "seats_used >= 0 AND (max_students IS NULL OR seats_used <= max_students)",
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint("license_seats_range_check", "course_licenses", type_="check")
+    op.drop_index("idx_course_enrollments_license_id", table_name="course_enrollments")
+    op.drop_constraint(
+        "course_enrollments_license_id_fkey", "course_enrollments", type_="foreignkey"
+    )
+    op.drop_column("course_enrollments", "license_id")
+    op.drop_column("course_licenses", "seats_used")
@@ -0,0 +1,30 @@
+"""add user progress enrollment index
+
+Revision ID: 8b1d3f6e2a47
+Revises: 4e2a9c71d5b3
+Create Date: 2025-04-02 10:15:00.000000+00:00
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "8b1d3f6e2a47"
+down_revision: Union[str, None] = "4e2a9c71d5b3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "idx_user_progress_enrollment_id",
+        "user_progress",
+        ["enrollment_id", "id"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("idx_user_progress_enrollment_id", table_name="user_progress")
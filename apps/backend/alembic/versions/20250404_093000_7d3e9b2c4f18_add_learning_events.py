@@ -0,0 +1,106 @@
+"""add learning events
+
+Revision ID: 7d3e9b2c4f18
+Revises: c5f0a8e3b912
+Create Date: 2025-04-04 09:30:00.000000+00:00
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "7d3e9b2c4f18"
+down_revision: Union[str, None] = "c5f0a8e3b912"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "learning_events",
+        sa.Column("id", sa.BigInteger(), sa.Identity(always=True), nullable=False),
+        sa.Column("enrollment_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("lesson_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("event_type", sa.String(length=20), nullable=False),
+        sa.Column(
+            "progress",
+            sa.Float(),
+            nullable=True,
+            comment="Lesson progress between 0.0 and 1.0 reported with the event",
+        ),
+        sa.Column(
+            "score",
+            sa.Float(),
+            nullable=True,
+            comment="Quiz score between 0.0 and 1.0 for quiz_submitted events",
+        ),
+        sa.Column(
+            "time_spent_seconds", sa.Integer(), server_default=sa.text("0"), nullable=False
+        ),
+        sa.Column("payload", postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+        sa.Column("occurred_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column(
+            "recorded_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.CheckConstraint(
+            "event_type IN ('started', 'progressed', 'completed', 'quiz_submitted')",
+            name="valid_learning_event_type_check",
+        ),
+        sa.ForeignKeyConstraint(
+            ["enrollment_id"], ["course_enrollments.id"], ondelete="CASCADE"
+        ),
+        sa.ForeignKeyConstraint(["lesson_id"], ["lessons.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "idx_learning_events_enrollment", "learning_events", ["enrollment_id", "id"]
+    )
+
+    op.create_table(
+        "event_compaction_state",
+        sa.Column("name", sa.String(length=50), nullable=False),
+        sa.Column(
+            "high_water_mark", sa.BigInteger(), server_default=sa.text("0"), nullable=False
+        ),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("name"),
+    )
+    op.execute("INSERT INTO event_compaction_state (name) VALUES ('user_progress')")
+
+    # Keep the most recently touched row where duplicates slipped in
+    op.execute(
+        """
+        DELETE FROM user_progress up
+        USING user_progress dup
+        WHERE up.enrollment_id = dup.enrollment_id
+          AND up.content_type = dup.content_type
+          AND up.content_id = dup.content_id
+          AND (up.updated_at, up.id) < (dup.updated_at, dup.id)
+        """
+    )
+    op.create_index(
+        "uq_user_progress_enrollment_content",
+        "user_progress",
+        ["enrollment_id", "content_type", "content_id"],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("uq_user_progress_enrollment_content", table_name="user_progress")
+    op.drop_table("event_compaction_state")
+    op.drop_index("idx_learning_events_enrollment", table_name="learning_events")
+    op.drop_table("learning_events")
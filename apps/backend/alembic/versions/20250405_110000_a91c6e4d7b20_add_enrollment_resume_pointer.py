@@ -0,0 +1,92 @@
+"""add enrollment resume pointer
+
+Revision ID: a91c6e4d7b20
+Revises: 7d3e9b2c4f18
+Create Date: 2025-04-05 11:00:00.000000+00:00
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "a91c6e4d7b20"
+down_revision: Union[str, None] = "7d3e9b2c4f18"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "course_enrollments",
+        sa.Column("resume_lesson_id", postgresql.UUID(as_uuid=True), nullable=True),
+    )
+    op.add_column(
+        "course_enrollments",
+        sa.Column(
+            "resume_position",
+            sa.String(length=100),
+            nullable=True,
+            comment="Player position within the resume lesson (e.g. video timestamp, page)",
+        ),
+    )
+    op.add_column(
+        "course_enrollments",
+        sa.Column("resume_updated_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.create_foreign_key(
+        "course_enrollments_resume_lesson_id_fkey",
+        "course_enrollments",
+        "lessons",
+        ["resume_lesson_id"],
+        ["id"],
+        ondelete="SET NULL",
+    )
+
+    # Seed the pointer from the most recently touched lesson of each enrollment
+    op.execute(
+        """
+        UPDATE course_enrollments ce
+        SET resume_lesson_id = latest.content_id,
+            resume_updated_at = latest.last_interaction
+        FROM (
+            SELECT DISTINCT ON (up.enrollment_id)
+                up.enrollment_id, up.content_id, up.last_interaction
+            FROM user_progress up
+            JOIN lessons l ON l.id = up.content_id
+            WHERE up.content_type = 'lesson' AND up.last_interaction IS NOT NULL
+            ORDER BY up.enrollment_id, up.last_interaction DESC
+        ) latest
+        WHERE latest.enrollment_id = ce.id
+        """
+    )
+
+    op.create_index(
+        "idx_course_enrollments_student_resume",
+        "course_enrollments",
+        ["student_id", sa.text("last_activity_at DESC NULLS LAST")],
+        postgresql_where=sa.text("status IN ('enrolled', 'in_progress')"),
+    )
+    op.create_index(
+        "idx_course_enrollments_individual_resume",
+        "course_enrollments",
+        ["individual_user_id", sa.text("last_activity_at DESC NULLS LAST")],
+        postgresql_where=sa.text("status IN ('enrolled', 'in_progress')"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "idx_course_enrollments_individual_resume", table_name="course_enrollments"
+    )
+    op.drop_index("idx_course_enrollments_student_resume", table_name="course_enrollments")
+    op.drop_constraint(
+        "course_enrollments_resume_lesson_id_fkey", "course_enrollments", type_="foreignkey"
+    )
+    op.drop_column("course_enrollments", "resume_updated_at")
+    op.drop_column("course_enrollments", "resume_position")
+    op.drop_column("course_enrollments", "resume_lesson_id")
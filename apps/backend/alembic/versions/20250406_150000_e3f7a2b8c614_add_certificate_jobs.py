@@ -0,0 +1,76 @@
+"""add certificate jobs
+
+Revision ID: e3f7a2b8c614
+Revises: a91c6e4d7b20
+Create Date: 2025-04-06 15:00:00.000000+00:00
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e3f7a2b8c614"
+down_revision: Union[str, None] = "a91c6e4d7b20"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "certificate_jobs",
+        sa.Column(
+            "id",
+            postgresql.UUID(as_uuid=True),
+            server_default=sa.text("gen_random_uuid()"),
+            nullable=False,
+        ),
+        sa.Column("enrollment_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column(
+            "status", sa.String(length=20), server_default=sa.text("'pending'"), nullable=False
+        ),
+        sa.Column("attempts", sa.Integer(), server_default=sa.text("0"), nullable=False),
+        sa.Column("last_error", sa.Text(), nullable=True),
+        sa.Column("certificate_url", sa.String(length=255), nullable=True),
+        sa.Column("started_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("completed_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column("deleted_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("is_deleted", sa.Boolean(), nullable=False),
+        sa.Column("is_active", sa.Boolean(), nullable=False),
+        sa.CheckConstraint(
+            "status IN ('pending', 'processing', 'completed', 'failed')",
+            name="valid_certificate_job_status_check",
+        ),
+        sa.ForeignKeyConstraint(
+            ["enrollment_id"], ["course_enrollments.id"], ondelete="CASCADE"
+        ),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("enrollment_id"),
+    )
+    op.create_index(
+        "idx_certificate_jobs_queue",
+        "certificate_jobs",
+        ["created_at"],
+        postgresql_where=sa.text("status IN ('pending', 'processing')"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("idx_certificate_jobs_queue", table_name="certificate_jobs")
+    op.drop_table("certificate_jobs")
@@ -0,0 +1,95 @@
+"""add quiz attempts
+
+Revision ID: 5b8d2f1e9a37
+Revises: e3f7a2b8c614
+Create Date: 2025-04-07 10:00:00.000000+00:00
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "5b8d2f1e9a37"
+down_revision: Union[str, None] = "e3f7a2b8c614"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "quiz_attempts",
+        sa.Column(
+            "id",
+            postgresql.UUID(as_uuid=True),
+            server_default=sa.text("gen_random_uuid()"),
+            nullable=False,
+        ),
+        sa.Column("quiz_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("enrollment_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("attempt_number", sa.Integer(), nullable=False),
+        sa.Column(
+            "answers",
+            postgresql.JSONB(astext_type=sa.Text()),
+            nullable=False,
+            comment="One entry per question: selected option index, list of indexes, or null",
+        ),
+        sa.Column(
+            "score",
+            sa.Float(),
+            nullable=False,
+            comment="Weighted share of questions answered correctly (0.0-1.0)",
+        ),
+        sa.Column("correct_count", sa.Integer(), nullable=False),
+        sa.Column("passed", sa.Boolean(), nullable=False),
+        sa.Column(
+            "submitted_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column(
+            "graded_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column("deleted_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("is_deleted", sa.Boolean(), nullable=False),
+        sa.Column("is_active", sa.Boolean(), nullable=False),
+        sa.CheckConstraint("attempt_number > 0", name="attempt_number_positive_check"),
+        sa.CheckConstraint(
+            "score >= 0.0 AND score <= 1.0", name="quiz_score_range_check"
+        ),
+        sa.ForeignKeyConstraint(
+            ["enrollment_id"], ["course_enrollments.id"], ondelete="CASCADE"
+        ),
+        sa.ForeignKeyConstraint(["quiz_id"], ["lesson_quizzes.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint(
+            "quiz_id",
+            "enrollment_id",
+            "attempt_number",
+            name="uq_quiz_attempts_quiz_enrollment_number",
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("quiz_attempts")
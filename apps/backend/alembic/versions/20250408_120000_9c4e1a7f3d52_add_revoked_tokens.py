@@ -0,0 +1,45 @@
+"""add revoked tokens
+
+Revision ID: 9c4e1a7f3d52
+Revises: 5b8d2f1e9a37
+Create Date: 2025-04-08 12:00:00.000000+00:00
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "9c4e1a7f3d52"
+down_revision: Union[str, None] = "5b8d2f1e9a37"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "revoked_tokens",
+        sa.Column("jti", sa.String(length=64), nullable=False),
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column(
+            "kind", sa.String(length=20), nullable=False, comment="access, refresh or family"
+        ),
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column(
+            "revoked_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("jti"),
+    )
+    op.create_index("idx_revoked_tokens_expires_at", "revoked_tokens", ["expires_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("idx_revoked_tokens_expires_at", table_name="revoked_tokens")
+    op.drop_table("revoked_tokens")
@@ -0,0 +1,73 @@
+"""track learning event transactions
+
+Revision ID: f2b6d4a8c1e5
+Revises: 9c4e1a7f3d52
+Create Date: 2025-04-09 09:00:00.000000+00:00
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "f2b6d4a8c1e5"
+down_revision: Union[str, None] = "9c4e1a7f3d52"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "learning_events",
+        sa.Column(
+            "xact_id",
+            sa.BigInteger(),
+            nullable=True,
+            comment="Inserting transaction; NULL for events compacted before it was recorded",
+        ),
+    )
+    # Events not yet compacted are attributed to this migration's transaction,
+    # and the mark (now a transaction id) is set just below it; events
+    # already compacted keep a NULL xact_id and are never picked up again
+    op.execute(
+        """
+        UPDATE learning_events
+        SET xact_id = (pg_current_xact_id()::text)::bigint
+        WHERE id > (
+            SELECT high_water_mark FROM event_compaction_state WHERE name = 'user_progress'
+        )
+        """
+    )
+    op.execute(
+        """
+        UPDATE event_compaction_state
+        SET high_water_mark = (pg_current_xact_id()::text)::bigint - 1
+        WHERE name = 'user_progress'
+        """
+    )
+    op.alter_column(
+        "learning_events",
+        "xact_id",
+        server_default=sa.text("(pg_current_xact_id()::text)::bigint"),
+    )
+    op.create_index("idx_learning_events_xact_id", "learning_events", ["xact_id"])
+
+
+def downgrade() -> None:
+    # Back to an event id mark: the last event of the folded transactions
+    op.execute(
+        """
+        UPDATE event_compaction_state s
+        SET high_water_mark = coalesce((
+            SELECT max(e.id)
+            FROM learning_events e
+            WHERE e.xact_id IS NULL OR e.xact_id <= s.high_water_mark
+        ), 0)
+        WHERE s.name = 'user_progress'
+        """
+    )
+    op.drop_index("idx_learning_events_xact_id", table_name="learning_events")
+    op.drop_column("learning_events", "xact_id")
@@ -2,29 +2,34 @@
 
 from typing import Annotated, List, Callable
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
 
+from app.db.routing import replica_set
 from app.db.session import get_db
-from app.models.user import User, UserRole
-from app.models.school import School
+from app.models.user import UserRole
 from app.security.authentication import AuthService
-from app.security.password import get_password_hash
+from app.security.principal import Principal, SchoolRef
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/v1/auth/login")
 
 async def get_current_user(
+    request: Request,
     token: Annotated[str, Depends(oauth2_scheme)],
     db: Annotated[AsyncSession, Depends(get_db)]
-) -> User:
-    """Get current authenticated user."""
-    return await AuthService.get_current_user(db, token)
+) -> Principal:
+    """Get the current authenticated principal (cached, not a `User` row)."""
+    principal = await AuthService.get_current_user(db, token)
+    # Picked up by the audit log in RequestContextMiddleware
+    request.state.current_user = principal
+    # Users who just wrote read from the primary for a while
+    await replica_set.bind_user(principal.id)
+    return principal
 
 async def get_current_active_user(
-    current_user: Annotated[User, Depends(get_current_user)]
-) -> User:
+    current_user: Annotated[Principal, Depends(get_current_user)]
+) -> Principal:
     """Get current active user."""
     if not current_user.is_active:
         raise HTTPException(
@@ -34,8 +39,8 @@ async def get_current_active_user(
     return current_user
 
 async def get_current_superuser(
-    current_user: Annotated[User, Depends(get_current_user)]
-) -> User:
+    current_user: Annotated[Principal, Depends(get_current_user)]
+) -> Principal:
     """Get current superuser."""
     if not current_user.is_superuser:
         raise HTTPException(
@@ -45,8 +50,8 @@ async def get_current_superuser(
     return current_user
 
 async def get_current_active_superuser(
-    current_user: Annotated[User, Depends(get_current_active_user)]
-) -> User:
+    current_user: Annotated[Principal, Depends(get_current_active_user)]
+) -> Principal:
     """Get current active superuser."""
     if not current_user.role == UserRole.SUPER_ADMIN:
         raise HTTPException(
@@ -56,17 +61,16 @@ async def get_current_active_superuser(
     return current_user
 
 async def get_current_school(
-    current_user: Annotated[User, Depends(get_current_active_user)],
-    db: Annotated[AsyncSession, Depends(get_db)]
-) -> School:
-    """Get current user's school."""
+    current_user: Annotated[Principal, Depends(get_current_active_user)]
+) -> SchoolRef:
+    """Get current user's school, from the cached principal."""
     if not current_user.school_id:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="User is not associated with any school"
         )
     
-    school = await db.scalar(select(School).where(School.id == current_user.school_id))
+    school = current_user.school
     if not school:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -77,8 +81,8 @@ async def get_current_school(
 def check_permissions(allowed_roles: List[UserRole]) -> Callable:
     """Create a dependency that checks if user has required permissions."""
     async def check_user_permissions(
-        current_user: Annotated[User, Depends(get_current_active_user)]
-    ) -> User:
+        current_user: Annotated[Principal, Depends(get_current_active_user)]
+    ) -> Principal:
         if current_user.role not in allowed_roles:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
@@ -0,0 +1,78 @@
+"""JSON responses.
+
+`ORJSONResponse` is the application's default response class: it renders
+with orjson when installed and falls back to the stdlib encoder otherwise.
+
+Returning a schema instance through `response_model` makes FastAPI
+validate the data twice (once in the endpoint, once more against the
+response model after dumping it to a dict) and then encode it with the
+json module. Heavy read endpoints instead return `model_response(Schema,
+orm_rows)`: the rows are validated once through a cached `TypeAdapter`
+and dumped straight to JSON bytes by pydantic-core. FastAPI returns
+`Response` objects as they are, so `response_model` stays on the route
+for the OpenAPI schema only.
+
+The rows are serialized when the response is sent, not when the endpoint
+returns it, so `AppRoute` has already released the request's read
+sessions and their pooled connections are not held during serialization.
+"""
+
+import functools
+from typing import Any
+
+from pydantic import TypeAdapter
+from starlette.responses import JSONResponse, Response
+from starlette.types import Receive, Scope, Send
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is an optional dependency
+    orjson = None
+
+
+class ORJSONResponse(JSONResponse):
+    """JSON response rendered with orjson when it is available."""
+
+    def render(self, content: Any) -> bytes:
+        if orjson is None:
+            return super().render(content)
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+@functools.lru_cache(maxsize=None)
+def type_adapter(response_type: Any) -> TypeAdapter:
+    """The shared `TypeAdapter` for a response type (a schema, `List[Schema]`, ...)."""
+    return TypeAdapter(response_type)
+
+
+def serialize(response_type: Any, value: Any) -> bytes:
+    """Validate ORM rows or dicts against `response_type` and dump them to JSON.
+
+    Keys use field aliases, as FastAPI's own response serialization does.
+    """
+    adapter = type_adapter(response_type)
+    return adapter.dump_json(
+        adapter.validate_python(value, from_attributes=True), by_alias=True
+    )
+
+
+class ModelResponse(Response):
+    """JSON response serializing its value as `response_type` when sent."""
+
+    media_type = "application/json"
+
+    def __init__(self, response_type: Any, value: Any, status_code: int = 200) -> None:
+        super().__init__(status_code=status_code)
+        self.response_type = response_type
+        self.value = value
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        self.body = serialize(self.response_type, self.value)
+        self.value = None
+        self.headers["content-length"] = str(len(self.body))
+        await super().__call__(scope, receive, send)
+
+
+def model_response(response_type: Any, value: Any, status_code: int = 200) -> Response:
+    """A JSON response with `value` serialized once as `response_type`."""
+    return ModelResponse(response_type, value, status_code=status_code)
@@ -0,0 +1,31 @@
+"""Route class shared by the API routers."""
+
+import asyncio
+import functools
+from typing import Any
+
+from app.core.tracing import TracedRoute
+from app.db.session import release_read_sessions
+
+
+class AppRoute(TracedRoute):
+    """Traced route that releases read sessions as soon as the endpoint returns.
+
+    FastAPI validates and serialises the response before tearing down
+    dependencies, so a `get_read_db` session would otherwise hold its pooled
+    connection through serialisation. Sync endpoints run in a worker thread
+    and keep the default teardown.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        call = self.dependant.call
+        if asyncio.iscoroutinefunction(call):
+            @functools.wraps(call)
+            async def endpoint(*call_args, **call_kwargs):
+                try:
+                    return await call(*call_args, **call_kwargs)
+                finally:
+                    await release_read_sessions()
+
+            self.dependant.call = endpoint
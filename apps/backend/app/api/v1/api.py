@@ -10,7 +10,8 @@ from app.api.v1.endpoints import (
     modules,
     lessons,
     reviews,
-    purchases
+    purchases,
+    quizzes
 )
 
 api_router = APIRouter()
@@ -51,6 +52,12 @@ api_router.include_router(
     tags=["lessons"],
     responses={404: {"description": "Not found"}},
 )
+api_router.include_router(
+    quizzes.router,
+    prefix="/quizzes",
+    tags=["quizzes"],
+    responses={404: {"description": "Not found"}},
+)
 api_router.include_router(
     enrollments.router,
     prefix="/enrollments",
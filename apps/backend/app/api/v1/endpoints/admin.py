@@ -1,3 +1,4 @@
+import logging
 from typing import Any, List, Dict
 from uuid import UUID
 
@@ -6,7 +7,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.dependencies.auth import get_current_active_superuser, get_current_active_user
 from app.api.dependencies.admin import admin_required
-from app.db.session import get_db
+from app.api.routing import AppRoute
+from app.db.session import get_db, get_read_db
 from app.models import User
 from app.models.user import UserRole, UserStatus
 from app.schemas.user import User as UserSchema, UserCreate, UserUpdate
@@ -17,11 +19,13 @@ from app.services.admin import AdminService
 from app.services.course import CourseService
 from app.core.exception_handlers import NotFoundException, ValidationError, PermissionError
 
-router = APIRouter()
+logger = logging.getLogger(__name__)
+
+router = APIRouter(route_class=AppRoute)
 
 @router.get("/stats")
 async def get_platform_stats(
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_active_superuser),
 ) -> Any:
     """
@@ -255,10 +259,7 @@ async def list_schools(
         )
         return schools
     except Exception as e:
-        import traceback
-        traceback_str = traceback.format_exc()
-        print(f"Error in /admin/schools: {str(e)}")
-        print(traceback_str)
+        logger.exception("Error in /admin/schools")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error retrieving schools: {str(e)}",
@@ -292,7 +293,7 @@ async def create_school(
 @router.get("/content/stats", response_model=Dict[str, Any])
 async def get_content_stats(
     *,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(admin_required)
 ) -> Dict[str, Any]:
     """
@@ -302,7 +303,6 @@ async def get_content_stats(
     """
     try:
         stats = await AdminService.get_content_stats(db, current_user)
-        print(stats)
         return stats
     except PermissionError as e:
         raise HTTPException(
@@ -1,4 +1,4 @@
-from datetime import timedelta, datetime
+import logging
 from typing import Any
 
 from fastapi import APIRouter, Depends, HTTPException, status
@@ -7,9 +7,11 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from pydantic import BaseModel
 
+from app.api.dependencies.auth import oauth2_scheme
+from app.api.routing import AppRoute
 from app.db.session import get_db
 from app.security.authentication import AuthService
-from app.core.config import settings
+from app.core.exceptions import ServiceUnavailableError
 from app.models.user import User, UserStatus
 from app.schemas.auth import (
     Token,
@@ -17,7 +19,9 @@ from app.schemas.auth import (
     RefreshToken,
 )
 
-router = APIRouter()
+logger = logging.getLogger(__name__)
+
+router = APIRouter(route_class=AppRoute)
 
 class LoginRequest(BaseModel):
     username: str
@@ -49,29 +53,13 @@ async def login(
                 headers={"WWW-Authenticate": "Bearer"},
             )
 
-        access_token_expires = timedelta(
-            minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES
-        )
-        refresh_token_expires = timedelta(
-            minutes=settings.REFRESH_TOKEN_EXPIRE_MINUTES
-        )
-        
-        # Calculate expiration datetime
-        expires_at = datetime.utcnow() + access_token_expires
-        
-        # Create and return a Token object directly
-        return Token(
-            access_token=await AuthService.create_access_token(
-                user.id, expires_delta=access_token_expires
-            ),
-            refresh_token=await AuthService.create_refresh_token(
-                user.id, expires_delta=refresh_token_expires
-            ),
-            token_type="bearer",
-            expires_at=expires_at
-        )
+        # A login starts a new token family
+        return await AuthService.create_token_pair(user.id, school_id=user.school_id)
+    except ServiceUnavailableError:
+        # Hashing pool saturated; let the app handler answer 503
+        raise
     except Exception as e:
-        print(e)
+        logger.warning("Login failed: %s", e)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail=str(e),
@@ -84,61 +72,47 @@ async def refresh_token(
     refresh_token: RefreshToken = None
 ) -> Any:
     """
-    Refresh access token.
-    """
-    try:
-        user_id = await AuthService.get_current_user_from_refresh_token(db, refresh_token.refresh_token)
-        
-        user = await db.scalar(select(User).where(User.id == user_id))
-        if not user:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="User not found",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
-        
-        if user.status != UserStatus.ACTIVE:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="User account is not active",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
+    Exchange a refresh token for a new token pair.
 
-        access_token_expires = timedelta(
-            minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES
-        )
-        refresh_token_expires = timedelta(
-            minutes=settings.REFRESH_TOKEN_EXPIRE_MINUTES
+    Refresh tokens are single use; replaying a spent one revokes its whole
+    family.
+    """
+    if refresh_token is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid refresh token",
+            headers={"WWW-Authenticate": "Bearer"},
         )
-        
-        # Calculate expiration datetime
-        expires_at = datetime.utcnow() + access_token_expires
-        
-        # Create and return a Token object directly
-        return Token(
-            access_token=await AuthService.create_access_token(
-                user.id, expires_delta=access_token_expires
-            ),
-            refresh_token=await AuthService.create_refresh_token(
-                user.id, expires_delta=refresh_token_expires
-            ),
-            token_type="bearer",
-            expires_at=expires_at
+    user_id, family = await AuthService.rotate_refresh_token(db, refresh_token.refresh_token)
+
+    user = await db.scalar(select(User).where(User.id == user_id))
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="User not found",
+            headers={"WWW-Authenticate": "Bearer"},
         )
-        
-    except Exception:
+
+    if user.status != UserStatus.ACTIVE:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid refresh token",
+            detail="User account is not active",
             headers={"WWW-Authenticate": "Bearer"},
-        ) 
-    
+        )
+
+    return await AuthService.create_token_pair(user.id, family=family, school_id=user.school_id)
+
 
 @router.post("/logout")
-async def logout() -> Any:
+async def logout(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_db),
+) -> Any:
     """
-    Logout endpoint.
+    Logout endpoint. Revokes the access token and every token issued from
+    the same login, including refresh tokens.
     """
+    await AuthService.logout(db, token)
     return {
         "message": "Logged out successfully",
-    }
\ No newline at end of file
+    }
@@ -1,3 +1,4 @@
+import logging
 from typing import List, Optional, Union
 from uuid import UUID
 
@@ -5,7 +6,9 @@ from fastapi import APIRouter, Depends, HTTPException, Query, Path
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.dependencies.auth import get_current_user
-from app.db.session import get_db
+from app.api.responses import model_response
+from app.api.routing import AppRoute
+from app.db.session import get_db, get_read_db
 from app.models.user import User, UserRole
 from app.models.course import CourseStatus
 
@@ -19,14 +22,18 @@ from app.schemas.course_version import (
 )
 from app.schemas.module import ModuleCreate, ModuleUpdate, ModuleResponse
 from app.schemas.lesson import LessonCreate, LessonResponse
+from app.schemas.progress import GradebookResponse
 
 # Import our new services
 from app.services.course import CourseService
 from app.services.content import ContentService 
 from app.services.module import ModuleService
 from app.services.lesson import LessonService
+from app.services.gradebook import GradebookService
 
-router = APIRouter()
+logger = logging.getLogger(__name__)
+
+router = APIRouter(route_class=AppRoute)
 
 @router.post("/", response_model=CourseResponse)
 async def create_course(
@@ -43,14 +50,14 @@ async def create_course(
         await db.refresh(course)
         return CourseResponse.model_validate(course)
     except Exception as e:
-        print(e)
+        logger.warning("create_course failed: %s", e)
         await db.rollback()
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.get("/", response_model=List[CourseResponse])
 async def list_courses(
     *,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
@@ -66,17 +73,17 @@ async def list_courses(
         )
         
         if with_content:
-            return [CourseWithContentResponse.model_validate(course) for course in courses]
+            return model_response(List[CourseWithContentResponse], courses)
         else:
-            return [CourseResponse.model_validate(course) for course in courses]
+            return model_response(List[CourseResponse], courses)
     except Exception as e:
-        print(e)
+        logger.warning("list_courses failed: %s", e)
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.get("/{course_id}", response_model=Union[CourseResponse, CourseWithContentResponse])
 async def get_course(
     *,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user),
     course_id: UUID,
     with_content: bool = Query(False, description="Include content information"),
@@ -108,14 +115,14 @@ async def get_course(
             #     return response_dict
             
             # return response
-            return CourseWithContentResponse.model_validate(course)
+            return model_response(CourseWithContentResponse, course)
         
         # Otherwise return basic course info
-        return CourseResponse.model_validate(course)
+        return model_response(CourseResponse, course)
     except HTTPException:
         raise
     except Exception as e:
-        print(e)
+        logger.warning("get_course failed: %s", e)
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.put("/{course_id}/", response_model=CourseResponse)
@@ -135,7 +142,7 @@ async def update_course(
         await db.refresh(course)
         return CourseResponse.model_validate(course)
     except Exception as e:
-        print(e)
+        logger.warning("update_course failed: %s", e)
         await db.rollback()
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -152,7 +159,7 @@ async def delete_course(
         await db.commit()
         return {"success": success}
     except Exception as e:
-        print(e)
+        logger.warning("delete_course failed: %s", e)
         await db.rollback()
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -181,21 +188,21 @@ async def create_course_version(
 @router.get("/{course_id}/versions", response_model=List[CourseVersionResponse])
 async def list_course_versions(
     *,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user),
     course_id: UUID = Path(...)
 ) -> List[CourseVersionResponse]:
     """List all versions of a course."""
     try:
         versions = await ContentService.list_course_versions(db, course_id)
-        return [CourseVersionResponse.model_validate(version) for version in versions]
+        return model_response(List[CourseVersionResponse], versions)
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.get("/{course_id}/versions/{version}", response_model=CourseVersionResponse)
 async def get_course_version(
     *,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user),
     course_id: UUID = Path(...),
     version: str = Path(...)
@@ -229,7 +236,7 @@ async def add_module_to_content(
         await db.refresh(module)
         return ModuleResponse.model_validate(module)
     except Exception as e:
-        print(e)
+        logger.warning("add_module_to_content failed: %s", e)
         await db.rollback()
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -246,7 +253,7 @@ async def delete_module(
         await db.commit()
         return {"success": True}
     except Exception as e:
-        print(e)
+        logger.warning("delete_module failed: %s", e)
         await db.rollback()
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -289,7 +296,7 @@ async def add_lesson_to_module(
         await db.refresh(lesson)
         return LessonResponse.model_validate(lesson)
     except Exception as e:
-        print(e)
+        logger.warning("add_lesson_to_module failed: %s", e)
         await db.rollback()
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -306,14 +313,14 @@ async def delete_lesson(
         await db.commit()
         return {"success": True}
     except Exception as e:
-        print(e)
+        logger.warning("delete_lesson failed: %s", e)
         await db.rollback()
         raise HTTPException(status_code=400, detail=str(e)) 
 
 @router.get("/{course_id}/modules/", response_model=List[ModuleResponse])
 async def get_course_modules(
     *,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user),
     course_id: UUID = Path(...),
     skip: int = Query(0, ge=0),
@@ -351,18 +358,16 @@ async def get_course_modules(
             db, current_user, skip=skip, limit=limit,
             status=status, course_id=course_id
         )
-        for module in modules:
-            print("Found module: ", module.__dict__)
 
-        return [ModuleResponse.model_validate(module) for module in modules]
+        return model_response(List[ModuleResponse], modules)
     except Exception as e:
-        print(e)
+        logger.warning("get_course_modules failed: %s", e)
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.get("/{course_id}/structure", response_model=CourseWithContentResponse)
 async def get_course_structure(
     *,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user),
     course_id: UUID = Path(...),
     content_version: Optional[str] = Query(None, description="Specific content version to retrieve")
@@ -381,7 +386,31 @@ async def get_course_structure(
         course_with_content = await CourseService.get_course_structure(
             db, current_user, course_id, content_version
         )
-        return CourseWithContentResponse.model_validate(course_with_content)
+        return model_response(CourseWithContentResponse, course_with_content)
     except Exception as e:
-        print(e)
-        raise HTTPException(status_code=400, detail=str(e))
\ No newline at end of file
+        logger.warning("get_course_structure failed: %s", e)
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/{course_id}/gradebook", response_model=GradebookResponse)
+async def get_course_gradebook(
+    *,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_user),
+    course_id: UUID = Path(...),
+    school_id: Optional[UUID] = Query(None, description="Required for super admins"),
+    section: Optional[str] = Query(None, description="Only students in this section")
+) -> GradebookResponse:
+    """
+    Get the student × lesson gradebook of a course.
+    
+    Access control:
+    - Super admins can see the gradebook of any school
+    - School admins and teachers can see their own school's gradebook
+    """
+    try:
+        gradebook = await GradebookService.get_gradebook(
+            db, current_user, course_id, school_id, section
+        )
+        return model_response(GradebookResponse, gradebook)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
@@ -1,22 +1,30 @@
-from typing import List, Optional, Tuple
+from typing import Any, AsyncIterator, List, Optional, Tuple
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, status as http_status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.attributes import set_committed_value
 
 from app.api.dependencies.auth import get_current_user
-from app.db.session import get_db
+from app.api.responses import model_response
+from app.api.routing import AppRoute
+from app.core.exceptions import ConflictError, NotFoundException
+from app.db.session import AsyncSessionLocal, get_db
 from app.schemas.enrollment import (
     StudentEnrollmentCreate, IndividualEnrollmentCreate,
     EnrollmentUpdate, ProgressCreate,
     EnrollmentResponse, EnrollmentWithProgressResponse,
-    ProgressResponse
+    ContinueLearningItem, CertificateJobResponse
 )
+from app.schemas.progress import LearningEventBatch, TimeSpentDelta, UserProgressResponse
 from app.models.user import User
 from app.models.enums import EnrollmentStatus
+from app.services.certificates import CertificateService
 from app.services.enrollment import EnrollmentService
+from app.services.learning_events import LearningEventService
 
-router = APIRouter()
+router = APIRouter(route_class=AppRoute)
 
 @router.post("/student", response_model=EnrollmentResponse)
 async def create_student_enrollment(
@@ -32,6 +40,9 @@ async def create_student_enrollment(
         )
         await db.commit()
         return EnrollmentResponse.model_validate(enrollment)
+    except ConflictError as e:
+        await db.rollback()
+        raise HTTPException(status_code=http_status.HTTP_409_CONFLICT, detail=str(e))
     except Exception as e:
         await db.rollback()
         raise HTTPException(status_code=400, detail=str(e))
@@ -89,20 +100,122 @@ async def update_enrollment_status(
         await db.rollback()
         raise HTTPException(status_code=400, detail=str(e))
 
-@router.post("/progress", response_model=ProgressResponse)
+@router.delete("/{enrollment_id}")
+async def delete_enrollment(
+    enrollment_id: UUID,
+    *,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+) -> dict:
+    """Delete an enrollment and release its license seat."""
+    try:
+        success = await EnrollmentService.delete_enrollment(
+            db, current_user, enrollment_id
+        )
+        await db.commit()
+        return {"success": success}
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.post(
+    "/{enrollment_id}/certificate",
+    response_model=CertificateJobResponse,
+    status_code=http_status.HTTP_202_ACCEPTED
+)
+async def request_certificate(
+    enrollment_id: UUID,
+    *,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+) -> CertificateJobResponse:
+    """Queue certificate generation for a completed enrollment; poll the GET for the result."""
+    try:
+        enrollment = await EnrollmentService.get_readable_enrollment(db, current_user, enrollment_id)
+        job = await CertificateService.enqueue(db, enrollment)
+        await db.commit()
+        return CertificateJobResponse.model_validate(job)
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/{enrollment_id}/certificate", response_model=CertificateJobResponse)
+async def get_certificate_status(
+    enrollment_id: UUID,
+    *,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+) -> CertificateJobResponse:
+    """Get the status of an enrollment's certificate job."""
+    try:
+        await EnrollmentService.get_readable_enrollment(db, current_user, enrollment_id)
+        job = await CertificateService.get_job(db, enrollment_id)
+        return CertificateJobResponse.model_validate(job)
+    except NotFoundException as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/continue", response_model=List[ContinueLearningItem])
+async def continue_learning(
+    *,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    limit: int = Query(20, ge=1, le=100)
+) -> List[ContinueLearningItem]:
+    """List the current user's active enrollments with where to resume each one."""
+    try:
+        rows = await EnrollmentService.list_continue_learning(db, current_user, limit)
+        return [ContinueLearningItem.model_validate(row._mapping) for row in rows]
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.post("/progress", response_model=UserProgressResponse)
 async def update_progress(
     *,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
     progress_data: ProgressCreate
-) -> ProgressResponse:
+) -> UserProgressResponse:
     """Update progress for an enrollment."""
     try:
         progress = await EnrollmentService.update_progress(
             db, current_user, progress_data
         )
         await db.commit()
-        return ProgressResponse.model_validate(progress)
+        return UserProgressResponse.model_validate(progress)
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.post("/progress/time", status_code=http_status.HTTP_202_ACCEPTED)
+async def record_time_spent(
+    *,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    delta: TimeSpentDelta
+) -> dict:
+    """Report time spent on a lesson. Deltas are buffered and flushed in batches."""
+    try:
+        await EnrollmentService.record_time_spent(
+            db, current_user, delta.enrollment_id, delta.lesson_id, delta.seconds
+        )
+        return {"accepted": True}
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.post("/events", status_code=http_status.HTTP_202_ACCEPTED)
+async def record_learning_events(
+    *,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    batch: LearningEventBatch
+) -> dict:
+    """Append learning events. Progress reflects them after the next compaction."""
+    try:
+        recorded = await LearningEventService.record_events(db, current_user, batch.events)
+        await db.commit()
+        return {"recorded": recorded}
     except Exception as e:
         await db.rollback()
         raise HTTPException(status_code=400, detail=str(e))
@@ -112,15 +225,48 @@ async def get_enrollment_progress(
     enrollment_id: UUID,
     *,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
-) -> EnrollmentWithProgressResponse:
-    """Get enrollment progress."""
+    current_user: User = Depends(get_current_user),
+    module_id: Optional[UUID] = None,
+    status: Optional[str] = Query(None, pattern="^(not_started|in_progress|completed)$"),
+    cursor: Optional[UUID] = None,
+    limit: int = Query(100, ge=1, le=500),
+    response_format: str = Query("json", alias="format", pattern="^(json|ndjson)$")
+) -> Any:
+    """Get enrollment progress.
+    
+    Returns one cursor-paginated page by default. With `format=ndjson` every
+    matching progress row is streamed as newline-delimited JSON instead.
+    """
     try:
-        enrollment = await EnrollmentService.get_enrollment_progress(
+        enrollment = await EnrollmentService.get_readable_enrollment(
             db, current_user, enrollment_id
         )
-        print(f"Enrollment: {enrollment}")
-        return EnrollmentWithProgressResponse.model_validate(enrollment)
+        if response_format == "ndjson":
+            return StreamingResponse(
+                _stream_progress_ndjson(enrollment.id, module_id, status),
+                media_type="application/x-ndjson"
+            )
+
+        items, next_cursor = await EnrollmentService.list_enrollment_progress(
+            db, enrollment.id, module_id, status, cursor, limit
+        )
+        set_committed_value(enrollment, "lesson_progresses", items)
+        enrollment.next_cursor = next_cursor
+        return model_response(EnrollmentWithProgressResponse, enrollment)
     except Exception as e:
-        print(f"Error: {e}")
         raise HTTPException(status_code=400, detail=str(e))
+
+
+async def _stream_progress_ndjson(
+    enrollment_id: UUID,
+    module_id: Optional[UUID],
+    status: Optional[str]
+) -> AsyncIterator[bytes]:
+    """Serialize progress rows one line at a time from a server-side cursor."""
+    # The request-scoped session is closed before the body is sent, so the
+    # stream holds its own session for as long as the client keeps reading
+    async with AsyncSessionLocal() as session:
+        async for progress in EnrollmentService.stream_enrollment_progress(
+            session, enrollment_id, module_id, status
+        ):
+            yield UserProgressResponse.model_validate(progress).model_dump_json().encode() + b"\n"
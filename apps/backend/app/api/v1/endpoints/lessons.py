@@ -5,13 +5,14 @@ from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.dependencies.auth import get_current_user
+from app.api.routing import AppRoute
 from app.db.session import get_db
 from app.models.user import User
 from app.schemas.lesson import LessonResponse, LessonUpdate, LessonCreate
 from app.services.course import CourseService
 from app.services.lesson import LessonService
 
-router = APIRouter()
+router = APIRouter(route_class=AppRoute)
 
 @router.get("/", response_model=List[LessonResponse])
 async def list_lessons(
@@ -1,3 +1,4 @@
+import logging
 from typing import List, Optional, Union
 from uuid import UUID
 
@@ -5,6 +6,7 @@ from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.dependencies.auth import get_current_user
+from app.api.routing import AppRoute
 from app.db.session import get_db
 from app.models.user import User
 from app.models.enums import CourseStatus
@@ -12,7 +14,9 @@ from app.schemas.module import ModuleResponse, ModuleUpdate, ModuleCreate, Modul
 from app.services.course import CourseService
 from app.services.module import ModuleService
 
-router = APIRouter()
+logger = logging.getLogger(__name__)
+
+router = APIRouter(route_class=AppRoute)
 
 @router.get("/", response_model=List[ModuleResponse])
 async def list_modules(
@@ -67,7 +71,7 @@ async def get_module(
         else:
             return ModuleResponse.model_validate(module)
     except Exception as e:
-        print(f"Error: {e}")
+        logger.warning("get_module failed: %s", e)
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.put("/{module_id}", response_model=ModuleResponse)
@@ -5,6 +5,7 @@ from fastapi import APIRouter, Depends, HTTPException, Query, Path
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.dependencies.auth import get_current_user
+from app.api.routing import AppRoute
 from app.db.session import get_db
 from app.models.user import User, UserRole
 from app.models.enums import PaymentStatus
@@ -15,7 +16,7 @@ from app.schemas.purchase import (
 )
 from app.services.purchase import PurchaseService
 
-router = APIRouter()
+router = APIRouter(route_class=AppRoute)
 
 # Purchase endpoints
 
@@ -213,14 +214,11 @@ async def list_licenses_by_course(
             db, course_id, active_only=active_only, skip=skip, limit=limit
         )
         
-        # Get enrollment counts for each license
+        # Enrollment counts come from the maintained seat counter
         license_responses = []
         for license in licenses:
-            license_with_count = await PurchaseService.get_license_with_enrollment_count(db, license.id)
-            if license_with_count:
-                license_obj = license_with_count["license"]
-                license_obj.enrolled_student_count = license_with_count["enrolled_student_count"]
-                license_responses.append(CourseLicenseResponse.model_validate(license_obj))
+            license.enrolled_student_count = license.seats_used
+            license_responses.append(CourseLicenseResponse.model_validate(license))
                 
         return license_responses
     except HTTPException:
@@ -251,14 +249,11 @@ async def list_licenses_by_school(
             db, school_id, active_only=active_only, skip=skip, limit=limit
         )
         
-        # Get enrollment counts for each license
+        # Enrollment counts come from the maintained seat counter
         license_responses = []
         for license in licenses:
-            license_with_count = await PurchaseService.get_license_with_enrollment_count(db, license.id)
-            if license_with_count:
-                license_obj = license_with_count["license"]
-                license_obj.enrolled_student_count = license_with_count["enrolled_student_count"]
-                license_responses.append(CourseLicenseResponse.model_validate(license_obj))
+            license.enrolled_student_count = license.seats_used
+            license_responses.append(CourseLicenseResponse.model_validate(license))
                 
         return license_responses
     except HTTPException:
@@ -336,7 +331,8 @@ async def check_license_validity(
                 "valid": True,
                 "license_id": license.id,
                 "valid_until": license.valid_until,
-                "max_students": license.max_students
+                "max_students": license.max_students,
+                "seats_used": license.seats_used
             }
         return {"valid": False}
     except Exception as e:
@@ -0,0 +1,85 @@
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status as http_status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.dependencies.auth import get_current_user
+from app.api.routing import AppRoute
+from app.core.exceptions import ConflictError
+from app.db.session import get_db
+from app.models.user import User
+from app.schemas.quiz import (
+    QuizSubmission, QuizAttemptResponse, QuizAttemptListResponse,
+    QuizAnswerKeyUpdate, QuizRegradeResponse
+)
+from app.services.quiz import QuizService
+
+router = APIRouter(route_class=AppRoute)
+
+@router.post(
+    "/{quiz_id}/attempts",
+    response_model=QuizAttemptResponse,
+    status_code=http_status.HTTP_201_CREATED
+)
+async def submit_quiz_attempt(
+    quiz_id: UUID,
+    *,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    submission: QuizSubmission
+) -> QuizAttemptResponse:
+    """Submit answers to a quiz and get the graded attempt back."""
+    try:
+        attempt = await QuizService.submit_attempt(db, current_user, quiz_id, submission)
+        await db.commit()
+        return QuizAttemptResponse.model_validate(attempt)
+    except ConflictError as e:
+        await db.rollback()
+        raise HTTPException(status_code=409, detail=str(e))
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/{quiz_id}/attempts", response_model=QuizAttemptListResponse)
+async def list_quiz_attempts(
+    quiz_id: UUID,
+    *,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    enrollment_id: UUID = Query(...)
+) -> QuizAttemptListResponse:
+    """List the current learner's attempts on a quiz."""
+    try:
+        quiz, attempts = await QuizService.list_attempts(db, current_user, quiz_id, enrollment_id)
+        return QuizAttemptListResponse(
+            quiz_id=quiz.id,
+            max_attempts=quiz.max_attempts,
+            attempts_remaining=(
+                max(quiz.max_attempts - len(attempts), 0) if quiz.max_attempts is not None else None
+            ),
+            best_score=max((a.score for a in attempts), default=None),
+            attempts=[QuizAttemptResponse.model_validate(a) for a in attempts]
+        )
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.put("/{quiz_id}/answer-key", response_model=QuizRegradeResponse)
+async def update_quiz_answer_key(
+    quiz_id: UUID,
+    *,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    update_data: QuizAnswerKeyUpdate
+) -> QuizRegradeResponse:
+    """Correct a quiz's answer key and re-grade every attempt against it."""
+    try:
+        quiz, regraded = await QuizService.update_answer_key(db, current_user, quiz_id, update_data)
+        await db.commit()
+        return QuizRegradeResponse(
+            quiz_id=quiz.id,
+            passing_score=quiz.passing_score,
+            regraded_attempts=regraded
+        )
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
@@ -5,7 +5,8 @@ from fastapi import APIRouter, Depends, HTTPException, Query, Path
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.dependencies.auth import get_current_user
-from app.db.session import get_db
+from app.api.routing import AppRoute
+from app.db.session import get_db, get_read_db
 from app.models.user import User, UserRole
 from app.models.review import ReviewStatus
 from app.schemas.review import (
@@ -13,7 +14,7 @@ from app.schemas.review import (
 )
 from app.services.review import ReviewService
 
-router = APIRouter()
+router = APIRouter(route_class=AppRoute)
 
 @router.post("/", response_model=ReviewResponse)
 async def create_review(
@@ -38,7 +39,7 @@ async def list_reviews_by_course(
     status: Optional[ReviewStatus] = None,
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=100),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ) -> List[ReviewResponse]:
     """List reviews for a course."""
@@ -59,7 +60,7 @@ async def list_reviews_by_user(
     user_id: UUID = Path(...),
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=100),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ) -> List[ReviewResponse]:
     """List reviews by a user."""
@@ -81,7 +82,7 @@ async def list_reviews_by_user(
 @router.get("/enrollment/{enrollment_id}", response_model=ReviewResponse)
 async def get_review_by_enrollment(
     enrollment_id: UUID = Path(...),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ) -> ReviewResponse:
     """Get review for a specific enrollment."""
@@ -106,7 +107,7 @@ async def get_review_by_enrollment(
 @router.get("/stats/{course_id}", response_model=ReviewStats)
 async def get_review_stats(
     course_id: UUID = Path(...),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ) -> ReviewStats:
     """Get review statistics for a course."""
@@ -119,7 +120,7 @@ async def get_review_stats(
 @router.get("/{review_id}", response_model=ReviewResponse)
 async def get_review(
     review_id: UUID = Path(...),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ) -> ReviewResponse:
     """Get a specific review."""
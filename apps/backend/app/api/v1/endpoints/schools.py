@@ -10,6 +10,7 @@ from app.api.dependencies.auth import (
     get_current_school,
     check_permissions,
 )
+from app.api.routing import AppRoute
 from app.db.session import get_db
 from app.models import School, User, UserRole
 from app.schemas.school import (
@@ -21,7 +22,7 @@ from app.schemas.school import (
 from app.services.school import SchoolService
 from app.core.exception_handlers import NotFoundException, ValidationError, PermissionError
 
-router = APIRouter()
+router = APIRouter(route_class=AppRoute)
 
 @router.get("/", response_model=List[SchoolSchema])
 async def get_schools(
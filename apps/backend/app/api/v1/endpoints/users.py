@@ -1,7 +1,7 @@
 from typing import Any, List, Optional
 from uuid import UUID, uuid4
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query, Path
+from fastapi import APIRouter, Depends, File, HTTPException, status, Query, Path, UploadFile
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.dependencies.auth import (
@@ -9,6 +9,7 @@ from app.api.dependencies.auth import (
     get_current_school,
     check_permissions,
 )
+from app.api.routing import AppRoute
 from app.db.session import get_db
 from app.models.user import User, UserRole
 from app.models.school import School
@@ -17,10 +18,12 @@ from app.schemas.user import (
     UserCreate,
     UserUpdate,
     UserWithSchool,
+    UserImportResult,
 )
 from app.services.user import UserService
+from app.services.user_import import UserImportService, parse_import_file
 
-router = APIRouter()
+router = APIRouter(route_class=AppRoute)
 
 @router.get("/me", response_model=UserWithSchool)
 async def read_user_me(
@@ -30,14 +33,19 @@ async def read_user_me(
     """
     Get current user.
     """
-    # # Load the user in the current session to avoid DetachedInstanceError
-    # user = await UserService.get_user(db, current_user.id, with_school=True)
-    # if not user:
-    #     raise HTTPException(
-    #         status_code=status.HTTP_404_NOT_FOUND,
-    #         detail="User not found"
-    #     )
-    return current_user
+    # current_user is the cached principal; load the full row for the response
+    user = await UserService.get_user(db, current_user.id, with_school=True)
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
+    response = UserSchema.model_validate(user).model_dump()
+    response["school"] = (
+        {"id": user.school.id, "name": user.school.name, "code": user.school.code}
+        if user.school else None
+    )
+    return response
 
 @router.put("/me", response_model=UserSchema)
 async def update_user_me(
@@ -115,6 +123,34 @@ async def create_user(
         await db.rollback()
         raise HTTPException(status_code=400, detail=str(e))
 
+@router.post("/import", response_model=UserImportResult)
+async def import_users(
+    *,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(check_permissions([UserRole.SCHOOL_ADMIN, UserRole.SUPER_ADMIN])),
+    file: UploadFile = File(...),
+    school_id: Optional[UUID] = Query(None, description="Required for super admins"),
+    dry_run: bool = Query(False, description="Validate only; create nothing"),
+) -> Any:
+    """
+    Bulk import users from a CSV (with header row) or NDJSON file.
+
+    Rows that fail validation or use a registered email are skipped and
+    reported; all other rows are created in one transaction.
+    """
+    filename = (file.filename or "").lower()
+    file_format = "ndjson" if filename.endswith((".ndjson", ".jsonl")) else "csv"
+    try:
+        rows = parse_import_file(await file.read(), file_format)
+        result = await UserImportService.import_users(
+            db, current_user, school_id, rows, dry_run=dry_run
+        )
+        await db.commit()
+        return result
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
+
 @router.get("/{user_id}", response_model=UserSchema)
 async def get_user(
     user_id: UUID = Path(...),
@@ -0,0 +1,49 @@
+"""Periodic in-process background tasks tied to the application lifespan."""
+
+import asyncio
+import logging
+from typing import Awaitable, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicTask:
+    """Run an async callable every `interval` seconds until stopped."""
+
+    def __init__(
+        self,
+        name: str,
+        func: Callable[[], Awaitable[object]],
+        interval: float,
+        run_on_stop: bool = False
+    ) -> None:
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.run_on_stop = run_on_stop
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """Start the loop on the running event loop."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name=self.name)
+
+    async def stop(self) -> None:
+        """Cancel the loop, optionally running the callable one last time."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self.run_on_stop:
+            await self.func()
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.func()
+            except Exception:
+                logger.exception("Background task %s failed", self.name)
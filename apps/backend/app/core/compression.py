@@ -0,0 +1,174 @@
+"""Response compression.
+
+`CompressionMiddleware` is a plain ASGI middleware that compresses responses
+with brotli or gzip, whichever the client accepts (brotli preferred, and only
+when the optional `brotli` package is installed). Only responses whose media
+type is in COMPRESSION_CONTENT_TYPES and that carry no Content-Encoding yet
+are compressed, and only once the body reaches COMPRESSION_MIN_SIZE bytes;
+smaller bodies are sent as they are.
+
+Streaming responses are compressed chunk by chunk, each chunk flushed so the
+client receives it without waiting for the end of the stream. Compressing a
+chunk of COMPRESSION_THREAD_MIN_SIZE bytes or more runs in a worker thread
+(zlib and brotli release the GIL), keeping large course structures and
+gradebooks from blocking the event loop; smaller chunks are cheaper to
+compress inline than to hand off.
+"""
+
+import asyncio
+import zlib
+from typing import List, Optional, Set
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is an optional dependency
+    brotli = None
+
+
+def _choose_encoding(accept_encoding: str) -> Optional[str]:
+    """The encoding to use for a request's Accept-Encoding header, if any."""
+    accepted = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[name.strip().lower()] = quality
+
+    wildcard = accepted.get("*", 0.0)
+    if brotli is not None and accepted.get("br", wildcard) > 0:
+        return "br"
+    if accepted.get("gzip", wildcard) > 0:
+        return "gzip"
+    return None
+
+
+class _Compressor:
+    """Incremental compressor for one response."""
+
+    def __init__(self, encoding: str) -> None:
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=settings.COMPRESSION_BROTLI_QUALITY)
+        else:
+            self._brotli = None
+            # wbits 31: zlib stream with a gzip header and trailer
+            self._zlib = zlib.compressobj(settings.COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes, finish: bool) -> bytes:
+        """Compress a chunk and flush it; `finish` ends the stream."""
+        if self._brotli is not None:
+            head = self._brotli.process(data) if data else b""
+            return head + (self._brotli.finish() if finish else self._brotli.flush())
+        head = self._zlib.compress(data) if data else b""
+        return head + self._zlib.flush(zlib.Z_FINISH if finish else zlib.Z_SYNC_FLUSH)
+
+
+class CompressionMiddleware:
+    """Pure ASGI middleware compressing eligible responses."""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        *,
+        minimum_size: Optional[int] = None,
+        content_types: Optional[List[str]] = None,
+        exclude_paths: Optional[Set[str]] = None,
+    ) -> None:
+        self.app = app
+        self.minimum_size = (
+            settings.COMPRESSION_MIN_SIZE if minimum_size is None else minimum_size
+        )
+        self.content_types = set(content_types or settings.COMPRESSION_CONTENT_TYPES)
+        self.exclude_paths = exclude_paths or {"/health", "/metrics"}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] in self.exclude_paths:
+            await self.app(scope, receive, send)
+            return
+        encoding = _choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        responder = _CompressionResponder(self, encoding, send)
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressionResponder:
+    """Send wrapper holding back the response start until the body size is known."""
+
+    def __init__(self, middleware: CompressionMiddleware, encoding: str, send: Send) -> None:
+        self.middleware = middleware
+        self.encoding = encoding
+        self._send = send
+        self.start_message: Optional[Message] = None
+        self.passthrough = False
+        self.compressor: Optional[_Compressor] = None
+        self.buffer: List[bytes] = []
+        self.buffered = 0
+
+    def _eligible(self, message: Message) -> bool:
+        headers = Headers(raw=message["headers"])
+        if message["status"] < 200 or message["status"] in (204, 304):
+            return False
+        if "content-encoding" in headers:
+            return False
+        media_type = headers.get("content-type", "").partition(";")[0].strip().lower()
+        return media_type in self.middleware.content_types
+
+    async def _compress(self, data: bytes, finish: bool) -> bytes:
+        if len(data) >= settings.COMPRESSION_THREAD_MIN_SIZE:
+            return await asyncio.to_thread(self.compressor.compress, data, finish)
+        return self.compressor.compress(data, finish)
+
+    async def send(self, message: Message) -> None:
+        message_type = message["type"]
+        if message_type == "http.response.start":
+            self.start_message = message
+            self.passthrough = not self._eligible(message)
+            if self.passthrough:
+                await self._send(message)
+            return
+        if message_type != "http.response.body" or self.passthrough:
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self.compressor is not None:
+            body = await self._compress(body, finish=not more_body)
+            await self._send({"type": "http.response.body", "body": body, "more_body": more_body})
+            return
+
+        # Hold chunks back until the body is known to be worth compressing
+        self.buffer.append(body)
+        self.buffered += len(body)
+        if more_body and self.buffered < self.middleware.minimum_size:
+            return
+        body = b"".join(self.buffer)
+        self.buffer = []
+        if not more_body and len(body) < self.middleware.minimum_size:
+            await self._send(self.start_message)
+            await self._send({"type": "http.response.body", "body": body})
+            return
+
+        self.compressor = _Compressor(self.encoding)
+        body = await self._compress(body, finish=not more_body)
+        headers = MutableHeaders(scope=self.start_message)
+        headers["Content-Encoding"] = self.encoding
+        headers.add_vary_header("Accept-Encoding")
+        if more_body:
+            del headers["Content-Length"]
+        else:
+            headers["Content-Length"] = str(len(body))
+        await self._send(self.start_message)
+        await self._send({"type": "http.response.body", "body": body, "more_body": more_body})
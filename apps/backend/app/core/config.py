@@ -45,6 +45,25 @@ class Settings(BaseSettings):
     SQLALCHEMY_POOL_SIZE: int = 5
     SQLALCHEMY_MAX_OVERFLOW: int = 10
     SQLALCHEMY_POOL_TIMEOUT: int = 30
+    # Reconnect after this many seconds, before server or proxy idle timeouts
+    SQLALCHEMY_POOL_RECYCLE: int = 1800
+    SQLALCHEMY_POOL_PRE_PING: bool = True
+    # Server-side cap per statement; 0 disables it
+    SQLALCHEMY_STATEMENT_TIMEOUT_MS: int = 30000
+    # asyncpg prepared statements cached per connection; 0 behind PgBouncer in
+    # transaction mode
+    SQLALCHEMY_PREPARED_STATEMENT_CACHE_SIZE: int = 100
+    # Extra Postgres run-time parameters set on every connection
+    SQLALCHEMY_SERVER_SETTINGS: Dict[str, str] = {}
+    # Read replicas (same URL format as SQLALCHEMY_DATABASE_URI), see app.db.routing
+    SQLALCHEMY_REPLICA_URIS: List[str] = []
+    REPLICA_MAX_LAG_SECONDS: float = 5.0
+    REPLICA_LAG_CHECK_INTERVAL_SECONDS: float = 5.0
+    READ_YOUR_WRITES_SECONDS: int = 10
+    # Per-request query counts and timings; warn when one statement shape
+    # runs more than SQL_REPEATED_STATEMENT_THRESHOLD times in a request
+    SQL_INSTRUMENTATION_ENABLED: bool = True
+    SQL_REPEATED_STATEMENT_THRESHOLD: int = 10
 
     @field_validator("SQLALCHEMY_DATABASE_URI", mode="before")
     @classmethod
@@ -73,7 +92,23 @@ class Settings(BaseSettings):
     VERIFICATION_TOKEN_EXPIRE_MINUTES: int = 60
     MIN_PASSWORD_LENGTH: int = 8
     SECURITY_BCRYPT_ROUNDS: int = 12
+    SECURITY_BCRYPT_CALIBRATE: bool = True
+    SECURITY_BCRYPT_TARGET_MS: float = 250.0
+    SECURITY_BCRYPT_MIN_ROUNDS: int = 10
+    SECURITY_BCRYPT_MAX_ROUNDS: int = 15
+    SECURITY_BCRYPT_REHASH_TOLERANCE: int = 1
     SECURITY_PASSWORD_SALT: str
+    PASSWORD_HASH_MAX_WORKERS: int = 4
+    PASSWORD_HASH_MAX_CONCURRENCY: int = 32
+    PASSWORD_HASH_QUEUE_TIMEOUT_SECONDS: float = 5.0
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 60
+    PRINCIPAL_CACHE_LOCAL_TTL_SECONDS: float = 5.0
+    PRINCIPAL_CACHE_MAX_SIZE: int = 10000
+    TOKEN_REVOCATION_SYNC_INTERVAL_SECONDS: float = 1.0
+    TOKEN_REVOCATION_REBUILD_SECONDS: int = 300
+    TOKEN_REVOCATION_FILTER_CAPACITY: int = 10000
+    TOKEN_REVOCATION_FILTER_ERROR_RATE: float = 0.001
+    TOKEN_REVOCATION_STREAM_MAXLEN: int = 100000
 
     # Email Configuration
     SMTP_TLS: bool = True
@@ -101,6 +136,16 @@ class Settings(BaseSettings):
     REDIS_DB: int = 0
     REDIS_CACHE_DB: int = 1
     REDIS_QUEUE_DB: int = 2
+    REDIS_URL: Optional[str] = None
+    REDIS_ENABLED: bool = True
+
+    @property
+    def redis_url(self) -> str:
+        """Redis URL, built from the host/port settings when REDIS_URL is unset."""
+        if self.REDIS_URL:
+            return self.REDIS_URL
+        auth = f":{self.REDIS_PASSWORD}@" if self.REDIS_PASSWORD else ""
+        return f"redis://{auth}{self.REDIS_HOST}:{self.REDIS_PORT}/{self.REDIS_DB}"
 
     # Celery Configuration
     CELERY_BROKER_URL: str = "redis://localhost:6379/0"
@@ -134,19 +179,83 @@ class Settings(BaseSettings):
     LOG_LEVEL: str = "INFO"
     LOG_FORMAT: str = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
     LOG_FILE: Optional[str] = None
+    LOG_JSON: bool = True
+    LOG_QUEUE_SIZE: int = 10000
+    # Per-logger levels and sample rates (0-1, applied below WARNING), e.g.
+    # LOG_SAMPLE_RATES='{"app.core.middleware": 0.1}'
+    LOG_LEVELS: Dict[str, str] = {}
+    LOG_SAMPLE_RATES: Dict[str, float] = {}
+    REQUEST_LOG_BODY_SAMPLE_RATE: float = 0.0
+    REQUEST_LOG_BODY_MAX_BYTES: int = 2048
     SENTRY_DSN: Optional[HttpUrl] = None
 
+    # Metrics; /metrics requires "Authorization: Bearer <METRICS_TOKEN>" when set
+    METRICS_ENABLED: bool = True
+    METRICS_TOKEN: Optional[str] = None
+
+    # Tracing; TRACING_EXPORTER is "jsonl" (TRACING_JSONL_PATH) or "otlp"
+    # (OTLP/HTTP JSON to TRACING_OTLP_ENDPOINT)
+    TRACING_ENABLED: bool = False
+    TRACING_SAMPLE_RATE: float = 0.01
+    TRACING_EXPORTER: str = "jsonl"
+    TRACING_JSONL_PATH: str = "traces.jsonl"
+    TRACING_OTLP_ENDPOINT: str = "http://localhost:4318/v1/traces"
+    TRACING_EXPORT_INTERVAL_SECONDS: float = 5.0
+    TRACING_MAX_QUEUE_SIZE: int = 10000
+
+    # Response compression (brotli needs the optional `brotli` package)
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MIN_SIZE: int = 1024
+    COMPRESSION_THREAD_MIN_SIZE: int = 65536
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4
+    COMPRESSION_CONTENT_TYPES: List[str] = [
+        "application/json",
+        "application/x-ndjson",
+        "text/csv",
+        "text/html",
+        "text/plain",
+    ]
+
     # Cache Configuration
     CACHE_TYPE: str = "redis"
     CACHE_REDIS_URL: Optional[str] = "redis://localhost:6379/1"
     CACHE_DEFAULT_TIMEOUT: int = 300
     CACHE_KEY_PREFIX: str = "supernova_cache:"
 
+    # Progress Tracking
+    TIME_SPENT_FLUSH_INTERVAL_SECONDS: int = 10
+    TIME_SPENT_MAX_DELTA_SECONDS: int = 300
+    LEARNING_EVENT_BATCH_MAX_SIZE: int = 500
+    LEARNING_EVENT_COPY_THRESHOLD: int = 200
+    EVENT_COMPACTION_INTERVAL_SECONDS: int = 5
+    EVENT_COMPACTION_BATCH_SIZE: int = 5000
+    QUIZ_REGRADE_CHUNK_SIZE: int = 1000
+
+    # Certificates
+    CERTIFICATE_DIR: str = "uploads/certificates"
+    CERTIFICATE_URL_PREFIX: str = "/media/certificates"
+    CERTIFICATE_BATCH_SIZE: int = 50
+    CERTIFICATE_POLL_INTERVAL_SECONDS: int = 5
+    CERTIFICATE_MAX_ATTEMPTS: int = 3
+    CERTIFICATE_STALE_AFTER_SECONDS: int = 600
+
+    # Background Processing
+    PROCESS_POOL_MAX_WORKERS: int = 2
+
+    # Bulk User Import
+    USER_IMPORT_MAX_ROWS: int = 20000
+    USER_IMPORT_BATCH_SIZE: int = 1000
+
     # Rate Limiting
     RATE_LIMIT_ENABLED: bool = True
     RATE_LIMIT_DEFAULT_LIMIT: int = 100
     RATE_LIMIT_DEFAULT_PERIOD: int = 60
     RATE_LIMIT_STRATEGY: str = "fixed-window"
+    RATE_LIMIT_SCHOOL_LIMIT: int = 3000
+    RATE_LIMIT_SCHOOL_PERIOD: int = 60
+    RATE_LIMIT_LOGIN_LIMIT: int = 10
+    RATE_LIMIT_LOGIN_PERIOD: int = 60
 
     # Feature Flags
     ENABLE_REGISTRATION: bool = True
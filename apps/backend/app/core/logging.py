@@ -0,0 +1,197 @@
+"""Logging setup.
+
+Records are formatted and written by a `QueueListener` thread, so handlers
+that do I/O (stdout, LOG_FILE) never block the event loop; the calling code
+only puts the record on a bounded queue. When the queue is full the record is
+dropped and counted rather than blocking, and the count is logged once the
+queue drains.
+
+Output is one JSON object per line (LOG_JSON), including any `extra=` fields
+and the ID of the request being handled. Levels come from LOG_LEVEL and
+per-logger LOG_LEVELS; LOG_SAMPLE_RATES keeps only a fraction of a logger's
+records below WARNING, for chatty loggers such as the request log.
+"""
+
+import atexit
+import copy
+import json
+import logging
+import queue
+import random
+import sys
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, WatchedFileHandler
+from typing import Dict, List, Optional
+
+from app.core.config import settings
+
+# ID of the request being handled, set by RequestContextMiddleware
+request_id_var: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+# Attributes every LogRecord has; anything else came from `extra=`
+_RECORD_ATTRS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+_listener: Optional[QueueListener] = None
+_atexit_registered = False
+
+
+class JsonFormatter(logging.Formatter):
+    """Format records as single-line JSON objects."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc_info"] = record.exc_text
+        if record.stack_info:
+            entry["stack_info"] = record.stack_info
+        return json.dumps(entry, default=str)
+
+
+class ContextFilter(logging.Filter):
+    """Stamp records with the current request ID.
+
+    Attached to the queue handler, so it runs on the caller's side of the
+    queue where the request's context is visible.
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not hasattr(record, "request_id"):
+            record.request_id = request_id_var.get()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Keep a fraction of records below WARNING for the configured loggers.
+
+    Rates apply to a logger and its children; the longest matching name wins.
+    """
+
+    def __init__(self, rates: Dict[str, float]) -> None:
+        super().__init__()
+        self.rates = rates
+        self._resolved: Dict[str, float] = {}
+
+    def _rate(self, name: str) -> float:
+        rate = self._resolved.get(name)
+        if rate is None:
+            rate = 1.0
+            prefix = name
+            while prefix:
+                if prefix in self.rates:
+                    rate = self.rates[prefix]
+                    break
+                prefix = prefix.rpartition(".")[0]
+            self._resolved[name] = rate
+        return rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self._rate(record.name)
+        return rate >= 1.0 or random.random() < rate
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """QueueHandler that drops records instead of blocking when full."""
+
+    def __init__(self, log_queue: queue.Queue) -> None:
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            return
+        if self.dropped:
+            dropped, self.dropped = self.dropped, 0
+            notice = logging.makeLogRecord({
+                "name": __name__,
+                "levelno": logging.WARNING,
+                "levelname": "WARNING",
+                "msg": "Dropped %d log records, the log queue was full",
+                "args": (dropped,),
+            })
+            try:
+                self.queue.put_nowait(self.prepare(notice))
+            except queue.Full:
+                self.dropped += dropped
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Unlike the base class, keep the message and the traceback apart so
+        # the formatter on the listener side can emit them as separate fields
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.msg = record.message
+        record.args = None
+        record.exc_info = None
+        return record
+
+
+def _build_handlers() -> List[logging.Handler]:
+    if settings.LOG_JSON:
+        formatter: logging.Formatter = JsonFormatter()
+    else:
+        formatter = logging.Formatter(settings.LOG_FORMAT)
+    handlers: List[logging.Handler] = [logging.StreamHandler(sys.stdout)]
+    if settings.LOG_FILE:
+        # Reopens the file after external rotation (logrotate)
+        handlers.append(WatchedFileHandler(settings.LOG_FILE))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+    return handlers
+
+
+def configure_logging() -> None:
+    """Route all logging through the queue. Safe to call more than once."""
+    global _listener, _atexit_registered
+    shutdown_logging()
+    if not _atexit_registered:
+        # The listener thread is a daemon; flush what is queued at exit
+        atexit.register(shutdown_logging)
+        _atexit_registered = True
+
+    log_queue: queue.Queue = queue.Queue(settings.LOG_QUEUE_SIZE)
+    queue_handler = NonBlockingQueueHandler(log_queue)
+    queue_handler.addFilter(ContextFilter())
+    if settings.LOG_SAMPLE_RATES:
+        queue_handler.addFilter(SamplingFilter(settings.LOG_SAMPLE_RATES))
+
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(settings.LOG_LEVEL.upper())
+    for name, level in settings.LOG_LEVELS.items():
+        logging.getLogger(name).setLevel(level.upper())
+
+    _listener = QueueListener(log_queue, *_build_handlers(), respect_handler_level=True)
+    _listener.start()
+
+
+def shutdown_logging() -> None:
+    """Flush queued records and stop the listener thread."""
+    global _listener
+    if _listener is not None:
+        root = logging.getLogger()
+        for handler in root.handlers[:]:
+            if isinstance(handler, NonBlockingQueueHandler):
+                root.removeHandler(handler)
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
@@ -0,0 +1,222 @@
+"""Prometheus metrics.
+
+Metrics are kept in the default prometheus_client registry and served in the
+text exposition format from ``/metrics``:
+
+* ``http_request_duration_seconds``: latency histogram by method, route
+  template (``/api/v1/courses/{course_id}``, never the raw path) and status;
+* ``http_requests_in_progress``: in-flight requests by method;
+* ``db_pool_checkout_wait_seconds``: time spent waiting for a pooled
+  connection, and the ``db_pool_size``, ``db_pool_connections_checked_out``,
+  ``db_pool_connections_open`` and ``db_pool_overflow`` gauges, all by pool
+  (the engine's ``pool_logging_name``);
+* ``db_queries_per_request`` and ``db_time_per_request_seconds`` by route,
+  and ``db_repeated_statements_total``, requests in which one statement
+  shape ran more than SQL_REPEATED_STATEMENT_THRESHOLD times (N+1);
+* ``cache_requests_total``: cache lookups by cache, level and hit/miss, so
+  the hit ratio of e.g. the principal cache is
+  ``sum(rate(cache_requests_total{cache="principal",result="hit"}[5m]))
+  / sum(rate(cache_requests_total{cache="principal"}[5m]))``.
+
+With several worker processes each one only sees its own requests. Set
+PROMETHEUS_MULTIPROC_DIR to an empty, writable directory (cleared on every
+deploy) before the workers start; prometheus_client then keeps values in
+memory-mapped files there and ``/metrics`` aggregates across all workers,
+whichever one answers the scrape.
+"""
+
+import os
+import time
+from typing import Optional, Tuple
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from sqlalchemy import event
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+MULTIPROCESS = "PROMETHEUS_MULTIPROC_DIR" in os.environ
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency",
+    ["method", "route", "status"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+HTTP_REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "HTTP requests being handled",
+    ["method"],
+    multiprocess_mode="livesum",
+)
+DB_POOL_CHECKOUT_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting for a pooled database connection",
+    ["pool"],
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0, 30.0),
+)
+DB_POOL_SIZE = Gauge(
+    "db_pool_size",
+    "Configured persistent connections per pool",
+    ["pool"],
+    multiprocess_mode="livesum",
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_connections_checked_out",
+    "Pooled database connections in use",
+    ["pool"],
+    multiprocess_mode="livesum",
+)
+DB_POOL_OPEN = Gauge(
+    "db_pool_connections_open",
+    "Open database connections",
+    ["pool"],
+    multiprocess_mode="livesum",
+)
+DB_POOL_OVERFLOW = Gauge(
+    "db_pool_overflow",
+    "Connections open beyond the pool size",
+    ["pool"],
+    multiprocess_mode="livesum",
+)
+DB_QUERIES_PER_REQUEST = Histogram(
+    "db_queries_per_request",
+    "SQL statements executed per HTTP request",
+    ["route"],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89, 144),
+)
+DB_TIME_PER_REQUEST = Histogram(
+    "db_time_per_request_seconds",
+    "Time spent executing SQL per HTTP request",
+    ["route"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+DB_REPEATED_STATEMENTS = Counter(
+    "db_repeated_statements",
+    "Requests that repeated one statement shape past the N+1 threshold",
+    ["route"],
+)
+CACHE_REQUESTS = Counter(
+    "cache_requests",
+    "Cache lookups",
+    ["cache", "level", "result"],
+)
+
+
+def record_cache(cache: str, level: str, hit: bool) -> None:
+    """Count a cache lookup."""
+    CACHE_REQUESTS.labels(cache, level, "hit" if hit else "miss").inc()
+
+
+def route_label(scope: Scope) -> str:
+    """The matched route's path template, or a shared label for no match."""
+    return getattr(scope.get("route"), "path", None) or "unmatched"
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    """Return the exposition body and its content type."""
+    if MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def mark_process_dead() -> None:
+    """Drop this worker's live gauges from the aggregate on shutdown."""
+    if MULTIPROCESS:
+        multiprocess.mark_process_dead(os.getpid())
+
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """Async queue pool that times how long checkouts wait for a connection."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_CHECKOUT_WAIT.labels(self.logging_name or "default").observe(
+                time.perf_counter() - start
+            )
+
+
+def instrument_pool(engine) -> None:
+    """Track connection usage of an engine's pool."""
+    pool = engine.pool
+    name = pool.logging_name or "default"
+    checked_out = DB_POOL_CHECKED_OUT.labels(name)
+    open_connections = DB_POOL_OPEN.labels(name)
+    overflow = DB_POOL_OVERFLOW.labels(name)
+    size = pool.size()
+    DB_POOL_SIZE.labels(name).set(size)
+    opened = 0
+
+    @event.listens_for(pool, "connect")
+    def _connect(dbapi_connection, connection_record) -> None:
+        nonlocal opened
+        opened += 1
+        open_connections.inc()
+        overflow.set(max(0, opened - size))
+
+    @event.listens_for(pool, "close")
+    def _close(dbapi_connection, connection_record) -> None:
+        nonlocal opened
+        opened -= 1
+        open_connections.dec()
+        overflow.set(max(0, opened - size))
+
+    @event.listens_for(pool, "checkout")
+    def _checkout(dbapi_connection, connection_record, connection_proxy) -> None:
+        checked_out.inc()
+
+    @event.listens_for(pool, "checkin")
+    def _checkin(dbapi_connection, connection_record) -> None:
+        checked_out.dec()
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware recording request latency and concurrency.
+
+    The route label is the matched route's path template, read from the
+    scope after routing; requests that match no route share one label so
+    scanners cannot blow up the series count.
+    """
+
+    def __init__(self, app: ASGIApp, *, exclude_paths: Optional[set] = None) -> None:
+        self.app = app
+        self.exclude_paths = exclude_paths or {"/health", "/metrics"}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] in self.exclude_paths:
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        in_progress = HTTP_REQUESTS_IN_PROGRESS.labels(method)
+        in_progress.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            in_progress.dec()
+            HTTP_REQUEST_DURATION.labels(
+                method, route_label(scope), str(status_code)
+            ).observe(time.perf_counter() - start)
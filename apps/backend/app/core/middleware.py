@@ -1,142 +1,174 @@
+"""Request context middleware: request IDs, timing, request logging and audit.
+
+`RequestContextMiddleware` is a plain ASGI middleware. Unlike
+`BaseHTTPMiddleware` it runs no extra task and does not wrap the response in
+a stream, so it adds only a couple of function calls per request.
+
+Request bodies are never buffered. A sampled fraction of requests
+(REQUEST_LOG_BODY_SAMPLE_RATE) gets its body logged: chunks are copied as
+they pass through to the app, only up to REQUEST_LOG_BODY_MAX_BYTES, and only
+for JSON bodies. Credential fields are redacted before logging.
+
+Audit events for write requests are logged after the response, with the
+status code and the authenticated user, which `get_current_user` records in
+`request.state.current_user`.
+"""
+
+import json
+import logging
+import random
+import re
 import time
 import uuid
-from typing import Callable
+from typing import Any, Optional
 
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.types import ASGIApp
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
-import logging
-import json
+from app.core.config import settings
+from app.core.logging import request_id_var
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
 logger = logging.getLogger(__name__)
+audit_logger = logging.getLogger("audit")
+
+AUDITED_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+BODY_METHODS = {"POST", "PUT", "PATCH"}
+REQUEST_ID_PATTERN = re.compile(r"^[A-Za-z0-9._-]{1,64}$")
+REDACTED_FIELDS = {"password", "new_password", "refresh_token", "access_token", "token", "secret"}
+
+
+def _redact(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {
+            key: "***" if key.lower() in REDACTED_FIELDS else _redact(item)
+            for key, item in value.items()
+        }
+    if isinstance(value, list):
+        return [_redact(item) for item in value]
+    return value
+
+
+def _header(scope: Scope, name: bytes) -> Optional[str]:
+    for key, value in scope.get("headers", ()):
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+class RequestContextMiddleware:
+    """Assign request IDs, time requests and write request and audit logs."""
 
-class RequestLoggingMiddleware(BaseHTTPMiddleware):
     def __init__(
         self,
         app: ASGIApp,
         *,
-        exclude_paths: set[str] = None
+        exclude_paths: Optional[set] = None
     ) -> None:
-        super().__init__(app)
+        self.app = app
         self.exclude_paths = exclude_paths or {"/health", "/metrics"}
+        self.body_sample_rate = settings.REQUEST_LOG_BODY_SAMPLE_RATE
+        self.body_max_bytes = settings.REQUEST_LOG_BODY_MAX_BYTES
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] in self.exclude_paths:
+            await self.app(scope, receive, send)
+            return
+
+        # Honour an upstream ID so one request can be followed across services
+        incoming = _header(scope, b"x-request-id")
+        request_id = incoming if incoming and REQUEST_ID_PATTERN.match(incoming) else uuid.uuid4().hex
+        state = scope.setdefault("state", {})
+        state["request_id"] = request_id
+        token = request_id_var.set(request_id)
+
+        method = scope["method"]
+        start = time.perf_counter()
+        status_code = 500
+        body_parts: Optional[list] = None
+        body_size = 0
+
+        if (
+            method in BODY_METHODS
+            and self.body_sample_rate > 0
+            and random.random() < self.body_sample_rate
+            and (_header(scope, b"content-type") or "").startswith("application/json")
+        ):
+            body_parts = []
+            original_receive = receive
+
+            async def receive() -> Message:
+                nonlocal body_size
+                message = await original_receive()
+                if message["type"] == "http.request" and body_size < self.body_max_bytes:
+                    chunk = message.get("body", b"")
+                    body_parts.append(chunk[:self.body_max_bytes - body_size])
+                    body_size += len(chunk)
+                elif message["type"] == "http.request":
+                    body_size += len(message.get("body", b""))
+                return message
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                process_time = time.perf_counter() - start
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"x-request-id", request_id.encode()),
+                    (b"x-process-time", f"{process_time:.3f}s".encode()),
+                ]
+            await send(message)
 
-    async def dispatch(
-        self,
-        request: Request,
-        call_next: Callable
-    ) -> Response:
-        if request.url.path in self.exclude_paths:
-            return await call_next(request)
-
-        request_id = str(uuid.uuid4())
-        request.state.request_id = request_id
-        
-        # Start timer
-        start_time = time.time()
-        
-        # Get request body
-        body = None
-        if request.method in ["POST", "PUT", "PATCH"]:
-            try:
-                body = await request.json()
-            except:
-                body = await request.body()
-
-        # Log request
-        logger.info(
-            "Request",
-            extra={
-                "request_id": request_id,
-                "method": request.method,
-                "path": request.url.path,
-                "query_params": str(request.query_params),
-                "client_host": request.client.host if request.client else None,
-                "body": body
-            }
-        )
-
-        # Process request
         try:
-            response = await call_next(request)
-            process_time = time.time() - start_time
-
-            # Log response
-            logger.info(
-                "Response",
-                extra={
-                    "request_id": request_id,
-                    "status_code": response.status_code,
-                    "process_time": f"{process_time:.3f}s"
-                }
-            )
-
-            # Add custom headers
-            response.headers["X-Request-ID"] = request_id
-            response.headers["X-Process-Time"] = f"{process_time:.3f}s"
-
-            return response
-
+            await self.app(scope, receive, send_wrapper)
         except Exception as e:
-            process_time = time.time() - start_time
             logger.error(
                 "Request failed",
                 extra={
                     "request_id": request_id,
+                    "method": method,
+                    "path": scope["path"],
                     "error": str(e),
-                    "process_time": f"{process_time:.3f}s"
+                    "process_time": f"{time.perf_counter() - start:.3f}s"
                 }
             )
             raise
+        finally:
+            request_id_var.reset(token)
+
+        process_time = time.perf_counter() - start
+        client = scope.get("client")
+        client_host = client[0] if client else None
+        extra = {
+            "request_id": request_id,
+            "method": method,
+            "path": scope["path"],
+            "query_params": scope.get("query_string", b"").decode("latin-1"),
+            "client_host": client_host,
+            "status_code": status_code,
+            "process_time": f"{process_time:.3f}s",
+        }
+        if body_parts is not None:
+            extra["body"] = self._body_for_log(b"".join(body_parts), body_size)
+        logger.info("Request", extra=extra)
+
+        if method in AUDITED_METHODS:
+            user = state.get("current_user")
+            audit_logger.info(
+                "Audit event",
+                extra={
+                    "request_id": request_id,
+                    "user_id": str(user.id) if user else None,
+                    "user_role": user.role if user else None,
+                    "method": method,
+                    "path": scope["path"],
+                    "status_code": status_code,
+                    "client_host": client_host
+                }
+            )
 
-class AuditLogMiddleware(BaseHTTPMiddleware):
-    def __init__(
-        self,
-        app: ASGIApp,
-        *,
-        exclude_paths: set[str] = None
-    ) -> None:
-        super().__init__(app)
-        self.exclude_paths = exclude_paths or {"/health", "/metrics"}
-        self.audit_logger = logging.getLogger("audit")
-        self.audit_logger.setLevel(logging.INFO)
-
-    async def dispatch(
-        self,
-        request: Request,
-        call_next: Callable
-    ) -> Response:
-        if request.url.path in self.exclude_paths:
-            return await call_next(request)
-
-        # Only audit write operations
-        if request.method not in ["POST", "PUT", "PATCH", "DELETE"]:
-            return await call_next(request)
-
+    def _body_for_log(self, body: bytes, size: int) -> Any:
+        if size > self.body_max_bytes:
+            return f"<{size} bytes, truncated>"
         try:
-            user = request.state.current_user
-            user_id = user.id if user else None
-            user_role = user.role if user else None
-        except:
-            user_id = None
-            user_role = None
-
-        # Log audit event
-        self.audit_logger.info(
-            "Audit event",
-            extra={
-                "request_id": getattr(request.state, "request_id", None),
-                "user_id": user_id,
-                "user_role": user_role,
-                "method": request.method,
-                "path": request.url.path,
-                "client_host": request.client.host if request.client else None
-            }
-        )
-
-        return await call_next(request) 
\ No newline at end of file
+            return _redact(json.loads(body))
+        except ValueError:
+            return f"<{size} bytes, not JSON>"
@@ -0,0 +1,48 @@
+"""Shared process pool for CPU-bound work.
+
+Work that would block the event loop for more than a few milliseconds (PDF
+rendering, bulk password hashing) is shipped to a small pool of worker
+processes. Workers are spawned rather than forked so they never inherit the
+event loop, open sockets or database connections of the API process. Functions
+submitted to the pool must be importable top-level callables with picklable
+arguments.
+"""
+
+import asyncio
+import functools
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Optional, TypeVar
+
+from app.core.config import settings
+
+T = TypeVar("T")
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """Return the shared pool, creating it on first use."""
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(
+            max_workers=settings.PROCESS_POOL_MAX_WORKERS,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+    return _pool
+
+
+async def run_in_process(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run `func(*args, **kwargs)` in the shared pool and await its result."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        get_process_pool(), functools.partial(func, *args, **kwargs)
+    )
+
+
+def shutdown_process_pool() -> None:
+    """Shut the pool down, waiting for running work to finish."""
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=True, cancel_futures=True)
+    _pool = None
@@ -0,0 +1,369 @@
+"""Request rate limiting.
+
+`RateLimitMiddleware` is a pure ASGI middleware that checks every HTTP
+request against a set of `RateLimit` rules before it reaches routing. Each
+rule has a scope, which decides the bucket key:
+
+* ``ip``: the client address;
+* ``user``: the `sub` of a valid access token, falling back to the client
+  address for anonymous requests;
+* ``school``: the `sch` claim of a valid access token; the rule does not
+  apply to requests without one.
+
+and a strategy:
+
+* ``fixed-window``: at most `limit` requests per `period`-second window;
+* ``sliding-window``: the previous window's count, weighted by how much of
+  it still overlaps the last `period` seconds, plus the current count;
+* ``token-bucket``: a bucket of `limit` tokens refilled at limit/period per
+  second, which allows short bursts at a bounded average rate.
+
+Counters live in Redis when it is available, updated by Lua scripts so each
+check is one atomic round trip and all workers share one budget. Redis
+errors, or a missing Redis, fall back to per-process counters.
+
+Tokens are only signature-checked here, not looked up, so the limiter adds
+no database work. Rejected requests get a 429 in the app's error format with
+Retry-After and X-RateLimit-* headers.
+"""
+
+import json
+import logging
+import math
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = f"{settings.CACHE_KEY_PREFIX}rate_limit:"
+STRATEGIES = ("fixed-window", "sliding-window", "token-bucket")
+SCOPES = ("ip", "user", "school")
+
+# (allowed, remaining, retry_after_ms)
+Decision = Tuple[bool, int, int]
+
+# KEYS[1] counter; ARGV: limit, period_ms
+FIXED_WINDOW_SCRIPT = """
+local count = redis.call('INCR', KEYS[1])
+if count == 1 then
+    redis.call('PEXPIRE', KEYS[1], ARGV[2])
+end
+local ttl = redis.call('PTTL', KEYS[1])
+local limit = tonumber(ARGV[1])
+if count > limit then
+    return {0, 0, ttl}
+end
+return {1, limit - count, ttl}
+"""
+
+# KEYS[1] key prefix; ARGV: limit, period_ms
+SLIDING_WINDOW_SCRIPT = """
+local limit = tonumber(ARGV[1])
+local period = tonumber(ARGV[2])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local window = math.floor(now / period)
+local elapsed = now - window * period
+local current_key = KEYS[1] .. ':' .. window
+local previous = tonumber(redis.call('GET', KEYS[1] .. ':' .. (window - 1)) or '0')
+local current = tonumber(redis.call('GET', current_key) or '0')
+local weighted = previous * (period - elapsed) / period + current
+if weighted + 1 > limit then
+    local retry = period - elapsed
+    if previous > 0 then
+        -- Time until enough of the previous window has slid out
+        local needed = weighted + 1 - limit
+        retry = math.min(retry, math.ceil(needed * period / previous))
+    end
+    return {0, 0, retry}
+end
+redis.call('INCR', current_key)
+redis.call('PEXPIRE', current_key, period * 2)
+return {1, math.floor(limit - weighted - 1), period - elapsed}
+"""
+
+# KEYS[1] bucket hash; ARGV: capacity, period_ms
+TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local period = tonumber(ARGV[2])
+local rate = capacity / period
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', now)
+redis.call('PEXPIRE', KEYS[1], period)
+local retry = 0
+if allowed == 0 then
+    retry = math.ceil((1 - tokens) / rate)
+end
+return {allowed, math.floor(tokens), retry}
+"""
+
+_SCRIPTS = {
+    "fixed-window": FIXED_WINDOW_SCRIPT,
+    "sliding-window": SLIDING_WINDOW_SCRIPT,
+    "token-bucket": TOKEN_BUCKET_SCRIPT,
+}
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    """A limit of `limit` requests per `period` seconds per `scope` key."""
+
+    limit: int
+    period: int
+    scope: str = "user"
+    strategy: str = "fixed-window"
+    name: str = "default"
+
+    def __post_init__(self) -> None:
+        if self.strategy not in STRATEGIES:
+            raise ValueError(f"Unknown rate limit strategy: {self.strategy}")
+        if self.scope not in SCOPES:
+            raise ValueError(f"Unknown rate limit scope: {self.scope}")
+        if self.limit < 1 or self.period < 1:
+            raise ValueError("Rate limits need a positive limit and period")
+
+
+class MemoryRateLimitStore:
+    """Per-process counters, used without Redis."""
+
+    # Expired entries are pruned once the store grows past this many keys
+    MAX_KEYS = 100_000
+
+    def __init__(self) -> None:
+        # key -> (expires_at, state); the state tuple depends on the strategy
+        self._state: Dict[str, Tuple[float, tuple]] = {}
+
+    def hit(self, key: str, rule: RateLimit) -> Decision:
+        now = time.monotonic()
+        if len(self._state) > self.MAX_KEYS:
+            self._state = {k: v for k, v in self._state.items() if v[0] > now}
+        entry = self._state.get(key)
+        state = entry[1] if entry is not None and entry[0] > now else None
+        period = float(rule.period)
+        if rule.strategy == "fixed-window":
+            decision, state, expires_at = self._fixed_window(state, rule.limit, period, now)
+        elif rule.strategy == "sliding-window":
+            decision, state, expires_at = self._sliding_window(state, rule.limit, period, now)
+        else:
+            decision, state, expires_at = self._token_bucket(state, rule.limit, period, now)
+        self._state[key] = (expires_at, state)
+        return decision
+
+    @staticmethod
+    def _fixed_window(state, limit: int, period: float, now: float):
+        # state: (count, window_ends_at)
+        count, ends_at = state or (0, now + period)
+        count += 1
+        retry_ms = int((ends_at - now) * 1000)
+        decision = (False, 0, retry_ms) if count > limit else (True, limit - count, retry_ms)
+        return decision, (count, ends_at), ends_at
+
+    @staticmethod
+    def _sliding_window(state, limit: int, period: float, now: float):
+        # state: (window, current_count, previous_count)
+        window = math.floor(now / period)
+        elapsed = now - window * period
+        current_window, current, previous = state or (window, 0, 0)
+        if current_window == window - 1:
+            current, previous = 0, current
+        elif current_window != window:
+            current, previous = 0, 0
+        weighted = previous * (period - elapsed) / period + current
+        retry_ms = int((period - elapsed) * 1000)
+        if weighted + 1 > limit:
+            decision = (False, 0, retry_ms)
+        else:
+            current += 1
+            decision = (True, int(limit - weighted - 1), retry_ms)
+        return decision, (window, current, previous), (window + 2) * period
+
+    @staticmethod
+    def _token_bucket(state, capacity: int, period: float, now: float):
+        # state: (tokens, updated_at)
+        rate = capacity / period
+        tokens, updated_at = state or (float(capacity), now)
+        tokens = min(capacity, tokens + (now - updated_at) * rate)
+        if tokens < 1:
+            decision = (False, 0, int(math.ceil((1 - tokens) / rate * 1000)))
+        else:
+            tokens -= 1
+            decision = (True, int(tokens), 0)
+        return decision, (tokens, now), now + period
+
+
+class RateLimiter:
+    """Applies rules against Redis, falling back to process memory."""
+
+    def __init__(self) -> None:
+        self._memory = MemoryRateLimitStore()
+        self._client = None
+        self._scripts: Dict[str, object] = {}
+
+    async def hit(self, key: str, rule: RateLimit) -> Decision:
+        redis = await get_redis()
+        if redis is not None:
+            if redis is not self._client:
+                # Scripts are bound to the client they were registered on
+                self._client, self._scripts = redis, {}
+            try:
+                script = self._scripts.get(rule.strategy)
+                if script is None:
+                    script = redis.register_script(_SCRIPTS[rule.strategy])
+                    self._scripts[rule.strategy] = script
+                allowed, remaining, retry_ms = await script(
+                    keys=[key], args=[rule.limit, rule.period * 1000]
+                )
+                return bool(allowed), int(remaining), max(0, int(retry_ms))
+            except Exception as e:
+                logger.warning("Redis rate limiting failed, using local counters: %s", e)
+        return self._memory.hit(key, rule)
+
+
+def default_rules() -> List[RateLimit]:
+    """Limits applied to every route without an override."""
+    return [
+        RateLimit(
+            settings.RATE_LIMIT_DEFAULT_LIMIT,
+            settings.RATE_LIMIT_DEFAULT_PERIOD,
+            scope="user",
+            strategy=settings.RATE_LIMIT_STRATEGY
+        ),
+        RateLimit(
+            settings.RATE_LIMIT_SCHOOL_LIMIT,
+            settings.RATE_LIMIT_SCHOOL_PERIOD,
+            scope="school",
+            strategy=settings.RATE_LIMIT_STRATEGY,
+            name="school"
+        ),
+    ]
+
+
+def _token_claims(scope: Scope) -> Optional[dict]:
+    """Verified access token claims of the request, if any."""
+    for name, value in scope.get("headers", ()):
+        if name == b"authorization":
+            scheme, _, token = value.decode("latin-1").partition(" ")
+            if scheme.lower() != "bearer" or not token:
+                return None
+            # Imported here: the security package depends on app.core
+            from app.security.jwt import decode_token, verify_token_type
+            try:
+                payload = decode_token(token)
+            except Exception:
+                return None
+            return payload if verify_token_type(payload, "access") else None
+    return None
+
+
+class RateLimitMiddleware:
+    """Pure ASGI middleware enforcing `RateLimit` rules.
+
+    `routes` maps exact request paths to the rules used instead of the
+    defaults, e.g. a strict per-IP limit on the login endpoint.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        *,
+        rules: Optional[Sequence[RateLimit]] = None,
+        routes: Optional[Dict[str, Sequence[RateLimit]]] = None,
+        exclude_paths: Optional[set] = None,
+        enabled: Optional[bool] = None
+    ) -> None:
+        self.app = app
+        self.rules = list(rules) if rules is not None else default_rules()
+        self.routes = {path.rstrip("/"): list(path_rules) for path, path_rules in (routes or {}).items()}
+        self.exclude_paths = exclude_paths or {"/health", "/metrics"}
+        self.enabled = settings.RATE_LIMIT_ENABLED if enabled is None else enabled
+        self.limiter = RateLimiter()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            not self.enabled
+            or scope["type"] != "http"
+            or scope["method"] == "OPTIONS"
+            or scope["path"] in self.exclude_paths
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        path = scope["path"].rstrip("/")
+        rules = self.routes.get(path, self.rules)
+        client = scope.get("client")
+        ip = client[0] if client else "unknown"
+        claims = _token_claims(scope) if any(rule.scope != "ip" for rule in rules) else None
+
+        tightest: Optional[Tuple[RateLimit, int, int]] = None
+        for rule in rules:
+            if rule.scope == "ip":
+                identity = f"ip:{ip}"
+            elif rule.scope == "user":
+                identity = f"user:{claims['sub']}" if claims else f"ip:{ip}"
+            else:
+                if not claims or not claims.get("sch"):
+                    continue
+                identity = f"school:{claims['sch']}"
+            # Overridden routes get their own buckets; all others share one
+            route = path if path in self.routes else "*"
+            key = f"{KEY_PREFIX}{rule.name}:{rule.strategy}:{route}:{identity}"
+
+            allowed, remaining, retry_ms = await self.limiter.hit(key, rule)
+            if not allowed:
+                await self._reject(send, rule, retry_ms)
+                return
+            if tightest is None or remaining < tightest[1]:
+                tightest = (rule, remaining, retry_ms)
+
+        if tightest is None:
+            await self.app(scope, receive, send)
+            return
+
+        rule, remaining, _ = tightest
+        headers = [
+            (b"x-ratelimit-limit", str(rule.limit).encode()),
+            (b"x-ratelimit-remaining", str(remaining).encode()),
+        ]
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + headers
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
+
+    @staticmethod
+    async def _reject(send: Send, rule: RateLimit, retry_ms: int) -> None:
+        retry_after = max(1, math.ceil(retry_ms / 1000))
+        body = json.dumps({
+            "detail": "Rate limit exceeded",
+            "data": {"limit": rule.limit, "period": rule.period, "scope": rule.scope},
+        }).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 429,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(retry_after).encode()),
+                (b"x-ratelimit-limit", str(rule.limit).encode()),
+                (b"x-ratelimit-remaining", b"0"),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
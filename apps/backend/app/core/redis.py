@@ -0,0 +1,55 @@
+"""Shared Redis client.
+
+Redis is optional: when the `redis` package is missing, REDIS_ENABLED is off,
+or the server cannot be reached, `get_redis()` returns None and callers fall
+back to their in-process implementations.
+"""
+
+import logging
+from typing import Optional
+
+from app.core.config import settings
+from app.core.tracing import instrument_redis
+
+try:
+    from redis import asyncio as aioredis
+except ImportError:  # pragma: no cover - redis is an optional dependency
+    aioredis = None
+
+logger = logging.getLogger(__name__)
+
+_client: Optional["aioredis.Redis"] = None
+_checked: bool = False
+
+
+async def get_redis() -> Optional["aioredis.Redis"]:
+    """Return the shared Redis client, or None when Redis is unavailable."""
+    global _client, _checked
+    if _checked:
+        return _client
+    _checked = True
+
+    if aioredis is None or not settings.REDIS_ENABLED:
+        return None
+
+    client = aioredis.from_url(settings.redis_url, decode_responses=True)
+    try:
+        await client.ping()
+    except Exception as e:
+        logger.warning("Redis unavailable, using in-process fallbacks: %s", e)
+        await client.close()
+        return None
+
+    if settings.TRACING_ENABLED:
+        instrument_redis(client)
+    _client = client
+    return _client
+
+
+async def close_redis() -> None:
+    """Close the shared Redis client."""
+    global _client, _checked
+    if _client is not None:
+        await _client.close()
+    _client = None
+    _checked = False
@@ -0,0 +1,45 @@
+"""Startup warm-up.
+
+Work that would otherwise land on the first requests a worker serves is
+done in the lifespan hook instead, before the worker reports ready:
+
+* SQLAlchemy configures mappers (resolving every relationship between the
+  models) on first use of any mapped class;
+* `model_response` builds a `TypeAdapter` the first time each response type
+  is serialized.
+
+`app/scripts/profile_startup.py` measures the resulting cold start.
+"""
+
+import logging
+import time
+
+from fastapi import FastAPI
+from fastapi.routing import APIRoute
+from sqlalchemy.orm import configure_mappers
+
+from app.api.responses import type_adapter
+
+logger = logging.getLogger(__name__)
+
+
+def warm_up(app: FastAPI) -> None:
+    """Configure mappers and build the response type adapters."""
+    started = time.perf_counter()
+    configure_mappers()
+    mappers_done = time.perf_counter()
+
+    response_types = 0
+    for route in app.routes:
+        if isinstance(route, APIRoute) and route.response_model is not None:
+            type_adapter(route.response_model)
+            response_types += 1
+    done = time.perf_counter()
+
+    logger.info(
+        "Warm-up done in %.0f ms (mappers %.0f ms, %d response types %.0f ms)",
+        (done - started) * 1000,
+        (mappers_done - started) * 1000,
+        response_types,
+        (done - mappers_done) * 1000,
+    )
@@ -0,0 +1,390 @@
+"""Lightweight request tracing.
+
+A trace is a tree of spans: `TracingMiddleware` opens the root span of a
+sampled request, and everything below it opens child spans of whatever span
+is current (held in a ContextVar, so children nest correctly across awaits
+and thread-pool hops):
+
+* endpoint functions, through `TracedRoute` (the route class of every API
+  router); the root span minus the endpoint span is the time FastAPI spent
+  on request validation, dependencies and response serialisation;
+* `*Service` static methods, through the `trace_service` class decorator;
+* SQL statements, through cursor events on the async engine;
+* Redis commands, through `instrument_redis`.
+
+`start_span` and `traced` open spans by hand for anything else.
+
+Whether a request is traced is decided once, at the root: an incoming W3C
+``traceparent`` header's sampled flag is honoured, otherwise
+TRACING_SAMPLE_RATE of requests are sampled. Outside a sampled request every
+hook costs one ContextVar lookup, and with TRACING_ENABLED off nothing is
+wrapped or hooked at all.
+
+Finished spans are queued in memory (at most TRACING_MAX_QUEUE_SIZE, oldest
+dropped first) and exported in batches from a background task every
+TRACING_EXPORT_INTERVAL_SECONDS, off the event loop: appended to a JSONL file
+(TRACING_EXPORTER=jsonl) or POSTed as OTLP/HTTP JSON to a collector
+(TRACING_EXPORTER=otlp).
+"""
+
+import asyncio
+import functools
+import json
+import logging
+import os
+import random
+import re
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, TypeVar
+
+from fastapi.routing import APIRoute
+from sqlalchemy import event
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.background import PeriodicTask
+from app.core.config import settings
+from app.core.metrics import route_label
+
+logger = logging.getLogger(__name__)
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+TRACEPARENT_PATTERN = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+SPAN_KINDS = {"internal": 1, "server": 2, "client": 3}
+MAX_STATEMENT_LENGTH = 1000
+
+
+class Span:
+    """One timed operation within a trace."""
+
+    __slots__ = (
+        "trace_id", "span_id", "parent_id", "name", "kind",
+        "start_ns", "end_ns", "attributes", "error",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        trace_id: str,
+        parent_id: Optional[str] = None,
+        kind: str = "internal",
+        attributes: Optional[Dict[str, Any]] = None
+    ) -> None:
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.attributes = attributes or {}
+        self.error: Optional[str] = None
+        self.end_ns: Optional[int] = None
+        self.start_ns = time.time_ns()
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def record_error(self, error: BaseException) -> None:
+        self.error = f"{type(error).__name__}: {error}"
+
+    def end(self) -> None:
+        self.end_ns = time.time_ns()
+        _finished.append(self)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "kind": self.kind,
+            "start_ns": self.start_ns,
+            "duration_ms": (self.end_ns - self.start_ns) / 1e6,
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+_finished: Deque[Span] = deque(maxlen=settings.TRACING_MAX_QUEUE_SIZE)
+
+
+def current_span() -> Optional[Span]:
+    """The innermost open span, or None outside a sampled request."""
+    return _current_span.get()
+
+
+@contextmanager
+def start_span(name: str, kind: str = "internal", **attributes: Any) -> Iterator[Optional[Span]]:
+    """Open a child of the current span; yields None when not tracing."""
+    parent = _current_span.get()
+    if parent is None:
+        yield None
+        return
+    span = Span(name, parent.trace_id, parent.span_id, kind, attributes)
+    token = _current_span.set(span)
+    try:
+        yield span
+    except BaseException as e:
+        span.record_error(e)
+        raise
+    finally:
+        _current_span.reset(token)
+        span.end()
+
+
+def traced(name: Optional[str] = None) -> Callable[[F], F]:
+    """Decorator running a function (sync or async) inside a span."""
+
+    def decorator(func: F) -> F:
+        if not settings.TRACING_ENABLED:
+            return func
+        span_name = name or func.__qualname__
+
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                if _current_span.get() is None:
+                    return await func(*args, **kwargs)
+                with start_span(span_name):
+                    return await func(*args, **kwargs)
+            return async_wrapper  # type: ignore[return-value]
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _current_span.get() is None:
+                return func(*args, **kwargs)
+            with start_span(span_name):
+                return func(*args, **kwargs)
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
+
+
+def trace_service(cls: type) -> type:
+    """Class decorator tracing every static method of a service class."""
+    for name, attr in list(vars(cls).items()):
+        if isinstance(attr, staticmethod) and not name.startswith("__"):
+            setattr(cls, name, staticmethod(traced(f"{cls.__name__}.{name}")(attr.__func__)))
+    return cls
+
+
+class TracedRoute(APIRoute):
+    """API route whose endpoint function runs in its own span."""
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        # The request handler reads dependant.call on every request; wrapping
+        # it after FastAPI has inspected the original signature keeps
+        # parameter and annotation resolution untouched.
+        self.dependant.call = traced(f"endpoint {self.name}")(self.dependant.call)
+
+
+def instrument_engine_tracing(engine) -> None:
+    """Open a client span around every SQL statement of a (sync) engine."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany) -> None:
+        parent = _current_span.get()
+        span = None
+        if parent is not None:
+            span = Span(
+                "db.query",
+                parent.trace_id,
+                parent.span_id,
+                "client",
+                {"db.system": "postgresql", "db.statement": statement[:MAX_STATEMENT_LENGTH]}
+            )
+        conn.info.setdefault("trace_spans", []).append(span)
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany) -> None:
+        spans = conn.info.get("trace_spans")
+        span = spans.pop() if spans else None
+        if span is not None:
+            span.end()
+
+    @event.listens_for(engine, "handle_error")
+    def _error(context) -> None:
+        spans = context.connection.info.get("trace_spans") if context.connection else None
+        span = spans.pop() if spans else None
+        if span is not None:
+            span.record_error(context.original_exception)
+            span.end()
+
+
+def instrument_redis(client) -> None:
+    """Open a client span around every command sent by a Redis client."""
+    execute_command = client.execute_command
+
+    async def traced_execute_command(*args: Any, **options: Any) -> Any:
+        if _current_span.get() is None:
+            return await execute_command(*args, **options)
+        with start_span(f"redis {args[0]}", kind="client", **{"db.system": "redis"}):
+            return await execute_command(*args, **options)
+
+    client.execute_command = traced_execute_command
+
+
+class TracingMiddleware:
+    """Pure ASGI middleware opening the root span of sampled requests."""
+
+    def __init__(self, app: ASGIApp, *, exclude_paths: Optional[set] = None) -> None:
+        self.app = app
+        self.exclude_paths = exclude_paths or {"/health", "/metrics"}
+        self.sample_rate = settings.TRACING_SAMPLE_RATE
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] in self.exclude_paths:
+            await self.app(scope, receive, send)
+            return
+
+        parent_id = None
+        traceparent = None
+        for key, value in scope.get("headers", ()):
+            if key == b"traceparent":
+                traceparent = TRACEPARENT_PATTERN.match(value.decode("latin-1").strip().lower())
+                break
+        if traceparent:
+            trace_id, parent_id, flags = traceparent.groups()
+            sampled = bool(int(flags, 16) & 1)
+        else:
+            trace_id = os.urandom(16).hex()
+            sampled = random.random() < self.sample_rate
+        if not sampled:
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        span = Span(
+            f"{method} {scope['path']}",
+            trace_id,
+            parent_id,
+            "server",
+            {"http.method": method, "http.target": scope["path"]}
+        )
+        token = _current_span.set(span)
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                span.set_attribute("http.status_code", message["status"])
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except BaseException as e:
+            span.record_error(e)
+            raise
+        finally:
+            _current_span.reset(token)
+            route = route_label(scope)
+            span.name = f"{method} {route}"
+            span.set_attribute("http.route", route)
+            span.end()
+
+
+class JsonlExporter:
+    """Append spans to a local file, one JSON object per line."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+
+    def export(self, spans: List[Span]) -> None:
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.writelines(json.dumps(span.to_dict(), default=str) + "\n" for span in spans)
+
+
+class OtlpHttpExporter:
+    """POST spans to an OTLP/HTTP collector using the JSON encoding."""
+
+    def __init__(self, endpoint: str, service_name: str) -> None:
+        self.endpoint = endpoint
+        self.service_name = service_name
+
+    @staticmethod
+    def _attributes(attributes: Dict[str, Any]) -> List[Dict[str, Any]]:
+        encoded = []
+        for key, value in attributes.items():
+            if isinstance(value, bool):
+                encoded.append({"key": key, "value": {"boolValue": value}})
+            elif isinstance(value, int):
+                encoded.append({"key": key, "value": {"intValue": str(value)}})
+            elif isinstance(value, float):
+                encoded.append({"key": key, "value": {"doubleValue": value}})
+            else:
+                encoded.append({"key": key, "value": {"stringValue": str(value)}})
+        return encoded
+
+    def _span(self, span: Span) -> Dict[str, Any]:
+        encoded = {
+            "traceId": span.trace_id,
+            "spanId": span.span_id,
+            "name": span.name,
+            "kind": SPAN_KINDS.get(span.kind, 1),
+            "startTimeUnixNano": str(span.start_ns),
+            "endTimeUnixNano": str(span.end_ns),
+            "attributes": self._attributes(span.attributes),
+            "status": {"code": 2, "message": span.error} if span.error else {"code": 1},
+        }
+        if span.parent_id:
+            encoded["parentSpanId"] = span.parent_id
+        return encoded
+
+    def export(self, spans: List[Span]) -> None:
+        # Imported here: urllib.request pulls in http.client, email and ssl,
+        # which only OTLP export needs
+        import urllib.request
+
+        payload = {
+            "resourceSpans": [{
+                "resource": {"attributes": self._attributes({"service.name": self.service_name})},
+                "scopeSpans": [{
+                    "scope": {"name": __name__},
+                    "spans": [self._span(span) for span in spans],
+                }],
+            }]
+        }
+        request = urllib.request.Request(
+            self.endpoint,
+            data=json.dumps(payload).encode(),
+            headers={"Content-Type": "application/json"},
+            method="POST"
+        )
+        with urllib.request.urlopen(request, timeout=10):
+            pass
+
+
+_exporter = None
+
+
+def _get_exporter():
+    global _exporter
+    if _exporter is None:
+        if settings.TRACING_EXPORTER == "otlp":
+            _exporter = OtlpHttpExporter(settings.TRACING_OTLP_ENDPOINT, settings.APP_NAME)
+        elif settings.TRACING_EXPORTER == "jsonl":
+            _exporter = JsonlExporter(settings.TRACING_JSONL_PATH)
+        else:
+            raise ValueError(f"Unknown TRACING_EXPORTER {settings.TRACING_EXPORTER!r}")
+    return _exporter
+
+
+async def export_spans() -> None:
+    """Hand every finished span to the exporter in a worker thread."""
+    if not _finished:
+        return
+    batch = [_finished.popleft() for _ in range(len(_finished))]
+    try:
+        await asyncio.to_thread(_get_exporter().export, batch)
+    except Exception as e:
+        logger.warning("Could not export %d spans: %s", len(batch), e)
+
+
+span_exporter = PeriodicTask(
+    "span-exporter",
+    export_spans,
+    settings.TRACING_EXPORT_INTERVAL_SECONDS,
+    run_on_stop=True
+)
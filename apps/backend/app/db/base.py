@@ -23,11 +23,14 @@ from app.models.course import (  # noqa
 )
 from app.models.course_version import CourseVersion, CourseContent
 from app.models.module import Module
-from app.models.lesson import Lesson
+from app.models.lesson import Lesson, LessonQuiz, QuizAttempt
 from app.models.enrollment import CourseEnrollment
 from app.models.purchase import CoursePurchase
 from app.models.review import CourseReview
-from app.models.progress import LessonProgress, UserProgress
+from app.models.progress import LessonProgress, UserProgress, TimeSpentFlush
 from app.models.purchase import CourseLicense
+from app.models.learning_event import LearningEvent, EventCompactionState
+from app.models.certificate import CertificateJob
+from app.models.token import RevokedToken
 
 __all__ = ['Base', 'BaseModel'] 
\ No newline at end of file
@@ -0,0 +1,149 @@
+"""Per-request SQL statistics and N+1 detection.
+
+Cursor execution events on the async engine count every statement, time it
+and group it by fingerprint: the SQL text with bound parameter lists and
+literals collapsed, so ``IN ($1, $2)`` and ``IN ($1, $2, $3)`` are the same
+shape. Statistics are collected into the `QueryStats` of the current request,
+held in a ContextVar that `QueryStatsMiddleware` sets; statements run outside
+a request are not tracked.
+
+After each request the middleware records the query count and DB time in the
+metrics histograms and logs a warning for every statement shape that ran
+more than SQL_REPEATED_STATEMENT_THRESHOLD times, which is almost always a
+relationship loaded lazily inside a loop. With DEBUG on the response also
+carries X-DB-Query-Count and X-DB-Time headers.
+"""
+
+import logging
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
+from sqlalchemy import event
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.metrics import (
+    DB_QUERIES_PER_REQUEST,
+    DB_REPEATED_STATEMENTS,
+    DB_TIME_PER_REQUEST,
+    route_label,
+)
+
+logger = logging.getLogger(__name__)
+
+_PARAM = re.compile(r"(?:\$\d+|%\(\w+\)s|\?)(?:::[\w\[\]]+)?")
+_PARAM_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_NUMBER = re.compile(r"\b\d+\b")
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_WHITESPACE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=4096)
+def fingerprint(statement: str) -> str:
+    """Normalise SQL text so statements differing only in values compare equal."""
+    shape = _STRING.sub("?", statement)
+    shape = _PARAM.sub("?", shape)
+    shape = _NUMBER.sub("?", shape)
+    shape = _PARAM_LIST.sub("(?)", shape)
+    return _WHITESPACE.sub(" ", shape).strip()
+
+
+class QueryStats:
+    """Statements executed while handling one request."""
+
+    __slots__ = ("count", "duration", "shapes")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.duration = 0.0
+        self.shapes: Counter = Counter()
+
+    def record(self, statement: str, duration: float) -> None:
+        self.count += 1
+        self.duration += duration
+        self.shapes[fingerprint(statement)] += 1
+
+    def repeated(self, threshold: int) -> List[Tuple[str, int]]:
+        """Statement shapes that ran more than `threshold` times."""
+        return [(shape, count) for shape, count in self.shapes.most_common() if count > threshold]
+
+
+query_stats_var: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+def instrument_engine(engine) -> None:
+    """Attach the statement hooks to a (sync) engine."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany) -> None:
+        if query_stats_var.get() is not None:
+            conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany) -> None:
+        stats = query_stats_var.get()
+        starts = conn.info.get("query_start")
+        if stats is not None and starts:
+            stats.record(statement, time.perf_counter() - starts.pop())
+
+    @event.listens_for(engine, "handle_error")
+    def _error(context) -> None:
+        starts = context.connection.info.get("query_start") if context.connection else None
+        if query_stats_var.get() is not None and starts:
+            starts.pop()
+
+
+class QueryStatsMiddleware:
+    """Pure ASGI middleware collecting `QueryStats` for each HTTP request."""
+
+    def __init__(self, app: ASGIApp, *, exclude_paths: Optional[set] = None) -> None:
+        self.app = app
+        self.exclude_paths = exclude_paths or {"/health", "/metrics"}
+        self.threshold = settings.SQL_REPEATED_STATEMENT_THRESHOLD
+        self.headers = settings.DEBUG
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] in self.exclude_paths:
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = query_stats_var.set(stats)
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start" and self.headers:
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"x-db-query-count", str(stats.count).encode()),
+                    (b"x-db-time", f"{stats.duration:.3f}s".encode()),
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            query_stats_var.reset(token)
+            self._report(scope, stats)
+
+    def _report(self, scope: Scope, stats: QueryStats) -> None:
+        route = route_label(scope)
+        DB_QUERIES_PER_REQUEST.labels(route).observe(stats.count)
+        DB_TIME_PER_REQUEST.labels(route).observe(stats.duration)
+        repeated = stats.repeated(self.threshold)
+        if not repeated:
+            return
+        DB_REPEATED_STATEMENTS.labels(route).inc()
+        for shape, count in repeated:
+            logger.warning(
+                "Statement repeated %d times in one request (possible N+1)",
+                count,
+                extra={
+                    "method": scope["method"],
+                    "route": route,
+                    "query_count": stats.count,
+                    "statement": shape[:500],
+                }
+            )
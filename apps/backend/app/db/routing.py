@@ -0,0 +1,203 @@
+"""Read-replica routing.
+
+With SQLALCHEMY_REPLICA_URIS set, sessions route plain SELECTs to a replica
+when either the session was opened for reading (`get_read_db`) or the
+calling service method is marked `@replica_reads`. Everything else goes to
+the primary: flushes, INSERT/UPDATE/DELETE, SELECT ... FOR UPDATE, raw SQL,
+and every statement in a session after it has written, so a session always
+reads its own writes. A session sticks to the replica it first picked.
+
+A user who has written recently reads from the primary for
+READ_YOUR_WRITES_SECONDS afterwards, on every worker: commits that wrote
+record the user in Redis (and locally), and `bind_user`, called once the
+request's user is known, checks the marker.
+
+`replica_lag_monitor` measures each replica's replay lag every
+REPLICA_LAG_CHECK_INTERVAL_SECONDS. Replicas lagging more than
+REPLICA_MAX_LAG_SECONDS, unreachable, or not yet checked are skipped; with
+none left, reads fall back to the primary. A server that is not in recovery
+reports no lag, so two independent local Postgres instances (the second one
+loaded from a dump of the first) are enough to exercise the routing.
+"""
+
+import asyncio
+import functools
+import logging
+import random
+import time
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional, Set, TypeVar
+from uuid import UUID
+
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import Session
+
+from app.core.background import PeriodicTask
+from app.core.config import settings
+from app.core.redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+RECENT_WRITE_KEY_PREFIX = f"{settings.CACHE_KEY_PREFIX}recent_write:"
+
+LAG_QUERY = text(
+    "SELECT CASE"
+    " WHEN NOT pg_is_in_recovery() THEN 0"
+    " WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0"
+    " ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())"
+    " END"
+)
+
+# Set for the duration of a `@replica_reads` service call
+_replica_reads: ContextVar[bool] = ContextVar("replica_reads", default=False)
+# Set once the request's user has written recently, or this request wrote
+_primary_reads: ContextVar[bool] = ContextVar("primary_reads", default=False)
+_current_user_id: ContextVar[Optional[UUID]] = ContextVar("routing_user_id", default=None)
+
+
+class ReplicaSet:
+    """Replica engines with their last measured lag."""
+
+    def __init__(self) -> None:
+        self.engines: List[AsyncEngine] = []
+        self._healthy: List[AsyncEngine] = []
+        self._recent_writes: Dict[UUID, float] = {}
+        self._pending: Set[asyncio.Task] = set()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.engines)
+
+    def configure(self, engines: List[AsyncEngine]) -> None:
+        self.engines = list(engines)
+        self._healthy = []
+
+    def pick(self) -> Optional[AsyncEngine]:
+        """A healthy replica, or None to use the primary."""
+        return random.choice(self._healthy) if self._healthy else None
+
+    async def check_lag(self) -> None:
+        """Measure every replica's lag and update the healthy set."""
+        healthy = []
+        for engine in self.engines:
+            name = engine.pool.logging_name
+            try:
+                async with engine.connect() as conn:
+                    lag = await conn.scalar(LAG_QUERY)
+            except Exception as e:
+                logger.warning("Replica %s unreachable: %s", name, e)
+                continue
+            if lag is None or lag > settings.REPLICA_MAX_LAG_SECONDS:
+                logger.warning("Replica %s lagging (%s s), reading from the primary", name, lag)
+                continue
+            healthy.append(engine)
+        self._healthy = healthy
+
+    async def bind_user(self, user_id: UUID) -> None:
+        """Record the request's user; route its reads to the primary after a recent write."""
+        if not self.enabled:
+            return
+        _current_user_id.set(user_id)
+        if await self._has_recent_write(user_id):
+            _primary_reads.set(True)
+
+    async def _has_recent_write(self, user_id: UUID) -> bool:
+        expires = self._recent_writes.get(user_id)
+        if expires is not None:
+            if expires > time.monotonic():
+                return True
+            del self._recent_writes[user_id]
+        redis = await get_redis()
+        if redis is None:
+            return False
+        try:
+            return bool(await redis.exists(f"{RECENT_WRITE_KEY_PREFIX}{user_id}"))
+        except Exception as e:
+            logger.warning("Recent-write lookup failed: %s", e)
+            return False
+
+    async def _mark_recent_write(self, user_id: UUID) -> None:
+        self._recent_writes[user_id] = time.monotonic() + settings.READ_YOUR_WRITES_SECONDS
+        redis = await get_redis()
+        if redis is None:
+            return
+        try:
+            await redis.set(
+                f"{RECENT_WRITE_KEY_PREFIX}{user_id}", 1, ex=settings.READ_YOUR_WRITES_SECONDS
+            )
+        except Exception as e:
+            logger.warning("Recent-write marker failed: %s", e)
+
+    def note_write(self) -> None:
+        """Called after a commit that wrote: stick the current user to the primary."""
+        _primary_reads.set(True)
+        user_id = _current_user_id.get()
+        if user_id is None:
+            return
+        task = asyncio.get_running_loop().create_task(self._mark_recent_write(user_id))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+
+replica_set = ReplicaSet()
+
+replica_lag_monitor = PeriodicTask(
+    "replica-lag-monitor",
+    replica_set.check_lag,
+    settings.REPLICA_LAG_CHECK_INTERVAL_SECONDS
+)
+
+
+def replica_reads(func: F) -> F:
+    """Mark an async service method whose SELECTs may be served by a replica.
+
+    Only for methods whose results never feed a write in the same session.
+    """
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        token = _replica_reads.set(True)
+        try:
+            return await func(*args, **kwargs)
+        finally:
+            _replica_reads.reset(token)
+
+    return wrapper  # type: ignore[return-value]
+
+
+class RoutingSession(Session):
+    """Session that sends eligible SELECTs to a replica.
+
+    Opened with ``info={"read_only": True}`` every SELECT is eligible;
+    otherwise only those issued inside `@replica_reads` methods are.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if self._flushing or not getattr(clause, "is_select", False):
+            # Flushes, DML, raw SQL and explicit connection() calls, which
+            # may be used for anything (e.g. COPY)
+            self.info["wrote"] = True
+            return super().get_bind(mapper, clause=clause, **kw)
+        if (
+            not replica_set.enabled
+            or self.info.get("wrote")
+            or _primary_reads.get()
+            or getattr(clause, "_for_update_arg", None) is not None
+            or not (self.info.get("read_only") or _replica_reads.get())
+        ):
+            return super().get_bind(mapper, clause=clause, **kw)
+        if "replica" not in self.info:
+            self.info["replica"] = replica_set.pick()
+        replica = self.info["replica"]
+        if replica is None:
+            return super().get_bind(mapper, clause=clause, **kw)
+        return replica.sync_engine
+
+
+@event.listens_for(RoutingSession, "after_commit")
+def _after_commit(session: Session) -> None:
+    if session.info.pop("wrote", False) and replica_set.enabled:
+        replica_set.note_write()
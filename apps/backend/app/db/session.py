@@ -1,56 +1,168 @@
-from typing import AsyncGenerator, Generator
-from sqlalchemy import create_engine
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+import functools
+from contextvars import ContextVar
+from typing import AsyncGenerator, Dict, Generator, List, Optional
+from sqlalchemy import Engine, create_engine
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
 from sqlalchemy.orm import Session, sessionmaker
 
 from app.core.config import settings
+from app.core.metrics import InstrumentedAsyncQueuePool, instrument_pool
+from app.core.tracing import instrument_engine_tracing
+from app.db.query_stats import instrument_engine
+from app.db.routing import RoutingSession, replica_set
+
+
+def create_database_engine(url: str, name: str = "primary") -> AsyncEngine:
+    """Create an instrumented async engine using the pool settings.
+
+    `name` labels the pool in metrics and logs.
+    """
+    server_settings = {"application_name": settings.APP_NAME}
+    if settings.SQLALCHEMY_STATEMENT_TIMEOUT_MS:
+        server_settings["statement_timeout"] = str(settings.SQLALCHEMY_STATEMENT_TIMEOUT_MS)
+    server_settings.update(settings.SQLALCHEMY_SERVER_SETTINGS)
+
+    engine = create_async_engine(
+        url,
+        echo=settings.SQLALCHEMY_ECHO,
+        poolclass=InstrumentedAsyncQueuePool,
+        pool_size=settings.SQLALCHEMY_POOL_SIZE,
+        max_overflow=settings.SQLALCHEMY_MAX_OVERFLOW,
+        pool_timeout=settings.SQLALCHEMY_POOL_TIMEOUT,
+        pool_recycle=settings.SQLALCHEMY_POOL_RECYCLE,
+        pool_pre_ping=settings.SQLALCHEMY_POOL_PRE_PING,
+        pool_logging_name=name,
+        connect_args={
+            "prepared_statement_cache_size": settings.SQLALCHEMY_PREPARED_STATEMENT_CACHE_SIZE,
+            "server_settings": server_settings,
+        },
+    )
+    instrument_pool(engine.sync_engine)
+    if settings.SQL_INSTRUMENTATION_ENABLED:
+        instrument_engine(engine.sync_engine)
+    if settings.TRACING_ENABLED:
+        instrument_engine_tracing(engine.sync_engine)
+    return engine
+
+
+def pool_status(engine: AsyncEngine) -> Dict[str, int]:
+    """Current occupancy of an engine's pool in this process."""
+    pool = engine.pool
+    return {
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": max(0, pool.overflow()),
+    }
+
 
 # Create async engine
-async_engine = create_async_engine(
-    settings.SQLALCHEMY_DATABASE_URI,
-    pool_pre_ping=True,
-    echo=settings.SQLALCHEMY_ECHO,
-)
+async_engine = create_database_engine(settings.SQLALCHEMY_DATABASE_URI)
+
+# Read replicas, used by sessions as described in app.db.routing
+replica_engines = [
+    create_database_engine(url, name=f"replica-{index}")
+    for index, url in enumerate(settings.SQLALCHEMY_REPLICA_URIS, start=1)
+]
+replica_set.configure(replica_engines)
+
+
+@functools.lru_cache(maxsize=None)
+def get_sync_engine() -> Engine:
+    """Sync engine for scripts.
+
+    Created on first use: creating it imports psycopg2, which web workers
+    never need.
+    """
+    return create_engine(
+        settings.SQLALCHEMY_DATABASE_URI.replace("postgresql+asyncpg://", "postgresql://"),
+        pool_pre_ping=settings.SQLALCHEMY_POOL_PRE_PING,
+        pool_recycle=settings.SQLALCHEMY_POOL_RECYCLE,
+        echo=settings.SQLALCHEMY_ECHO,
+    )
 
-# Create sync engine for scripts
-sync_engine = create_engine(
-    settings.SQLALCHEMY_DATABASE_URI.replace("postgresql+asyncpg://", "postgresql://"),
-    pool_pre_ping=True,
-    echo=settings.SQLALCHEMY_ECHO,
-)
 
 # Create async session factory
 AsyncSessionLocal = sessionmaker(
     async_engine,
     class_=AsyncSession,
+    sync_session_class=RoutingSession,
     expire_on_commit=False,
     autocommit=False,
     autoflush=False,
 )
 
-# Create sync session factory for scripts
+# Create sync session factory for scripts; bound to get_sync_engine() on use
 SessionLocal = sessionmaker(
-    sync_engine,
     expire_on_commit=False,
     autocommit=False,
     autoflush=False,
 )
 
+# Read sessions opened for the current request, see release_read_sessions()
+_read_sessions: ContextVar[Optional[List[AsyncSession]]] = ContextVar("read_sessions", default=None)
+
+
+def _has_writes(session: AsyncSession) -> bool:
+    """Whether ending the session needs a commit."""
+    return bool(session.info.get("wrote") or session.new or session.dirty or session.deleted)
+
+
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
-    """Get async database session."""
+    """Get async database session.
+
+    A connection is only checked out when the first statement runs, and the
+    session only commits if something was written.
+    """
     async with AsyncSessionLocal() as session:
         try:
             yield session
-            await session.commit()
+            if _has_writes(session):
+                await session.commit()
         except Exception:
             await session.rollback()
             raise
         finally:
             await session.close()
 
+async def get_read_db() -> AsyncGenerator[AsyncSession, None]:
+    """Get async database session for read-only endpoints.
+
+    SELECTs may be served by a replica. Like `get_db` the session is lazy
+    and skips the commit; in addition its connection goes back to the pool
+    as soon as the endpoint returns (see `release_read_sessions`).
+    """
+    async with AsyncSessionLocal(info={"read_only": True}) as session:
+        sessions = _read_sessions.get()
+        if sessions is None:
+            sessions = []
+            _read_sessions.set(sessions)
+        sessions.append(session)
+        try:
+            yield session
+            if _has_writes(session):
+                await session.commit()
+        except Exception:
+            await session.rollback()
+            raise
+        finally:
+            await session.close()
+
+async def release_read_sessions() -> None:
+    """Release the connections of this request's read sessions.
+
+    FastAPI only tears dependencies down after validating and serialising
+    the response; closing here returns the connection before that. Loaded
+    objects stay usable, and sessions that wrote are left for the
+    dependency to commit.
+    """
+    for session in _read_sessions.get() or ():
+        if not _has_writes(session):
+            await session.close()
+
 def get_sync_db() -> Generator[Session, None, None]:
     """Get sync database session for scripts."""
-    db = SessionLocal()
+    db = SessionLocal(bind=get_sync_engine())
     try:
         yield db
         db.commit()
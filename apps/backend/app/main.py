@@ -1,10 +1,17 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+
+import secrets
+
+from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.staticfiles import StaticFiles
 from fastapi.exceptions import RequestValidationError
 from starlette.exceptions import HTTPException as StarletteHTTPException
 from datetime import datetime
 
+from app.api.responses import ORJSONResponse
 from app.api.v1.api import api_router
+from app.core.compression import CompressionMiddleware
 from app.core.config import settings
 from app.core.exceptions import (
     AppException,
@@ -28,9 +35,57 @@ from app.core.exception_handlers import (
     http_exception_handler,
     validation_request_exception_handler,
 )
-from app.core.middleware import RequestLoggingMiddleware, AuditLogMiddleware
+from app.core.logging import configure_logging
+from app.core.metrics import MetricsMiddleware, mark_process_dead, render_metrics
+from app.core.middleware import RequestContextMiddleware
+from app.core.rate_limit import RateLimit, RateLimitMiddleware
+from app.core.process_pool import shutdown_process_pool
+from app.core.redis import close_redis
+from app.core.startup import warm_up
+from app.core.tracing import TracingMiddleware, span_exporter
+from app.db.query_stats import QueryStatsMiddleware
+from app.db.routing import replica_lag_monitor, replica_set
+from app.db.session import async_engine, pool_status
+from app.security.password import calibrate_bcrypt_rounds, shutdown_password_hashing
+from app.security.revocation import token_revocation_sync
+from app.services.time_tracking import time_spent_flusher
+from app.services.learning_events import learning_event_compactor
+from app.services.certificates import certificate_worker
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start and stop background workers with the application."""
+    warm_up(app)
+    await calibrate_bcrypt_rounds()
+    if settings.TRACING_ENABLED:
+        span_exporter.start()
+    if replica_set.enabled:
+        await replica_set.check_lag()
+        replica_lag_monitor.start()
+    token_revocation_sync.start()
+    time_spent_flusher.start()
+    learning_event_compactor.start()
+    certificate_worker.start()
+    yield
+    await certificate_worker.stop()
+    await learning_event_compactor.stop()
+    await time_spent_flusher.stop()
+    await token_revocation_sync.stop()
+    await replica_lag_monitor.stop()
+    if settings.TRACING_ENABLED:
+        await span_exporter.stop()
+    await close_redis()
+    shutdown_process_pool()
+    shutdown_password_hashing()
+    mark_process_dead()
+
+
+configure_logging()
 
 app = FastAPI(
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
     title=settings.APP_NAME,
     openapi_url=f"{settings.API_V1_PREFIX}/openapi.json",
     version="1.0.0",
@@ -48,6 +103,32 @@ app = FastAPI(
     redoc_url="/redoc",
 )
 
+# Rate limiting; added before CORS so CORS wraps it and 429s carry CORS headers
+app.add_middleware(
+    RateLimitMiddleware,
+    routes={
+        # Credential stuffing and token grinding: strict per-IP buckets
+        f"{settings.API_V1_PREFIX}/auth/login": [
+            RateLimit(
+                settings.RATE_LIMIT_LOGIN_LIMIT,
+                settings.RATE_LIMIT_LOGIN_PERIOD,
+                scope="ip",
+                strategy="token-bucket",
+                name="login"
+            ),
+        ],
+        f"{settings.API_V1_PREFIX}/auth/refresh": [
+            RateLimit(
+                settings.RATE_LIMIT_LOGIN_LIMIT,
+                settings.RATE_LIMIT_LOGIN_PERIOD,
+                scope="ip",
+                strategy="token-bucket",
+                name="refresh"
+            ),
+        ],
+    },
+)
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -57,9 +138,25 @@ app.add_middleware(
     allow_headers=["*"],  # Allows all headers
 )
 
-# Add logging and audit middleware
-app.add_middleware(RequestLoggingMiddleware)
-app.add_middleware(AuditLogMiddleware)
+# Compress large JSON bodies; inside the metrics and tracing middlewares so
+# compression time is counted in request latency
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(CompressionMiddleware)
+
+# Query counts, DB time and N+1 warnings per request
+if settings.SQL_INSTRUMENTATION_ENABLED:
+    app.add_middleware(QueryStatsMiddleware)
+
+# Latency histograms; outside rate limiting and CORS so 429s are counted too
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
+# Root spans of sampled requests
+if settings.TRACING_ENABLED:
+    app.add_middleware(TracingMiddleware)
+
+# Request IDs, timing, request and audit logging; outermost so it times everything
+app.add_middleware(RequestContextMiddleware)
 
 # Add exception handlers
 app.add_exception_handler(AppException, app_exception_handler)
@@ -76,14 +173,21 @@ app.add_exception_handler(RequestValidationError, validation_request_exception_h
 # Include API router
 app.include_router(api_router, prefix=settings.API_V1_PREFIX)
 
+# Rendered certificates are served straight from local storage
+app.mount(
+    settings.CERTIFICATE_URL_PREFIX,
+    StaticFiles(directory=settings.CERTIFICATE_DIR, check_dir=False),
+    name="certificates"
+)
+
 @app.get("/")
 async def root():
     """
     Root endpoint.
     """
     return {
-        "message": f"Welcome to {settings.PROJECT_NAME} API",
-        "version": settings.VERSION,
+        "message": f"Welcome to {settings.APP_NAME} API",
+        "version": settings.APP_VERSION,
         "docs_url": "/docs",
         "redoc_url": "/redoc",
     }
@@ -98,9 +202,23 @@ async def health_check():
     return {
         "status": "healthy",
         "timestamp": datetime.utcnow().isoformat(),
-        "version": settings.VERSION,
+        "version": settings.APP_VERSION,
+        "database_pool": pool_status(async_engine),
     }
 
+if settings.METRICS_ENABLED:
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics(request: Request) -> Response:
+        """
+        Prometheus scrape endpoint.
+        """
+        if settings.METRICS_TOKEN:
+            supplied = request.headers.get("Authorization", "")
+            if not secrets.compare_digest(supplied, f"Bearer {settings.METRICS_TOKEN}"):
+                return Response(status_code=401)
+        body, content_type = render_metrics()
+        return Response(content=body, media_type=content_type)
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000) 
\ No newline at end of file
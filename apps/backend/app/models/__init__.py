@@ -18,18 +18,23 @@ from app.models.enums import (
     EnrollmentType,
     EnrollmentStatus,
     PaymentStatus,
-    ReviewStatus
+    ReviewStatus,
+    LearningEventType,
+    CertificateJobStatus
 )
 
 # Course models
 from app.models.course import Course
 from app.models.course_version import CourseVersion, CourseContent
 from app.models.module import Module
-from app.models.lesson import Lesson, LessonQuiz
+from app.models.lesson import Lesson, LessonQuiz, QuizAttempt
 from app.models.enrollment import CourseEnrollment
-from app.models.progress import LessonProgress, UserProgress
+from app.models.progress import LessonProgress, UserProgress, TimeSpentFlush
 from app.models.review import CourseReview
 from app.models.purchase import CoursePurchase, CourseLicense
+from app.models.learning_event import LearningEvent, EventCompactionState
+from app.models.certificate import CertificateJob
+from app.models.token import RevokedToken
 
 # For Alembic migrations
 __all__ = [
@@ -62,10 +67,18 @@ __all__ = [
     "EnrollmentStatus",
     "PaymentStatus",
     "ReviewStatus",
+    "LearningEventType",
+    "CertificateJobStatus",
     "CourseReview",
     "CourseLicense",
     "LessonQuiz",
+    "QuizAttempt",
     "UserProgress",
+    "TimeSpentFlush",
+    "LearningEvent",
+    "EventCompactionState",
+    "CertificateJob",
+    "RevokedToken",
     
     # Base model and mixins
     "BaseModel",
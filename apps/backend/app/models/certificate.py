@@ -0,0 +1,56 @@
+"""Certificate generation job models for the LMS."""
+
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy import ForeignKey, String, DateTime, Integer, Text, text, CheckConstraint, Index
+from sqlalchemy.dialects.postgresql import UUID as PgUUID
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+
+from app.models.base_model import BaseModel
+from app.models.enums import CertificateJobStatus
+
+
+class CertificateJob(BaseModel):
+    """A queued request to render an enrollment's completion certificate.
+    
+    The table is the job queue: workers claim pending rows with
+    FOR UPDATE SKIP LOCKED, so jobs survive restarts and are never rendered
+    by two workers at once. There is at most one job per enrollment.
+    """
+    
+    __tablename__ = "certificate_jobs"
+
+    id: Mapped[UUID] = mapped_column(
+        PgUUID(as_uuid=True), primary_key=True, server_default=text("gen_random_uuid()")
+    )
+    enrollment_id: Mapped[UUID] = mapped_column(
+        PgUUID(as_uuid=True),
+        ForeignKey("course_enrollments.id", ondelete="CASCADE"),
+        nullable=False,
+        unique=True
+    )
+    status: Mapped[str] = mapped_column(
+        String(20), nullable=False, server_default=text("'pending'")
+    )
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, server_default=text("0"))
+    last_error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    certificate_url: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
+    started_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    completed_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+
+    # Relationships
+    enrollment = relationship("CourseEnrollment", viewonly=True)
+
+    __table_args__ = (
+        CheckConstraint(
+            "status IN (" + ", ".join(f"'{s.value}'" for s in CertificateJobStatus) + ")",
+            name="valid_certificate_job_status_check"
+        ),
+        # Workers only ever scan jobs that still need rendering
+        Index(
+            'idx_certificate_jobs_queue', 'created_at',
+            postgresql_where=text("status IN ('pending', 'processing')")
+        ),
+    )
@@ -4,7 +4,7 @@ from datetime import datetime
 from typing import Optional, Dict, Any, List
 from uuid import UUID
 
-from sqlalchemy import Boolean, ForeignKey, String, DateTime, Integer, text, CheckConstraint
+from sqlalchemy import Boolean, ForeignKey, String, DateTime, Integer, text, CheckConstraint, Index
 from sqlalchemy.dialects.postgresql import ENUM, JSONB, UUID as PgUUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -35,6 +35,9 @@ class CourseEnrollment(BaseModel):
     enrolled_by_id: Mapped[UUID] = mapped_column(
         PgUUID(as_uuid=True), ForeignKey("users.id", ondelete="RESTRICT"), nullable=False
     )
+    license_id: Mapped[Optional[UUID]] = mapped_column(
+        PgUUID(as_uuid=True), ForeignKey("course_licenses.id", ondelete="SET NULL"), nullable=True
+    )
     enrollment_type: Mapped[str] = mapped_column(
         ENUM(*[e.value for e in EnrollmentType], name="enrollment_type", create_type=False),
         nullable=False
@@ -53,6 +56,17 @@ class CourseEnrollment(BaseModel):
     progress: Mapped[float] = mapped_column(nullable=False, server_default=text("0.0"))
     last_activity_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
 
+    # Resume point, maintained by progress writes
+    resume_lesson_id: Mapped[Optional[UUID]] = mapped_column(
+        PgUUID(as_uuid=True), ForeignKey("lessons.id", ondelete="SET NULL"), nullable=True
+    )
+    resume_position: Mapped[Optional[str]] = mapped_column(
+        String(100),
+        nullable=True,
+        comment="Player position within the resume lesson (e.g. video timestamp, page)"
+    )
+    resume_updated_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+
     # Completion details
     certificate_id: Mapped[Optional[str]] = mapped_column(String(100), nullable=True)
     certificate_url: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
@@ -78,6 +92,7 @@ class CourseEnrollment(BaseModel):
     )
     lesson_progresses = relationship("UserProgress", back_populates="enrollment", cascade="all, delete-orphan")
     review = relationship("CourseReview", back_populates="enrollment", uselist=False, cascade="all, delete-orphan")
+    resume_lesson = relationship("Lesson", foreign_keys=[resume_lesson_id], viewonly=True)
 
     __table_args__ = (
         # Ensure either student_id or individual_user_id is set, but not both
@@ -86,4 +101,16 @@ class CourseEnrollment(BaseModel):
             "(student_id IS NULL AND individual_user_id IS NOT NULL AND enrollment_type = 'd2c')",
             name="enrollment_type_check"
         ),
+        Index('idx_course_enrollments_license_id', 'license_id'),
+        # "Continue learning": a learner's active enrollments, most recent first
+        Index(
+            'idx_course_enrollments_student_resume',
+            'student_id', text('last_activity_at DESC NULLS LAST'),
+            postgresql_where=text("status IN ('enrolled', 'in_progress')")
+        ),
+        Index(
+            'idx_course_enrollments_individual_resume',
+            'individual_user_id', text('last_activity_at DESC NULLS LAST'),
+            postgresql_where=text("status IN ('enrolled', 'in_progress')")
+        ),
     ) 
\ No newline at end of file
@@ -87,4 +87,17 @@ class CurrencyCode(str, Enum):
     GBP = "GBP"
     CAD = "CAD"
     AUD = "AUD"
-    NZD = "NZD"
\ No newline at end of file
+    NZD = "NZD"
+
+class LearningEventType(str, Enum):
+    STARTED = "started"
+    PROGRESSED = "progressed"
+    COMPLETED = "completed"
+    QUIZ_SUBMITTED = "quiz_submitted"
+
+
+class CertificateJobStatus(str, Enum):
+    PENDING = "pending"
+    PROCESSING = "processing"
+    COMPLETED = "completed"
+    FAILED = "failed"
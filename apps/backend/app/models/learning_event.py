@@ -0,0 +1,73 @@
+"""Append-only learning event log for the LMS."""
+
+from datetime import datetime
+from typing import Optional, Dict, Any
+from uuid import UUID
+
+from sqlalchemy import BigInteger, DateTime, ForeignKey, Identity, Integer, String, text, CheckConstraint, Index
+from sqlalchemy.dialects.postgresql import JSONB, UUID as PgUUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base_class import Base
+from app.models.enums import LearningEventType
+
+
+class LearningEvent(Base):
+    """A single learner interaction, recorded once and never updated.
+    
+    Events are the source of truth for what happened; UserProgress and
+    CourseEnrollment are derived from them by the event compactor. The
+    table deliberately skips BaseModel's soft-delete and update columns.
+    """
+    
+    __tablename__ = "learning_events"
+
+    id: Mapped[int] = mapped_column(BigInteger, Identity(always=True), primary_key=True)
+    enrollment_id: Mapped[UUID] = mapped_column(
+        PgUUID(as_uuid=True), ForeignKey("course_enrollments.id", ondelete="CASCADE"), nullable=False
+    )
+    lesson_id: Mapped[UUID] = mapped_column(
+        PgUUID(as_uuid=True), ForeignKey("lessons.id", ondelete="CASCADE"), nullable=False
+    )
+    event_type: Mapped[str] = mapped_column(String(20), nullable=False)
+    progress: Mapped[Optional[float]] = mapped_column(
+        nullable=True,
+        comment="Lesson progress between 0.0 and 1.0 reported with the event"
+    )
+    score: Mapped[Optional[float]] = mapped_column(
+        nullable=True,
+        comment="Quiz score between 0.0 and 1.0 for quiz_submitted events"
+    )
+    time_spent_seconds: Mapped[int] = mapped_column(Integer, nullable=False, server_default=text("0"))
+    payload: Mapped[Optional[Dict[str, Any]]] = mapped_column(JSONB, nullable=True)
+    occurred_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    recorded_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=text("now()")
+    )
+    xact_id: Mapped[Optional[int]] = mapped_column(
+        BigInteger,
+        nullable=True,
+        server_default=text("(pg_current_xact_id()::text)::bigint"),
+        comment="Inserting transaction; NULL for events compacted before it was recorded"
+    )
+
+    __table_args__ = (
+        CheckConstraint(
+            "event_type IN (" + ", ".join(f"'{e.value}'" for e in LearningEventType) + ")",
+            name="valid_learning_event_type_check"
+        ),
+        Index('idx_learning_events_enrollment', 'enrollment_id', 'id'),
+        Index('idx_learning_events_xact_id', 'xact_id'),
+    )
+
+
+class EventCompactionState(Base):
+    """High-water mark: the last transaction whose learning events were folded into progress."""
+    
+    __tablename__ = "event_compaction_state"
+
+    name: Mapped[str] = mapped_column(String(50), primary_key=True)
+    high_water_mark: Mapped[int] = mapped_column(BigInteger, nullable=False, server_default=text("0"))
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=text("now()")
+    )
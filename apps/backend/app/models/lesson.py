@@ -1,9 +1,10 @@
 """Lesson models for the LMS."""
 
+from datetime import datetime
 from typing import Optional, Dict, Any, List
 from uuid import UUID
 
-from sqlalchemy import Boolean, ForeignKey, String, Text, Integer, text, CheckConstraint
+from sqlalchemy import Boolean, DateTime, ForeignKey, String, Text, Integer, text, CheckConstraint, UniqueConstraint
 from sqlalchemy.dialects.postgresql import ENUM, JSONB, UUID as PgUUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -92,4 +93,57 @@ class LessonQuiz(BaseModel):
             'max_attempts IS NULL OR max_attempts > 0',
             name='max_attempts_check'
         ),
-    ) 
\ No newline at end of file
+    )
+
+
+class QuizAttempt(BaseModel):
+    """A learner's graded submission of a lesson quiz.
+    
+    Attempts are numbered per (quiz, enrollment). The unique constraint on
+    that triple is what makes `max_attempts` race-free: an attempt is only
+    inserted with the next free number while that number is within the limit.
+    """
+    
+    __tablename__ = "quiz_attempts"
+
+    id: Mapped[UUID] = mapped_column(
+        PgUUID(as_uuid=True), primary_key=True, server_default=text("gen_random_uuid()")
+    )
+    quiz_id: Mapped[UUID] = mapped_column(
+        PgUUID(as_uuid=True), ForeignKey("lesson_quizzes.id", ondelete="CASCADE"), nullable=False
+    )
+    enrollment_id: Mapped[UUID] = mapped_column(
+        PgUUID(as_uuid=True), ForeignKey("course_enrollments.id", ondelete="CASCADE"), nullable=False
+    )
+    attempt_number: Mapped[int] = mapped_column(Integer, nullable=False)
+    answers: Mapped[List[Any]] = mapped_column(
+        JSONB,
+        nullable=False,
+        comment="One entry per question: selected option index, list of indexes, or null"
+    )
+    score: Mapped[float] = mapped_column(
+        nullable=False,
+        comment="Weighted share of questions answered correctly (0.0-1.0)"
+    )
+    correct_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    passed: Mapped[bool] = mapped_column(Boolean, nullable=False)
+    submitted_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=text("now()")
+    )
+    graded_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=text("now()")
+    )
+
+    # Relationships
+    quiz = relationship("LessonQuiz", viewonly=True)
+    enrollment = relationship("CourseEnrollment", viewonly=True)
+
+    __table_args__ = (
+        UniqueConstraint(
+            'quiz_id', 'enrollment_id', 'attempt_number',
+            name='uq_quiz_attempts_quiz_enrollment_number'
+        ),
+        CheckConstraint('attempt_number > 0', name='attempt_number_positive_check'),
+        CheckConstraint('score >= 0.0 AND score <= 1.0', name='quiz_score_range_check'),
+    )
+
@@ -131,4 +131,28 @@ class UserProgress(BaseModel):
         ),
         # Create an index on content_type and content_id for faster lookups
         Index('idx_user_progress_content', 'content_type', 'content_id'),
-    ) 
\ No newline at end of file
+        # Keyset pagination of an enrollment's progress rows
+        Index('idx_user_progress_enrollment_id', 'enrollment_id', 'id'),
+        # One row per piece of content per enrollment; target of the event compactor's upsert
+        Index(
+            'uq_user_progress_enrollment_content',
+            'enrollment_id', 'content_type', 'content_id',
+            unique=True
+        ),
+    ) 
+
+class TimeSpentFlush(BaseModel):
+    """Ledger of time-spent batches already applied to progress rows.
+    
+    Each drained batch of buffered time deltas is recorded here in the same
+    transaction that applies it, so a batch re-drained after a crash is
+    recognised and skipped instead of being counted twice.
+    """
+    
+    __tablename__ = "time_spent_flushes"
+
+    id: Mapped[UUID] = mapped_column(
+        PgUUID(as_uuid=True), primary_key=True,
+        comment="Batch ID assigned when the buffer was drained"
+    )
+    row_count: Mapped[int] = mapped_column(Integer, nullable=False, server_default=text("0"))
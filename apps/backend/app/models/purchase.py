@@ -4,7 +4,7 @@ from datetime import datetime
 from typing import Optional, Dict, Any
 from uuid import UUID
 
-from sqlalchemy import Boolean, DateTime, ForeignKey, String, Integer, text
+from sqlalchemy import Boolean, DateTime, ForeignKey, String, Integer, text, CheckConstraint
 from sqlalchemy.dialects.postgresql import ENUM, JSONB, UUID as PgUUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -63,6 +63,12 @@ class CourseLicense(SchoolScopedModel):
     valid_from: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
     valid_until: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
     max_students: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    seats_used: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+        server_default=text("0"),
+        comment="Number of enrollments currently holding a seat on this license"
+    )
 
     # Relationships
     course = relationship("Course", back_populates="licenses", viewonly=True)
@@ -72,4 +78,12 @@ class CourseLicense(SchoolScopedModel):
         back_populates="granted_licenses",
         foreign_keys=[granted_by_id],
         viewonly=True
-    ) 
\ No newline at end of file
+    )
+
+    __table_args__ = (
+        # Seat counter is maintained by conditional UPDATEs; never let it drift out of range
+        CheckConstraint(
+            "seats_used >= 0 AND (max_students IS NULL OR seats_used <= max_students)",
+            name="license_seats_range_check"
+        ),
+    )
@@ -0,0 +1,36 @@
+"""Revoked authentication token models."""
+
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy import DateTime, Index, String, text
+from sqlalchemy.dialects.postgresql import UUID as PgUUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base_class import Base
+
+
+class RevokedToken(Base):
+    """A token ID, or a whole token family, that must no longer be accepted.
+
+    `jti` holds either a token's `jti` claim or a family ID (the `fam`
+    claim shared by every token issued from one login). Rows are only needed
+    until `expires_at`, after which the tokens they cover are expired anyway.
+    """
+
+    __tablename__ = "revoked_tokens"
+
+    jti: Mapped[str] = mapped_column(String(64), primary_key=True)
+    user_id: Mapped[Optional[UUID]] = mapped_column(PgUUID(as_uuid=True), nullable=True)
+    kind: Mapped[str] = mapped_column(
+        String(20), nullable=False, comment="access, refresh or family"
+    )
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    revoked_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=text("now()")
+    )
+
+    __table_args__ = (
+        Index('idx_revoked_tokens_expires_at', 'expires_at'),
+    )
@@ -42,6 +42,9 @@ class TokenPayload(BaseModel):
     sub: str  # user_id
     type: str = Field(..., pattern="^(access|refresh)$")  # "access" or "refresh"
     exp: int  # expiration time
+    jti: str  # token ID, checked against the revocation list
+    fam: str  # token family: every token issued from one login
+    sch: Optional[str] = None  # school ID of access tokens, for rate limiting
     # iat: int  # issued at time
     # role: str  # user role
     # school_id: Optional[str] = None  # school ID if applicable
@@ -195,8 +195,12 @@ class EnrollmentResponse(EnrollmentBase, BaseSchema):
 
 
 class EnrollmentWithProgressResponse(EnrollmentResponse):
-    """Schema for enrollment response with detailed progress."""
+    """Schema for enrollment response with one page of detailed progress."""
     lesson_progresses: List[UserProgressResponse] = []
+    next_cursor: Optional[UUID] = Field(
+        None,
+        description="Pass as `cursor` to fetch the next page; null on the last page"
+    )
     # user_progresses: List[UserProgressResponse] = []
     # completion_percentage: float = Field(0.0, ge=0.0, le=100.0)
     # total_time_spent_seconds: int = Field(0, ge=0)
@@ -208,3 +212,39 @@ class EnrollmentWithProgressResponse(EnrollmentResponse):
         from_attributes=True,
         extra="forbid"
     )
+
+
+class ContinueLearningItem(BaseModel):
+    """An active enrollment with the point to resume it from."""
+    enrollment_id: UUID
+    course_id: UUID
+    course_title: str
+    status: EnrollmentStatus
+    progress: float
+    last_activity_at: Optional[datetime] = None
+    resume_lesson_id: Optional[UUID] = None
+    resume_lesson_title: Optional[str] = None
+    resume_module_id: Optional[UUID] = None
+    resume_position: Optional[str] = None
+
+    model_config = ConfigDict(
+        from_attributes=True
+    )
+
+
+class CertificateJobResponse(BaseModel):
+    """Status of an enrollment's certificate job."""
+    id: UUID
+    enrollment_id: UUID
+    status: str
+    attempts: int
+    last_error: Optional[str] = None
+    certificate_url: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+
+    model_config = ConfigDict(
+        from_attributes=True
+    )
+
@@ -1,7 +1,7 @@
 """Progress schemas for tracking student learning progress."""
 
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from uuid import UUID
 
 from pydantic import (
@@ -12,6 +12,8 @@ from pydantic import (
     model_validator
 )
 
+from app.core.config import settings
+from app.models.enums import LearningEventType
 from app.schemas.shared import BaseSchema
 
 
@@ -155,3 +157,111 @@ class UserProgressResponse(BaseSchema):
         from_attributes=True,
         extra="forbid"
     )
+
+
+class TimeSpentDelta(BaseModel):
+    """Schema for reporting a small amount of time spent on a lesson."""
+    enrollment_id: UUID
+    lesson_id: UUID
+    seconds: int = Field(
+        ...,
+        ge=1,
+        le=settings.TIME_SPENT_MAX_DELTA_SECONDS,
+        description="Seconds spent since the previous report"
+    )
+
+    model_config = ConfigDict(
+        extra="forbid"
+    )
+
+
+class LearningEventCreate(BaseModel):
+    """Schema for a single learner interaction reported by the player."""
+    enrollment_id: UUID
+    lesson_id: UUID
+    event_type: LearningEventType
+    progress: Optional[float] = Field(
+        None,
+        ge=0.0,
+        le=1.0,
+        description="Lesson progress (0-1) at the time of the event"
+    )
+    score: Optional[float] = Field(
+        None,
+        ge=0.0,
+        le=1.0,
+        description="Quiz score (0-1), only for quiz_submitted events"
+    )
+    time_spent_seconds: int = Field(
+        0,
+        ge=0,
+        le=settings.TIME_SPENT_MAX_DELTA_SECONDS,
+        description="Seconds spent since the previous event"
+    )
+    payload: Optional[Dict[str, Any]] = None
+    occurred_at: Optional[datetime] = Field(
+        None,
+        description="Client timestamp; defaults to the time the event is received"
+    )
+
+    model_config = ConfigDict(
+        extra="forbid"
+    )
+
+    @model_validator(mode='after')
+    def validate_score(self) -> 'LearningEventCreate':
+        """Only quiz submissions carry a score."""
+        if self.score is not None and self.event_type != LearningEventType.QUIZ_SUBMITTED:
+            raise ValueError("score is only allowed on quiz_submitted events")
+        return self
+
+
+class LearningEventBatch(BaseModel):
+    """Schema for a batch of learning events."""
+    events: List[LearningEventCreate] = Field(
+        ...,
+        min_length=1,
+        max_length=settings.LEARNING_EVENT_BATCH_MAX_SIZE
+    )
+
+    model_config = ConfigDict(
+        extra="forbid"
+    )
+
+
+class GradebookStudent(BaseModel):
+    """A gradebook row."""
+    enrollment_id: UUID
+    student_id: UUID
+    enrollment_number: str
+    first_name: str
+    last_name: str
+
+
+class GradebookLesson(BaseModel):
+    """A gradebook column."""
+    id: UUID
+    module_id: UUID
+    title: str
+
+
+class GradebookResponse(BaseModel):
+    """Student × lesson gradebook in columnar form.
+
+    `status`, `progress` and `score` are matrices with one row per entry in
+    `students` and one column per entry in `lessons`. Status cells index into
+    `status_codes`.
+    """
+    course_id: UUID
+    school_id: UUID
+    version_id: UUID
+    status_codes: List[str]
+    students: List[GradebookStudent]
+    lessons: List[GradebookLesson]
+    status: List[List[int]]
+    progress: List[List[float]]
+    score: List[List[Optional[float]]]
+    student_progress: List[float]
+    student_average_score: List[Optional[float]]
+    lesson_completion_rate: List[float]
+
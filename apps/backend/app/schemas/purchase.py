@@ -150,6 +150,7 @@ class CourseLicenseInDB(CourseLicenseBase, BaseSchema):
     """Schema for course license from database."""
     granted_by_id: UUID
     is_active: bool = True
+    seats_used: int = 0
     
     model_config = ConfigDict(
         from_attributes=True,
@@ -0,0 +1,64 @@
+"""Quiz attempt schemas for request/response validation."""
+
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Union
+from uuid import UUID
+
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class QuizSubmission(BaseModel):
+    """Schema for submitting a quiz attempt."""
+    enrollment_id: UUID
+    answers: List[Union[int, List[int], None]] = Field(
+        ...,
+        max_length=500,
+        description="One entry per question, in order: option index, list of indexes, or null"
+    )
+
+    model_config = ConfigDict(
+        extra="forbid"
+    )
+
+
+class QuizAttemptResponse(BaseModel):
+    """Schema for a graded quiz attempt."""
+    id: UUID
+    quiz_id: UUID
+    enrollment_id: UUID
+    attempt_number: int
+    score: float
+    correct_count: int
+    passed: bool
+    submitted_at: datetime
+    graded_at: datetime
+
+    model_config = ConfigDict(
+        from_attributes=True
+    )
+
+
+class QuizAttemptListResponse(BaseModel):
+    """Schema for a learner's attempts on a quiz."""
+    quiz_id: UUID
+    max_attempts: Optional[int] = None
+    attempts_remaining: Optional[int] = None
+    best_score: Optional[float] = None
+    attempts: List[QuizAttemptResponse]
+
+
+class QuizAnswerKeyUpdate(BaseModel):
+    """Schema for correcting a quiz's answer key."""
+    questions: List[Dict[str, Any]] = Field(..., min_length=1)
+    passing_score: Optional[float] = Field(None, ge=0.0, le=1.0)
+
+    model_config = ConfigDict(
+        extra="forbid"
+    )
+
+
+class QuizRegradeResponse(BaseModel):
+    """Schema for the result of an answer key correction."""
+    quiz_id: UUID
+    passing_score: float
+    regraded_attempts: int
@@ -223,4 +223,62 @@ class TeacherProfileUpdate(BaseModel):
 class TeacherProfile(TeacherProfileBase, BaseSchema):
     """Schema for teacher profile response."""
     user_id: UUID
-    school_id: UUID 
\ No newline at end of file
+    school_id: UUID 
+
+class UserImportRow(BaseModel):
+    """One user in a bulk import file.
+
+    Students need `enrollment_number` and `grade_level`; teachers need
+    `employee_id`. Profile dates default to the import date.
+    """
+    email: EmailStr
+    password: str = Field(..., min_length=8)
+    first_name: str = Field(..., min_length=1, max_length=255)
+    last_name: str = Field(..., min_length=1, max_length=255)
+    role: UserRole
+    enrollment_number: Optional[str] = Field(None, max_length=50)
+    grade_level: Optional[str] = Field(None, max_length=20)
+    section: Optional[str] = Field(None, max_length=20)
+    admission_date: Optional[date] = None
+    employee_id: Optional[str] = Field(None, max_length=50)
+    department: Optional[str] = Field(None, max_length=100)
+    joining_date: Optional[date] = None
+
+    model_config = ConfigDict(
+        extra="ignore",
+        str_strip_whitespace=True
+    )
+
+    @field_validator(
+        "enrollment_number", "grade_level", "section", "admission_date",
+        "employee_id", "department", "joining_date",
+        mode="before"
+    )
+    @classmethod
+    def blank_to_none(cls, v):
+        """Empty CSV cells mean "not given"."""
+        return None if v == "" else v
+
+    @model_validator(mode="after")
+    def check_profile_fields(self) -> "UserImportRow":
+        """Require the fields of the role's profile."""
+        if self.role == UserRole.STUDENT and not (self.enrollment_number and self.grade_level):
+            raise ValueError("Students need enrollment_number and grade_level")
+        if self.role == UserRole.TEACHER and not self.employee_id:
+            raise ValueError("Teachers need employee_id")
+        return self
+
+
+class UserImportRowError(BaseModel):
+    """Why one row of an import was skipped."""
+    row: int
+    email: Optional[str] = None
+    error: str
+
+
+class UserImportResult(BaseModel):
+    """Outcome of a bulk user import."""
+    total: int
+    created: int
+    dry_run: bool = False
+    errors: List[UserImportRowError] = []
@@ -0,0 +1,112 @@
+"""Micro-benchmark of per-request middleware overhead.
+
+Drives a trivial ASGI endpoint directly (no server, no sockets) through:
+
+* ``bare``: no middleware;
+* ``base-http``: two `BaseHTTPMiddleware` layers doing what the former
+  RequestLoggingMiddleware and AuditLogMiddleware did;
+* ``asgi``: the current `RequestContextMiddleware`.
+
+and prints the mean time per request for each. Logging is silenced so only
+middleware mechanics are measured.
+
+Usage: python bench_middleware.py [requests]
+"""
+
+import asyncio
+import json
+import logging
+import sys
+import time
+import uuid
+from typing import Callable
+
+from base import BaseScript
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+
+from app.core.middleware import RequestContextMiddleware
+
+
+async def endpoint(scope, receive, send) -> None:
+    while (await receive()).get("more_body"):
+        pass
+    await JSONResponse({"ok": True})(scope, receive, send)
+
+
+class LegacyLoggingMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next: Callable):
+        request.state.request_id = str(uuid.uuid4())
+        start = time.time()
+        if request.method in ["POST", "PUT", "PATCH"]:
+            try:
+                await request.json()
+            except Exception:
+                await request.body()
+        response = await call_next(request)
+        response.headers["X-Request-ID"] = request.state.request_id
+        response.headers["X-Process-Time"] = f"{time.time() - start:.3f}s"
+        return response
+
+
+class LegacyAuditMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next: Callable):
+        return await call_next(request)
+
+
+def _scope(method: str) -> dict:
+    return {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": "/api/v1/bench",
+        "raw_path": b"/api/v1/bench",
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"content-type", b"application/json")],
+        "client": ("127.0.0.1", 50000),
+        "server": ("testserver", 80),
+    }
+
+
+async def _run(app, requests: int, method: str) -> float:
+    body = json.dumps({"email": "bench@example.com", "password": "x" * 16}).encode()
+
+    async def send(message) -> None:
+        pass
+
+    started = time.perf_counter()
+    for _ in range(requests):
+        sent = False
+
+        async def receive():
+            nonlocal sent
+            if not sent:
+                sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return {"type": "http.disconnect"}
+
+        await app(_scope(method), receive, send)
+    return (time.perf_counter() - started) / requests
+
+
+async def main() -> None:
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    logging.disable(logging.CRITICAL)
+    apps = {
+        "bare": endpoint,
+        "base-http": LegacyAuditMiddleware(LegacyLoggingMiddleware(endpoint)),
+        "asgi": RequestContextMiddleware(endpoint),
+    }
+    for method in ("GET", "POST"):
+        for name, app in apps.items():
+            await _run(app, 500, method)  # warm up
+            per_request = await _run(app, requests, method)
+            BaseScript.print_info(f"{method:4} {name:10} {per_request * 1e6:8.1f} µs/request")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,197 @@
+"""Micro-benchmark of response serialization on the heaviest read endpoints.
+
+Builds ORM-like rows shaped like the results of `get_course_modules`,
+`get_course_structure` and `get_course_gradebook` and turns them into
+response bodies three ways:
+
+* ``validate``: what those endpoints used to do; `Schema.model_validate` in
+  the endpoint, then FastAPI's `serialize_response` against the route's
+  `response_model` and a stdlib `JSONResponse`;
+* ``orjson``: the same with `ORJSONResponse`, the new default response
+  class;
+* ``adapter``: `model_response`, validating once through a cached
+  `TypeAdapter` and dumping JSON in pydantic-core.
+
+and prints the mean time per response for each. No database is needed.
+
+Usage: python bench_serialization.py [iterations]
+"""
+
+import asyncio
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from typing import Any, Callable, List
+
+import fastapi.utils
+from base import BaseScript
+from fastapi.routing import serialize_response
+from starlette.responses import JSONResponse
+
+from app.api.responses import ORJSONResponse, serialize
+from app.schemas.course_version import CourseWithContentResponse
+from app.schemas.module import ModuleResponse
+from app.schemas.progress import GradebookResponse
+
+# Renamed from create_response_field in newer FastAPI releases
+create_field = getattr(fastapi.utils, "create_model_field", None) or fastapi.utils.create_response_field
+
+NOW = datetime(2024, 9, 1, 8, 0)
+
+
+def _base_row(**fields: Any) -> SimpleNamespace:
+    return SimpleNamespace(
+        id=uuid.uuid4(),
+        created_at=NOW,
+        updated_at=NOW,
+        is_active=True,
+        is_deleted=False,
+        deleted_at=None,
+        **fields
+    )
+
+
+def _modules(count: int = 200) -> List[SimpleNamespace]:
+    content_id = uuid.uuid4()
+    return [
+        _base_row(
+            title=f"Module {i}",
+            description="Covers the fundamentals with worked examples and exercises. " * 3,
+            sequence_number=i,
+            duration_weeks=2,
+            content_id=content_id,
+            status="published",
+        )
+        for i in range(1, count + 1)
+    ]
+
+
+def _course_structure(versions: int = 50) -> SimpleNamespace:
+    course_id = uuid.uuid4()
+    return _base_row(
+        title="Introduction to Python Programming",
+        description="A beginner-friendly course on Python programming",
+        code="PYTHON-101",
+        status="published",
+        cover_image_url=None,
+        settings={"grading": {"pass_mark": 60, "weights": {"quiz": 0.4, "assignment": 0.6}}},
+        difficulty_level="beginner",
+        tags=["python", "programming", "beginner"],
+        estimated_duration=40,
+        learning_objectives=[f"Objective {i}" for i in range(10)],
+        target_audience=["students"],
+        prerequisites=[],
+        completion_criteria={"min_progress": 0.8},
+        grade_level="10",
+        academic_year="2024-2025",
+        sequence_number=1,
+        base_price=49.0,
+        currency="USD",
+        pricing_type="one-time",
+        created_by_id=uuid.uuid4(),
+        latest_version_id=uuid.uuid4(),
+        content_id=uuid.uuid4(),
+        versions=[
+            _base_row(
+                course_id=course_id,
+                version=f"1.{i}",
+                content_id=uuid.uuid4(),
+                valid_from=NOW + timedelta(days=i),
+                valid_until=None,
+                changelog={"summary": f"Release 1.{i}"},
+                content=None,
+            )
+            for i in range(versions)
+        ],
+    )
+
+
+def _gradebook(students: int = 300, lessons: int = 40) -> dict:
+    return {
+        "course_id": uuid.uuid4(),
+        "school_id": uuid.uuid4(),
+        "version_id": uuid.uuid4(),
+        "status_codes": ["not_started", "in_progress", "completed"],
+        "students": [
+            {
+                "enrollment_id": uuid.uuid4(),
+                "student_id": uuid.uuid4(),
+                "enrollment_number": f"S{i:05d}",
+                "first_name": "Ada",
+                "last_name": "Lovelace",
+            }
+            for i in range(students)
+        ],
+        "lessons": [
+            {"id": uuid.uuid4(), "module_id": uuid.uuid4(), "title": f"Lesson {j}"}
+            for j in range(lessons)
+        ],
+        "status": [[(i + j) % 3 for j in range(lessons)] for i in range(students)],
+        "progress": [[((i * j) % 100) / 100 for j in range(lessons)] for i in range(students)],
+        "score": [[None if j % 5 else 87.5 for j in range(lessons)] for i in range(students)],
+        "student_progress": [0.5] * students,
+        "student_average_score": [87.5] * students,
+        "lesson_completion_rate": [0.25] * lessons,
+    }
+
+
+def _legacy(response_model: Any, validate: Callable, response_class) -> Callable:
+    field = create_field(name="Response", type_=response_model)
+
+    async def render(rows: Any) -> bytes:
+        content = await serialize_response(field=field, response_content=validate(rows))
+        return response_class(content).body
+
+    return render
+
+
+async def _adapter(response_model: Any, rows: Any) -> bytes:
+    # What model_response does when the response is sent
+    return serialize(response_model, rows)
+
+
+async def _run(render: Callable, rows: Any, iterations: int) -> float:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        await render(rows)
+    return (time.perf_counter() - started) / iterations
+
+
+async def main() -> None:
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    cases = {
+        "modules": (
+            List[ModuleResponse],
+            _modules(),
+            lambda rows: [ModuleResponse.model_validate(row) for row in rows],
+        ),
+        "structure": (
+            CourseWithContentResponse,
+            _course_structure(),
+            CourseWithContentResponse.model_validate,
+        ),
+        "gradebook": (
+            GradebookResponse,
+            _gradebook(),
+            lambda gradebook: GradebookResponse(**gradebook),
+        ),
+    }
+    for case, (response_model, rows, validate) in cases.items():
+        renderers = {
+            "validate": _legacy(response_model, validate, JSONResponse),
+            "orjson": _legacy(response_model, validate, ORJSONResponse),
+            "adapter": lambda rows, response_model=response_model: _adapter(response_model, rows),
+        }
+        for name, render in renderers.items():
+            await _run(render, rows, 10)  # warm up
+            per_response = await _run(render, rows, iterations)
+            size = len(await render(rows))
+            BaseScript.print_info(
+                f"{case:10} {name:9} {per_response * 1e3:8.2f} ms/response  {size} bytes"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -7,7 +7,7 @@ from uuid import uuid4
 from sqlalchemy import select
 
 from base import BaseScript
-from app.security.password import get_password_hash
+from app.security.password import get_password_hash_async
 from app.models.user import User, UserRole, UserStatus
 
 class SuperAdminScript(BaseScript):
@@ -39,7 +39,7 @@ class SuperAdminScript(BaseScript):
             super_admin = User(
                 id=uuid4(),
                 email=email,
-                password=get_password_hash(password),
+                password=await get_password_hash_async(password),
                 first_name=first_name,
                 last_name=last_name,
                 role=UserRole.SUPER_ADMIN.value,
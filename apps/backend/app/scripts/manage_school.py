@@ -8,7 +8,7 @@ from typing import Optional, Tuple
 from sqlalchemy import select, and_
 
 from base import BaseScript
-from app.security.password import get_password_hash
+from app.security.password import get_password_hash_async
 from app.models.user import User, UserRole, UserStatus
 from app.models.school import School
 
@@ -62,7 +62,7 @@ class SchoolScript(BaseScript):
             admin = User(
                 id=uuid4(),
                 email=admin_email,
-                password=get_password_hash(admin_password),
+                password=await get_password_hash_async(admin_password),
                 first_name=admin_first_name,
                 last_name=admin_last_name,
                 role=UserRole.SCHOOL_ADMIN.value,
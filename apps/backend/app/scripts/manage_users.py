@@ -8,9 +8,11 @@ from typing import Optional
 from sqlalchemy import select
 
 from base import BaseScript
-from app.security.password import get_password_hash
+from app.core.process_pool import shutdown_process_pool
+from app.security.password import get_password_hash_async
 from app.models.user import User, UserRole, UserStatus
 from app.models.school import School
+from app.services.user_import import UserImportService, parse_import_file
 
 class UserScript(BaseScript):
     """Script for managing users."""
@@ -57,7 +59,7 @@ class UserScript(BaseScript):
             user = User(
                 id=uuid4(),
                 email=email,
-                password=get_password_hash(password),
+                password=await get_password_hash_async(password),
                 first_name=first_name,
                 last_name=last_name,
                 role=role,
@@ -124,7 +126,7 @@ class UserScript(BaseScript):
             
             # Handle password separately
             if 'password' in kwargs:
-                kwargs['password'] = get_password_hash(kwargs.pop('password'))
+                kwargs['password'] = await get_password_hash_async(kwargs.pop('password'))
             
             # Handle school domain
             if 'school_domain' in kwargs:
@@ -150,6 +152,42 @@ class UserScript(BaseScript):
             
             cls.print_success(f"Updated user: {user.email}")
 
+    @classmethod
+    async def import_users(
+        cls,
+        path: str,
+        school_domain: str,
+        dry_run: bool = False
+    ) -> None:
+        """Bulk import users from a CSV or NDJSON file into a school."""
+        file_format = "ndjson" if path.lower().endswith((".ndjson", ".jsonl")) else "csv"
+        with open(path, "rb") as f:
+            rows = parse_import_file(f.read(), file_format)
+
+        async with cls.get_db() as db:
+            school = await db.scalar(
+                select(School).where(School.domain == school_domain)
+            )
+            if not school:
+                cls.print_error(f"School with domain {school_domain} not found")
+                return
+
+            try:
+                result = await UserImportService.import_rows(
+                    db, school.id, rows, dry_run=dry_run
+                )
+            finally:
+                shutdown_process_pool()
+
+        for error in result.errors:
+            cls.print_warning(f"Row {error.row} ({error.email or '-'}): {error.error}")
+        if dry_run:
+            cls.print_info(
+                f"Dry run: {result.total - len(result.errors)} of {result.total} rows would be created"
+            )
+        else:
+            cls.print_success(f"Imported {result.created} of {result.total} users into {school.name}")
+
     @classmethod
     async def create_from_input(cls) -> None:
         """Create user from user input."""
@@ -198,6 +236,17 @@ async def main():
             idx = sys.argv.index("--role")
             filters["role"] = sys.argv[idx + 1]
         await script.list_users(**filters)
+    elif len(sys.argv) >= 3 and sys.argv[1] == "import":
+        # Bulk import from a file
+        if "--school" not in sys.argv:
+            script.print_error("Usage: python manage_users.py import <file.csv|file.ndjson> --school domain [--dry-run]")
+            sys.exit(1)
+        idx = sys.argv.index("--school")
+        await script.import_users(
+            sys.argv[2],
+            sys.argv[idx + 1],
+            dry_run="--dry-run" in sys.argv
+        )
     elif len(sys.argv) >= 6:
         # Command line mode
         email = sys.argv[2]
@@ -218,7 +267,8 @@ async def main():
     else:
         script.print_error(
             "Usage: python manage_users.py create [email password first_name last_name role school_domain]\n"
-            "       python manage_users.py list [--school domain] [--role role]"
+            "       python manage_users.py list [--school domain] [--role role]\n"
+            "       python manage_users.py import <file.csv|file.ndjson> --school domain [--dry-run]"
         )
         sys.exit(1)
 
@@ -0,0 +1,97 @@
+"""Cold-start profile of a web worker.
+
+Starts fresh interpreters and measures, for a worker booting from nothing:
+
+* ``interpreter``: starting Python itself (``python -c pass``);
+* ``import``: importing `app.main` (routers, schemas, models, engines);
+* ``lifespan``: the lifespan startup hook (warm-up, bcrypt calibration,
+  replica lag check, background workers).
+
+and prints the import time spent per top-level package (from
+``python -X importtime``), heaviest first. Exits with status 1 when the
+cold start exceeds the target, so autoscaling budgets can be checked in CI.
+The lifespan step starts the background workers, so point the settings at
+a reachable database and Redis for representative numbers.
+
+Usage: python profile_startup.py [target_seconds] [packages]
+"""
+
+import json
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, Tuple
+
+from base import BaseScript
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent.parent
+
+DEFAULT_TARGET_SECONDS = 3.0
+
+CHILD = """
+import asyncio, json, logging, time
+started = time.perf_counter()
+import app.main
+imported = time.perf_counter()
+logging.disable(logging.CRITICAL)
+
+async def run():
+    async with app.main.app.router.lifespan_context(app.main.app):
+        ready = time.perf_counter()
+        print(json.dumps({"import": imported - started, "lifespan": ready - imported}), flush=True)
+
+asyncio.run(run())
+"""
+
+
+def _python(*args: str) -> Tuple[float, subprocess.CompletedProcess]:
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, *args], cwd=BACKEND_DIR, capture_output=True, text=True
+    )
+    elapsed = time.perf_counter() - started
+    if result.returncode != 0:
+        BaseScript.print_error(result.stderr.strip().splitlines()[-1] if result.stderr else "failed")
+        sys.exit(2)
+    return elapsed, result
+
+
+def _import_times() -> Dict[str, float]:
+    """Self import time in seconds per top-level package."""
+    _, result = _python("-X", "importtime", "-c", "import app.main")
+    totals: Dict[str, float] = defaultdict(float)
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        totals[name.strip().split(".")[0]] += int(self_us) / 1e6
+    return totals
+
+
+def main() -> None:
+    target = float(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_TARGET_SECONDS
+    packages = int(sys.argv[2]) if len(sys.argv) > 2 else 15
+
+    interpreter, _ = _python("-c", "pass")
+    _, result = _python("-c", CHILD)
+    phases = json.loads(result.stdout.strip().splitlines()[-1])
+    cold_start = interpreter + phases["import"] + phases["lifespan"]
+
+    BaseScript.print_info(f"interpreter {interpreter * 1e3:8.0f} ms")
+    BaseScript.print_info(f"import      {phases['import'] * 1e3:8.0f} ms")
+    BaseScript.print_info(f"lifespan    {phases['lifespan'] * 1e3:8.0f} ms")
+
+    totals = _import_times()
+    for name, seconds in sorted(totals.items(), key=lambda item: item[1], reverse=True)[:packages]:
+        BaseScript.print_info(f"  {name:24} {seconds * 1e3:8.1f} ms")
+
+    if cold_start > target:
+        BaseScript.print_error(f"Cold start {cold_start:.2f} s exceeds the {target:.2f} s target")
+        sys.exit(1)
+    BaseScript.print_success(f"Cold start {cold_start:.2f} s (target {target:.2f} s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -8,7 +8,7 @@ from sqlalchemy import select
 
 from app.db.session import AsyncSessionLocal
 from app.models.user import User, UserStatus, UserRole
-from app.security.password import get_password_hash
+from app.security.password import get_password_hash_async
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -30,7 +30,7 @@ async def create_test_user() -> None:
             test_user = User(
                 id=uuid4(),
                 email="test@example.com",
-                password=get_password_hash("Test123!@#"),
+                password=await get_password_hash_async("Test123!@#"),
                 first_name="Test",
                 last_name="User",
                 role=UserRole.STUDENT.value,
@@ -1,18 +1,23 @@
 """Authentication utilities."""
 
-from datetime import datetime, timedelta
-from typing import Optional
-from uuid import UUID
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Tuple
+from uuid import UUID, uuid4
 
 from fastapi import HTTPException, status
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
+from app.core.tracing import trace_service
 from app.models.user import User, UserStatus
+from app.schemas.auth import Token
 from app.security.jwt import create_token, decode_token, verify_token_type
-from app.security.password import get_password_hash, verify_password
+from app.security.password import get_password_hash, verify_and_update_password_async
+from app.security.principal import Principal, principal_cache
+from app.security.revocation import token_revocations
 
+@trace_service
 class AuthService:
     """Service for handling authentication."""
 
@@ -22,12 +27,19 @@ class AuthService:
         email: str,
         password: str
     ) -> Optional[User]:
-        """Authenticate user."""
+        """Authenticate user.
+
+        A hash stored at an out-of-policy bcrypt cost is replaced on success;
+        the caller's commit persists it.
+        """
         user = await db.scalar(select(User).where(User.email == email))
         if not user:
             return None
-        if not verify_password(password, user.password):
+        valid, new_hash = await verify_and_update_password_async(password, user.password)
+        if not valid:
             return None
+        if new_hash:
+            user.password = new_hash
         if user.is_active == False:
             return None
         return user
@@ -35,24 +47,36 @@ class AuthService:
     @staticmethod
     async def create_access_token(
         user_id: UUID,
-        expires_delta: Optional[timedelta] = None
+        expires_delta: Optional[timedelta] = None,
+        family: Optional[str] = None,
+        school_id: Optional[UUID] = None
     ) -> str:
-        """Create access token."""
+        """Create access token.
+
+        `school_id` is carried as the `sch` claim so per-school rate limits
+        can be applied without a lookup.
+        """
         if expires_delta:
             expire = datetime.utcnow() + expires_delta
         else:
             expire = datetime.utcnow() + timedelta(
                 minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES
             )
-        return create_token(
-            data={"sub": str(user_id), "type": "access"},
-            expires_delta=expire
-        )
+        data = {
+            "sub": str(user_id),
+            "type": "access",
+            "jti": uuid4().hex,
+            "fam": family or uuid4().hex
+        }
+        if school_id:
+            data["sch"] = str(school_id)
+        return create_token(data=data, expires_delta=expire)
 
     @staticmethod
     async def create_refresh_token(
         user_id: UUID,
-        expires_delta: Optional[timedelta] = None
+        expires_delta: Optional[timedelta] = None,
+        family: Optional[str] = None
     ) -> str:
         """Create refresh token."""
         if expires_delta:
@@ -62,16 +86,48 @@ class AuthService:
                 minutes=settings.REFRESH_TOKEN_EXPIRE_MINUTES
             )
         return create_token(
-            data={"sub": str(user_id), "type": "refresh"},
+            data={
+                "sub": str(user_id),
+                "type": "refresh",
+                "jti": uuid4().hex,
+                "fam": family or uuid4().hex
+            },
             expires_delta=expire
         )
 
+    @staticmethod
+    async def create_token_pair(
+        user_id: UUID,
+        family: Optional[str] = None,
+        school_id: Optional[UUID] = None
+    ) -> Token:
+        """Issue an access and refresh token in one family.
+
+        A new login starts a new family; refreshing keeps the family, so
+        logging out (or a detected refresh token reuse) revokes every token
+        descended from the same login.
+        """
+        family = family or uuid4().hex
+        access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+        return Token(
+            access_token=await AuthService.create_access_token(
+                user_id, expires_delta=access_token_expires, family=family, school_id=school_id
+            ),
+            refresh_token=await AuthService.create_refresh_token(
+                user_id,
+                expires_delta=timedelta(minutes=settings.REFRESH_TOKEN_EXPIRE_MINUTES),
+                family=family
+            ),
+            token_type="bearer",
+            expires_at=datetime.utcnow() + access_token_expires
+        )
+
     @staticmethod
     async def get_current_user(
         db: AsyncSession,
         token: str
-    ) -> User:
-        """Get current user from token."""
+    ) -> Principal:
+        """Get the cached principal of the token's user."""
         credentials_exception = HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate credentials",
@@ -84,27 +140,36 @@ class AuthService:
                 raise credentials_exception
 
             user_id = UUID(payload["sub"])
-            if not user_id:
+            if not user_id or not payload.get("jti"):
                 raise credentials_exception
         except Exception:
             raise credentials_exception
 
-        user = await db.scalar(select(User).where(User.id == user_id))
-        if not user:
+        if await token_revocations.is_revoked(db, payload["jti"], payload.get("fam")):
             raise credentials_exception
-        if user.is_active == False:
+
+        principal = await principal_cache.get(db, user_id)
+        if not principal:
             raise credentials_exception
-        return user
+        if principal.is_active == False:
+            raise credentials_exception
+        return principal
 
     @staticmethod
-    async def get_current_user_from_refresh_token(
+    async def rotate_refresh_token(
         db: AsyncSession,
         token: str
-    ) -> UUID:
-        """Get user ID from refresh token."""
+    ) -> Tuple[UUID, str]:
+        """Spend a refresh token. Returns its user ID and token family.
+
+        Each refresh token is single use: it is revoked as it is exchanged.
+        Presenting one that was already spent means it leaked (or the client
+        replayed it), so its whole family is revoked and the user has to log
+        in again. That revocation is committed before the 401 is raised.
+        """
         credentials_exception = HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not validate credentials",
+            detail="Invalid refresh token",
             headers={"WWW-Authenticate": "Bearer"},
         )
 
@@ -114,8 +179,44 @@ class AuthService:
                 raise credentials_exception
 
             user_id = UUID(payload["sub"])
-            if not user_id:
-                raise credentials_exception
-            return user_id
+            jti, family = payload["jti"], payload["fam"]
+            expires_at = datetime.fromtimestamp(payload["exp"], timezone.utc)
         except Exception:
-            raise credentials_exception 
\ No newline at end of file
+            raise credentials_exception
+
+        if await token_revocations.is_revoked(db, family):
+            raise credentials_exception
+
+        if not await token_revocations.revoke(db, jti, "refresh", expires_at, user_id):
+            await AuthService.revoke_family(db, family, user_id)
+            await db.commit()
+            raise credentials_exception
+        return user_id, family
+
+    @staticmethod
+    async def revoke_family(
+        db: AsyncSession,
+        family: str,
+        user_id: Optional[UUID] = None
+    ) -> None:
+        """Revoke every token issued from one login."""
+        # No token of the family can outlive a refresh token issued now
+        expires_at = datetime.now(timezone.utc) + timedelta(
+            minutes=max(settings.REFRESH_TOKEN_EXPIRE_MINUTES, settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+        )
+        await token_revocations.revoke(db, family, "family", expires_at, user_id)
+
+    @staticmethod
+    async def logout(db: AsyncSession, token: str) -> None:
+        """Revoke the session an access token belongs to."""
+        try:
+            payload = decode_token(token)
+            user_id = UUID(payload["sub"])
+            family = payload["fam"]
+        except Exception:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Could not validate credentials",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        await AuthService.revoke_family(db, family, user_id)
@@ -1,13 +1,182 @@
-"""Password handling utilities."""
+"""Password handling utilities.
+
+bcrypt is deliberately slow (hundreds of milliseconds per hash at the default
+cost), so async code must never call `verify_password` or `get_password_hash`
+directly: doing so stalls every other request on the worker's event loop.
+Use the `*_async` variants, which run the work in a small dedicated thread
+pool. bcrypt releases the GIL while hashing, so threads run in parallel.
+
+At most PASSWORD_HASH_MAX_CONCURRENCY hashes may be running or queued at once
+per process. Callers beyond that wait up to PASSWORD_HASH_QUEUE_TIMEOUT_SECONDS
+for a slot and then get ServiceUnavailableError, so a login burst degrades
+into fast 503s instead of an unbounded queue.
+
+The bcrypt cost is SECURITY_BCRYPT_ROUNDS until `calibrate_bcrypt_rounds()`
+runs at startup. It then times a hash on this machine and picks the highest
+cost whose hash fits in SECURITY_BCRYPT_TARGET_MS, clamped to
+SECURITY_BCRYPT_MIN_ROUNDS..SECURITY_BCRYPT_MAX_ROUNDS. A higher target buys
+stronger hashes with fewer logins per second per worker; set
+SECURITY_BCRYPT_CALIBRATE to false to pin the cost to SECURITY_BCRYPT_ROUNDS.
+
+Stored hashes whose cost is more than SECURITY_BCRYPT_REHASH_TOLERANCE away
+from the configured cost are re-hashed on the next successful login (see
+`verify_and_update_password_async`). The tolerance keeps hosts that
+calibrate one step apart from re-hashing the same users back and forth.
+"""
+
+import asyncio
+import functools
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, Tuple, TypeVar
 
 from passlib.context import CryptContext
+from passlib.hash import bcrypt
+
+from app.core.config import settings
+from app.core.exceptions import ServiceUnavailableError
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+T = TypeVar("T")
+
+logger = logging.getLogger(__name__)
+
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.SECURITY_BCRYPT_ROUNDS
+)
+
+_bcrypt_rounds: int = settings.SECURITY_BCRYPT_ROUNDS
+_executor: Optional[ThreadPoolExecutor] = None
+_slots: Optional[asyncio.Semaphore] = None
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify a password against a hash."""
+    """Verify a password against a hash. Blocking; see verify_password_async."""
     return pwd_context.verify(plain_password, hashed_password)
 
 def get_password_hash(password: str) -> str:
-    """Generate password hash."""
-    return pwd_context.hash(password)
\ No newline at end of file
+    """Generate password hash. Blocking; see get_password_hash_async."""
+    return pwd_context.hash(password)
+
+def verify_and_update_password(
+    plain_password: str,
+    hashed_password: str
+) -> Tuple[bool, Optional[str]]:
+    """Verify a password and re-hash it if its cost is out of policy.
+
+    Returns (valid, new_hash); new_hash is None unless the stored hash
+    should be replaced. Blocking; see verify_and_update_password_async.
+    """
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+def current_bcrypt_rounds() -> int:
+    """The bcrypt cost new hashes are created with."""
+    return _bcrypt_rounds
+
+def configure_bcrypt_rounds(rounds: int) -> None:
+    """Hash new passwords at `rounds` and flag hashes outside the tolerance."""
+    global _bcrypt_rounds
+    _bcrypt_rounds = rounds
+    tolerance = settings.SECURITY_BCRYPT_REHASH_TOLERANCE
+    pwd_context.update(
+        bcrypt__default_rounds=rounds,
+        bcrypt__min_rounds=max(4, rounds - tolerance),
+        bcrypt__max_rounds=min(31, rounds + tolerance)
+    )
+
+def measure_bcrypt_rounds(
+    target_ms: float,
+    min_rounds: int,
+    max_rounds: int,
+    samples: int = 3
+) -> int:
+    """Return the highest cost whose hash takes at most `target_ms` here.
+
+    Only `min_rounds` is timed (best of `samples`, to skip warm-up noise);
+    each extra round doubles the work, so larger costs are extrapolated.
+    Blocking.
+    """
+    hasher = bcrypt.using(rounds=min_rounds)
+    elapsed = min(
+        _time_call(hasher.hash, "bcrypt-calibration") for _ in range(samples)
+    ) * 1000
+    rounds = min_rounds
+    while rounds < max_rounds and elapsed * 2 <= target_ms:
+        rounds += 1
+        elapsed *= 2
+    return rounds
+
+def _time_call(func: Callable[..., object], *args) -> float:
+    started = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - started
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.PASSWORD_HASH_MAX_WORKERS,
+            thread_name_prefix="password-hash"
+        )
+    return _executor
+
+async def _run_limited(func: Callable[..., T], *args) -> T:
+    """Run a hashing call in the pool once a concurrency slot is free."""
+    global _slots
+    if _slots is None:
+        _slots = asyncio.Semaphore(settings.PASSWORD_HASH_MAX_CONCURRENCY)
+    try:
+        await asyncio.wait_for(_slots.acquire(), settings.PASSWORD_HASH_QUEUE_TIMEOUT_SECONDS)
+    except asyncio.TimeoutError:
+        raise ServiceUnavailableError("Too many concurrent password operations, try again shortly")
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_get_executor(), functools.partial(func, *args))
+    finally:
+        _slots.release()
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password against a hash without blocking the event loop."""
+    return await _run_limited(verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    """Generate a password hash without blocking the event loop."""
+    return await _run_limited(get_password_hash, password)
+
+async def verify_and_update_password_async(
+    plain_password: str,
+    hashed_password: str
+) -> Tuple[bool, Optional[str]]:
+    """`verify_and_update_password` without blocking the event loop."""
+    return await _run_limited(verify_and_update_password, plain_password, hashed_password)
+
+async def calibrate_bcrypt_rounds() -> int:
+    """Pick and apply the bcrypt cost for this machine. Returns the cost."""
+    if not settings.SECURITY_BCRYPT_CALIBRATE:
+        rounds = settings.SECURITY_BCRYPT_ROUNDS
+    else:
+        loop = asyncio.get_running_loop()
+        rounds = await loop.run_in_executor(
+            _get_executor(),
+            functools.partial(
+                measure_bcrypt_rounds,
+                settings.SECURITY_BCRYPT_TARGET_MS,
+                settings.SECURITY_BCRYPT_MIN_ROUNDS,
+                settings.SECURITY_BCRYPT_MAX_ROUNDS
+            )
+        )
+    configure_bcrypt_rounds(rounds)
+    logger.info(
+        "bcrypt cost set to %d (target %sms, calibrated: %s)",
+        rounds, settings.SECURITY_BCRYPT_TARGET_MS, settings.SECURITY_BCRYPT_CALIBRATE
+    )
+    return rounds
+
+def shutdown_password_hashing() -> None:
+    """Shut down the hashing thread pool."""
+    global _executor, _slots
+    if _executor is not None:
+        _executor.shutdown(wait=True)
+    _executor = None
+    _slots = None
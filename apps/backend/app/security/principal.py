@@ -0,0 +1,244 @@
+"""Cached authenticated principals.
+
+Every authenticated request needs the caller's role, school and active flag,
+which used to cost a `users` lookup (and a `schools` lookup for school-scoped
+routes) per request. A `Principal` is a small immutable snapshot of those
+fields plus the caller's profile IDs, loaded with one query and cached:
+
+* in process, for PRINCIPAL_CACHE_LOCAL_TTL_SECONDS (a few seconds), so hot
+  users cost no I/O at all;
+* in Redis, for PRINCIPAL_CACHE_TTL_SECONDS, shared by all workers.
+
+Redis entries are keyed by user ID and a per-user generation counter.
+`invalidate()` increments the generation, which orphans every entry written
+under the old one, including an entry a concurrent request is just writing
+from a pre-update read. Services call `invalidate_on_commit()` whenever they
+change a user's role, school or active flag: the generation is bumped at once
+and again after the transaction commits.
+
+Other workers may serve their in-process copy until it expires, so a
+suspension takes effect everywhere within PRINCIPAL_CACHE_LOCAL_TTL_SECONDS.
+Without Redis the generation counters live in process memory.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Dict, Optional, Set, Tuple
+from uuid import UUID
+
+from sqlalchemy import and_, event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.metrics import record_cache
+from app.core.redis import get_redis
+from app.models.school import School
+from app.models.user import StudentProfile, TeacherProfile, User, UserRole
+
+logger = logging.getLogger(__name__)
+
+GENERATION_KEY_PREFIX = f"{settings.CACHE_KEY_PREFIX}principal:generation:"
+PRINCIPAL_KEY_PREFIX = f"{settings.CACHE_KEY_PREFIX}principal:"
+# Outlives any cached principal, so an expired counter cannot resurrect old entries
+GENERATION_TTL_SECONDS = 7 * 24 * 3600
+
+_UUID_FIELDS = ("id", "school_id", "student_profile_id", "teacher_profile_id")
+
+
+@dataclass(frozen=True)
+class SchoolRef:
+    """The caller's school, as far as request handling needs it."""
+
+    id: UUID
+    name: str
+
+
+@dataclass(frozen=True)
+class Principal:
+    """Snapshot of the authenticated user.
+
+    Stands in for the `User` row as `current_user` in endpoints and
+    services, which only read `id`, `role`, `school_id` and `is_active`.
+    Load the `User` explicitly when the full row is needed.
+    """
+
+    id: UUID
+    role: str
+    school_id: Optional[UUID]
+    school_name: Optional[str]
+    is_active: bool
+    student_profile_id: Optional[UUID]
+    teacher_profile_id: Optional[UUID]
+
+    @property
+    def is_superuser(self) -> bool:
+        return self.role == UserRole.SUPER_ADMIN
+
+    @property
+    def school(self) -> Optional[SchoolRef]:
+        """The caller's school, if it exists and is active."""
+        if self.school_id is None or self.school_name is None:
+            return None
+        return SchoolRef(id=self.school_id, name=self.school_name)
+
+    def to_json(self) -> str:
+        data = asdict(self)
+        for field in _UUID_FIELDS:
+            if data[field] is not None:
+                data[field] = str(data[field])
+        return json.dumps(data)
+
+    @classmethod
+    def from_json(cls, raw: str) -> "Principal":
+        data = json.loads(raw)
+        for field in _UUID_FIELDS:
+            if data[field] is not None:
+                data[field] = UUID(data[field])
+        return cls(**data)
+
+
+async def load_principal(db: AsyncSession, user_id: UUID) -> Optional[Principal]:
+    """Read a principal from the database. Deleted users have none.
+
+    `school_name` is only set while the school is active, which is what
+    `get_current_school` checks.
+    """
+    row = (await db.execute(
+        select(
+            User.id,
+            User.role,
+            User.is_active,
+            User.school_id,
+            School.name.label("school_name"),
+            StudentProfile.id.label("student_profile_id"),
+            TeacherProfile.id.label("teacher_profile_id")
+        )
+        .outerjoin(
+            School,
+            and_(School.id == User.school_id, School.is_active.is_(True), School.is_deleted.is_(False))
+        )
+        .outerjoin(StudentProfile, StudentProfile.user_id == User.id)
+        .outerjoin(TeacherProfile, TeacherProfile.user_id == User.id)
+        .where(User.id == user_id, User.is_deleted.is_(False))
+        .limit(1)
+    )).first()
+    if row is None:
+        return None
+    return Principal(
+        id=row.id,
+        role=row.role,
+        school_id=row.school_id,
+        school_name=row.school_name,
+        is_active=bool(row.is_active),
+        student_profile_id=row.student_profile_id,
+        teacher_profile_id=row.teacher_profile_id
+    )
+
+
+class PrincipalCache:
+    """Two-level cache of principals keyed by user ID and generation."""
+
+    def __init__(self) -> None:
+        # user_id -> (expires_at, principal)
+        self._local: "OrderedDict[UUID, Tuple[float, Principal]]" = OrderedDict()
+        self._generations: Dict[UUID, int] = {}
+        self._pending: Set[asyncio.Task] = set()
+
+    async def get(self, db: AsyncSession, user_id: UUID) -> Optional[Principal]:
+        """Return the principal of `user_id`, loading it on a miss."""
+        now = time.monotonic()
+        cached = self._local.get(user_id)
+        if cached is not None and cached[0] > now:
+            self._local.move_to_end(user_id)
+            record_cache("principal", "local", True)
+            return cached[1]
+        record_cache("principal", "local", False)
+
+        redis = await get_redis()
+        generation = await self._generation(redis, user_id)
+        if redis is not None:
+            try:
+                raw = await redis.get(f"{PRINCIPAL_KEY_PREFIX}{user_id}:{generation}")
+                record_cache("principal", "redis", raw is not None)
+                if raw is not None:
+                    principal = Principal.from_json(raw)
+                    self._remember(user_id, principal, now)
+                    return principal
+            except Exception as e:
+                logger.warning("Principal cache read failed: %s", e)
+
+        principal = await load_principal(db, user_id)
+        if principal is None:
+            return None
+        if redis is not None:
+            try:
+                await redis.set(
+                    f"{PRINCIPAL_KEY_PREFIX}{user_id}:{generation}",
+                    principal.to_json(),
+                    ex=settings.PRINCIPAL_CACHE_TTL_SECONDS
+                )
+            except Exception as e:
+                logger.warning("Principal cache write failed: %s", e)
+        # A bump that raced with the load means the row we read may be stale
+        if generation == await self._generation(redis, user_id):
+            self._remember(user_id, principal, now)
+        return principal
+
+    async def invalidate(self, user_id: UUID) -> None:
+        """Drop the cached principal of `user_id` in every worker."""
+        self._local.pop(user_id, None)
+        self._generations[user_id] = self._generations.get(user_id, 0) + 1
+        redis = await get_redis()
+        if redis is None:
+            return
+        key = f"{GENERATION_KEY_PREFIX}{user_id}"
+        try:
+            async with redis.pipeline(transaction=True) as pipe:
+                pipe.incr(key)
+                pipe.expire(key, GENERATION_TTL_SECONDS)
+                await pipe.execute()
+        except Exception as e:
+            logger.warning("Principal cache invalidation failed for %s: %s", user_id, e)
+
+    async def invalidate_on_commit(self, db: AsyncSession, user_id: UUID) -> None:
+        """Invalidate now and once more after `db` commits.
+
+        The first bump stops other requests from reusing the old entry; the
+        second discards anything cached from rows read before the commit.
+        """
+        await self.invalidate(user_id)
+
+        def after_commit(session) -> None:
+            task = asyncio.get_running_loop().create_task(self.invalidate(user_id))
+            self._pending.add(task)
+            task.add_done_callback(self._pending.discard)
+
+        event.listen(db.sync_session, "after_commit", after_commit, once=True)
+
+    def clear(self) -> None:
+        """Forget everything cached in this process."""
+        self._local.clear()
+        self._generations.clear()
+
+    async def _generation(self, redis, user_id: UUID) -> int:
+        if redis is None:
+            return self._generations.get(user_id, 0)
+        try:
+            value = await redis.get(f"{GENERATION_KEY_PREFIX}{user_id}")
+        except Exception as e:
+            logger.warning("Principal generation read failed: %s", e)
+            return self._generations.get(user_id, 0)
+        return int(value) if value is not None else 0
+
+    def _remember(self, user_id: UUID, principal: Principal, now: float) -> None:
+        self._local[user_id] = (now + settings.PRINCIPAL_CACHE_LOCAL_TTL_SECONDS, principal)
+        self._local.move_to_end(user_id)
+        while len(self._local) > settings.PRINCIPAL_CACHE_MAX_SIZE:
+            self._local.popitem(last=False)
+
+
+principal_cache = PrincipalCache()
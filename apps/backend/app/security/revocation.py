@@ -0,0 +1,178 @@
+"""Token revocation.
+
+Every token carries a `jti` (its own ID) and a `fam` (the ID shared by all
+tokens issued from one login and its refreshes). Revoking inserts the ID
+into `revoked_tokens`, the source of truth. Logout revokes the family;
+refresh rotation revokes each refresh token as it is used.
+
+Checking the table on every request would cost a query per request, so each
+worker keeps a Bloom filter of all unexpired revoked IDs. An ID absent from
+the filter is definitely not revoked and is accepted without I/O; only the
+rare hit (a revoked token, or a false positive at
+TOKEN_REVOCATION_FILTER_ERROR_RATE) is confirmed against the table.
+
+Filters are kept in sync through a Redis stream: a revocation is appended to
+the stream and every worker's sync task reads new entries every
+TOKEN_REVOCATION_SYNC_INTERVAL_SECONDS. Bloom filters cannot forget, so each
+worker also rebuilds its filter from the table every
+TOKEN_REVOCATION_REBUILD_SECONDS, which drops expired IDs and catches up on
+anything missed. Without Redis, other workers only learn of a revocation at
+their next rebuild. Until the first rebuild succeeds every check goes to the
+table.
+"""
+
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+from uuid import UUID
+
+from sqlalchemy import delete, exists, func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.background import PeriodicTask
+from app.core.config import settings
+from app.core.redis import get_redis
+from app.db.session import AsyncSessionLocal
+from app.models.token import RevokedToken
+from app.utils.bloom import BloomFilter
+
+logger = logging.getLogger(__name__)
+
+STREAM_KEY = f"{settings.CACHE_KEY_PREFIX}revoked_tokens"
+
+
+class TokenRevocationList:
+    """Revocation store with a per-process Bloom filter in front of it."""
+
+    def __init__(self) -> None:
+        self._filter = self._new_filter(0)
+        self._ready = False
+        self._stream_id = "0-0"
+        self._last_rebuild = 0.0
+        # IDs revoked locally while a rebuild is reading the table
+        self._added_during_rebuild: Optional[List[str]] = None
+
+    @staticmethod
+    def _new_filter(entries: int) -> BloomFilter:
+        return BloomFilter(
+            max(settings.TOKEN_REVOCATION_FILTER_CAPACITY, entries * 2),
+            settings.TOKEN_REVOCATION_FILTER_ERROR_RATE
+        )
+
+    async def is_revoked(self, db: AsyncSession, *token_ids: Optional[str]) -> bool:
+        """Whether any of `token_ids` (a jti, a family ID) has been revoked."""
+        if self._ready:
+            candidates = [token_id for token_id in token_ids if token_id and token_id in self._filter]
+        else:
+            candidates = [token_id for token_id in token_ids if token_id]
+        if not candidates:
+            return False
+        return bool(await db.scalar(
+            select(exists().where(
+                RevokedToken.jti.in_(candidates),
+                RevokedToken.expires_at > func.now()
+            ))
+        ))
+
+    async def revoke(
+        self,
+        db: AsyncSession,
+        token_id: str,
+        kind: str,
+        expires_at: datetime,
+        user_id: Optional[UUID] = None
+    ) -> bool:
+        """Revoke a token or family ID until `expires_at`.
+
+        Returns False when the ID was already revoked. Takes effect in the
+        database when `db` commits; the ID is published to other workers
+        straight away, since a filter hit for a rolled-back revocation only
+        costs a lookup.
+        """
+        inserted = await db.scalar(
+            pg_insert(RevokedToken)
+            .values(jti=token_id, kind=kind, expires_at=expires_at, user_id=user_id)
+            .on_conflict_do_nothing(index_elements=[RevokedToken.jti])
+            .returning(RevokedToken.jti)
+        )
+        self._filter.add(token_id)
+        if self._added_during_rebuild is not None:
+            self._added_during_rebuild.append(token_id)
+
+        redis = await get_redis()
+        if redis is not None:
+            try:
+                await redis.xadd(
+                    STREAM_KEY,
+                    {"jti": token_id},
+                    maxlen=settings.TOKEN_REVOCATION_STREAM_MAXLEN,
+                    approximate=True
+                )
+            except Exception as e:
+                logger.warning("Could not publish token revocation: %s", e)
+        return inserted is not None
+
+    async def sync(self) -> None:
+        """Pull new revocations from Redis, rebuilding the filter when due."""
+        # An overfilled filter's false-positive rate climbs, so rebuild it larger
+        if (
+            not self._ready
+            or self._filter.is_full
+            or time.monotonic() - self._last_rebuild >= settings.TOKEN_REVOCATION_REBUILD_SECONDS
+        ):
+            await self.rebuild()
+            return
+
+        redis = await get_redis()
+        if redis is None:
+            return
+        response = await redis.xread({STREAM_KEY: self._stream_id}, count=1000)
+        for _stream, messages in response or []:
+            for message_id, fields in messages:
+                self._filter.add(fields["jti"])
+                self._stream_id = message_id
+
+    async def rebuild(self) -> None:
+        """Reload the filter from the table and drop long-expired rows."""
+        redis = await get_redis()
+        stream_id = self._stream_id
+        if redis is not None:
+            # Read the stream position first so nothing published during the
+            # table scan is skipped by the next sync
+            latest = await redis.xrevrange(STREAM_KEY, count=1)
+            stream_id = latest[0][0] if latest else "0-0"
+
+        self._added_during_rebuild = []
+        try:
+            async with AsyncSessionLocal() as session:
+                await session.execute(
+                    delete(RevokedToken).where(
+                        RevokedToken.expires_at < datetime.now(timezone.utc) - timedelta(hours=1)
+                    )
+                )
+                token_ids = (await session.scalars(
+                    select(RevokedToken.jti).where(RevokedToken.expires_at > func.now())
+                )).all()
+                await session.commit()
+
+            rebuilt = self._new_filter(len(token_ids))
+            rebuilt.update(token_ids)
+            rebuilt.update(self._added_during_rebuild)
+        finally:
+            self._added_during_rebuild = None
+
+        self._filter = rebuilt
+        self._stream_id = stream_id
+        self._last_rebuild = time.monotonic()
+        self._ready = True
+
+
+token_revocations = TokenRevocationList()
+
+token_revocation_sync = PeriodicTask(
+    "token-revocation-sync",
+    token_revocations.sync,
+    settings.TOKEN_REVOCATION_SYNC_INTERVAL_SECONDS
+)
@@ -7,18 +7,23 @@ from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.exception_handlers import NotFoundException, ValidationError, PermissionError
+from app.core.tracing import trace_service
+from app.db.routing import replica_reads
 from app.models.user import User, UserRole, UserStatus
 from app.models.school import School
 from app.models.course import Course
 from app.models.purchase import CoursePurchase
 from app.schemas.user import UserCreate, UserUpdate
-from app.security.password import get_password_hash
+from app.security.password import get_password_hash_async
+from app.security.principal import principal_cache
 
 
+@trace_service
 class AdminService:
     """Service for performing administrative operations."""
     
     @staticmethod
+    @replica_reads
     async def get_platform_stats(
         db: AsyncSession,
         current_user: User
@@ -146,7 +151,7 @@ class AdminService:
         # Create new user
         user_dict = user_data.model_dump(exclude={"password"})
         user = User(**user_dict)
-        user.hashed_password = get_password_hash(user_data.password)
+        user.password = await get_password_hash_async(user_data.password)
         
         # Ensure admin user has appropriate role
         if user.role not in [UserRole.SUPER_ADMIN, UserRole.SCHOOL_ADMIN]:
@@ -175,14 +180,15 @@ class AdminService:
         if not user:
             raise NotFoundException("User not found")
             
-        # Update status
-        user.status = new_status
+        # Update status; User.status is derived from is_active
         user.is_active = active
-        
+
         await db.flush()
+        await principal_cache.invalidate_on_commit(db, user.id)
         return user
     
     @staticmethod
+    @replica_reads
     async def get_content_stats(
         db: AsyncSession,
         current_user: User
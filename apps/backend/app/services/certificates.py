@@ -0,0 +1,286 @@
+"""Completion certificate pipeline.
+
+The API never renders anything: completing a course (or asking for a
+certificate explicitly) only inserts a row into `certificate_jobs`. A
+background worker claims pending jobs in batches, renders the PDFs in the
+shared process pool, writes them under CERTIFICATE_DIR and records the URL on
+both the job and the enrollment. Clients poll the job for its status.
+
+Jobs left in `processing` by a worker that died are reclaimed once they are
+older than CERTIFICATE_STALE_AFTER_SECONDS. Rendering is idempotent, since
+the file name is derived from the job, so a reclaimed job is simply redone.
+"""
+
+import asyncio
+import logging
+from datetime import timedelta
+from typing import Dict, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import String, and_, case, cast, column, func, or_, select, update, values
+from sqlalchemy.dialects.postgresql import UUID as PgUUID, insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.background import PeriodicTask
+from app.core.config import settings
+from app.core.exceptions import NotFoundException, ValidationError
+from app.core.process_pool import run_in_process
+from app.core.tracing import trace_service
+from app.db.session import AsyncSessionLocal
+from app.models.certificate import CertificateJob
+from app.models.course import Course
+from app.models.enrollment import CourseEnrollment
+from app.models.enums import CertificateJobStatus, EnrollmentStatus
+from app.models.user import StudentProfile, User
+from app.utils.certificate_pdf import render_certificates
+
+logger = logging.getLogger(__name__)
+
+
+@trace_service
+class CertificateService:
+    """Service for queueing and tracking certificate jobs."""
+
+    @staticmethod
+    def _enqueue_statement():
+        """INSERT of a pending job that re-queues a job which had failed."""
+        stmt = pg_insert(CertificateJob)
+        return stmt.on_conflict_do_update(
+            index_elements=[CertificateJob.enrollment_id],
+            set_={
+                "status": CertificateJobStatus.PENDING.value,
+                "attempts": 0,
+                "last_error": None,
+                "updated_at": func.now(),
+            },
+            where=CertificateJob.status == CertificateJobStatus.FAILED.value
+        )
+
+    @staticmethod
+    async def enqueue(db: AsyncSession, enrollment: CourseEnrollment) -> CertificateJob:
+        """Queue a certificate for a completed enrollment.
+
+        Idempotent: an existing pending, running or finished job is returned
+        as is, and a failed job is queued again.
+        """
+        if enrollment.status != EnrollmentStatus.COMPLETED.value:
+            raise ValidationError("Certificates are only issued for completed enrollments")
+
+        await db.execute(
+            CertificateService._enqueue_statement().values(enrollment_id=enrollment.id)
+        )
+        return await db.scalar(
+            select(CertificateJob)
+            .where(CertificateJob.enrollment_id == enrollment.id)
+            .execution_options(populate_existing=True)
+        )
+
+    @staticmethod
+    async def enqueue_completed(db: AsyncSession, enrollment_ids) -> None:
+        """Queue certificates for those of `enrollment_ids` that completed without one.
+
+        `enrollment_ids` may be a list or a subquery of enrollment IDs.
+        """
+        await db.execute(
+            pg_insert(CertificateJob)
+            .from_select(
+                [CertificateJob.enrollment_id],
+                select(CourseEnrollment.id).where(
+                    CourseEnrollment.id.in_(enrollment_ids),
+                    CourseEnrollment.status == EnrollmentStatus.COMPLETED.value,
+                    CourseEnrollment.certificate_url.is_(None)
+                )
+            )
+            .on_conflict_do_nothing(index_elements=[CertificateJob.enrollment_id])
+        )
+
+    @staticmethod
+    async def get_job(db: AsyncSession, enrollment_id: UUID) -> CertificateJob:
+        """Get the certificate job of an enrollment."""
+        job = await db.scalar(
+            select(CertificateJob).where(CertificateJob.enrollment_id == enrollment_id)
+        )
+        if not job:
+            raise NotFoundException("No certificate has been requested for this enrollment")
+        return job
+
+    @staticmethod
+    async def claim_jobs(db: AsyncSession, batch_size: int) -> List[Tuple[UUID, str, str, str]]:
+        """Mark up to `batch_size` jobs as processing and return what to render.
+
+        Returns (job_id, student_name, course_title, completed_on) per job.
+        """
+        stale = func.now() - timedelta(seconds=settings.CERTIFICATE_STALE_AFTER_SECONDS)
+        # A job that keeps killing or hanging its worker is given up on
+        await db.execute(
+            update(CertificateJob)
+            .where(
+                CertificateJob.status == CertificateJobStatus.PROCESSING.value,
+                CertificateJob.started_at < stale,
+                CertificateJob.attempts >= settings.CERTIFICATE_MAX_ATTEMPTS
+            )
+            .values(
+                status=CertificateJobStatus.FAILED.value,
+                last_error="Rendering did not finish",
+                updated_at=func.now()
+            )
+            .execution_options(synchronize_session=False)
+        )
+        candidates = (
+            select(CertificateJob.id)
+            .where(
+                or_(
+                    CertificateJob.status == CertificateJobStatus.PENDING.value,
+                    and_(
+                        CertificateJob.status == CertificateJobStatus.PROCESSING.value,
+                        CertificateJob.started_at < stale,
+                        CertificateJob.attempts < settings.CERTIFICATE_MAX_ATTEMPTS
+                    )
+                )
+            )
+            .order_by(CertificateJob.created_at)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        claimed = (await db.scalars(
+            update(CertificateJob)
+            .where(CertificateJob.id.in_(candidates.scalar_subquery()))
+            .values(
+                status=CertificateJobStatus.PROCESSING.value,
+                started_at=func.now(),
+                attempts=CertificateJob.attempts + 1,
+                updated_at=func.now()
+            )
+            .returning(CertificateJob.id)
+            .execution_options(synchronize_session=False)
+        )).all()
+        if not claimed:
+            return []
+
+        rows = await db.execute(
+            select(
+                CertificateJob.id,
+                User.first_name,
+                User.last_name,
+                Course.title,
+                func.coalesce(CourseEnrollment.completed_at, func.now())
+            )
+            .join(CourseEnrollment, CourseEnrollment.id == CertificateJob.enrollment_id)
+            .join(Course, Course.id == CourseEnrollment.course_id)
+            .outerjoin(StudentProfile, StudentProfile.id == CourseEnrollment.student_id)
+            .join(
+                User,
+                User.id == func.coalesce(CourseEnrollment.individual_user_id, StudentProfile.user_id)
+            )
+            .where(CertificateJob.id.in_(claimed))
+        )
+        return [
+            (job_id, f"{first_name} {last_name}", title, completed_at.strftime("%B %d, %Y"))
+            for job_id, first_name, last_name, title, completed_at in rows
+        ]
+
+    @staticmethod
+    async def record_results(
+        db: AsyncSession,
+        results: Dict[UUID, Optional[str]]
+    ) -> None:
+        """Write back rendered URLs and failures for a batch of jobs."""
+        rendered = {job_id: certificate_url(job_id) for job_id, error in results.items() if error is None}
+        failed = {job_id: error for job_id, error in results.items() if error is not None}
+
+        if rendered:
+            batch = values(
+                column("job_id", PgUUID(as_uuid=True)),
+                column("url", String),
+                name="rendered_certificates",
+            ).data(list(rendered.items()))
+            await db.execute(
+                update(CertificateJob)
+                .where(CertificateJob.id == batch.c.job_id)
+                .values(
+                    status=CertificateJobStatus.COMPLETED.value,
+                    certificate_url=batch.c.url,
+                    completed_at=func.now(),
+                    last_error=None,
+                    updated_at=func.now()
+                )
+                .execution_options(synchronize_session=False)
+            )
+            await db.execute(
+                update(CourseEnrollment)
+                .where(
+                    CertificateJob.id == batch.c.job_id,
+                    CourseEnrollment.id == CertificateJob.enrollment_id
+                )
+                .values(
+                    certificate_id=cast(batch.c.job_id, String),
+                    certificate_url=batch.c.url,
+                    updated_at=func.now()
+                )
+                .execution_options(synchronize_session=False)
+            )
+
+        for job_id, error in failed.items():
+            await db.execute(
+                update(CertificateJob)
+                .where(CertificateJob.id == job_id)
+                .values(
+                    status=case(
+                        (
+                            CertificateJob.attempts >= settings.CERTIFICATE_MAX_ATTEMPTS,
+                            CertificateJobStatus.FAILED.value
+                        ),
+                        else_=CertificateJobStatus.PENDING.value
+                    ),
+                    last_error=error[:1000],
+                    updated_at=func.now()
+                )
+                .execution_options(synchronize_session=False)
+            )
+
+
+def certificate_url(job_id: UUID) -> str:
+    """Public URL of a rendered certificate."""
+    return f"{settings.CERTIFICATE_URL_PREFIX}/{job_id}.pdf"
+
+
+async def process_certificate_jobs() -> int:
+    """Render one batch of queued certificates. Returns jobs processed."""
+    async with AsyncSessionLocal() as session:
+        items = await CertificateService.claim_jobs(session, settings.CERTIFICATE_BATCH_SIZE)
+        await session.commit()
+    if not items:
+        return 0
+
+    # One chunk per worker so the whole pool renders the batch in parallel
+    chunk_count = min(settings.PROCESS_POOL_MAX_WORKERS, len(items))
+    chunks = [
+        [(str(job_id), name, title, completed_on) for job_id, name, title, completed_on in items[i::chunk_count]]
+        for i in range(chunk_count)
+    ]
+    outcomes = await asyncio.gather(
+        *(run_in_process(render_certificates, settings.CERTIFICATE_DIR, chunk) for chunk in chunks),
+        return_exceptions=True
+    )
+
+    results: Dict[UUID, Optional[str]] = {}
+    for chunk, outcome in zip(chunks, outcomes):
+        if isinstance(outcome, BaseException):
+            logger.error("Certificate render batch failed: %s", outcome)
+            for certificate_id, *_ in chunk:
+                results[UUID(certificate_id)] = str(outcome) or outcome.__class__.__name__
+        else:
+            for certificate_id, error in outcome:
+                results[UUID(certificate_id)] = error
+
+    async with AsyncSessionLocal() as session:
+        await CertificateService.record_results(session, results)
+        await session.commit()
+    return len(results)
+
+
+certificate_worker = PeriodicTask(
+    "certificate-worker",
+    process_certificate_jobs,
+    settings.CERTIFICATE_POLL_INTERVAL_SECONDS
+)
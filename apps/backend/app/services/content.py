@@ -10,12 +10,14 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from app.core.exception_handlers import NotFoundException, ValidationError, PermissionError
+from app.core.tracing import trace_service
 from app.models.course import Course
 from app.models.course_version import CourseContent, CourseVersion
 from app.models.user import User, UserRole
 from app.schemas.course_version import CourseContentCreate, CourseContentUpdate
 
 
+@trace_service
 class ContentService:
     """Service for managing course content and versions."""
 
@@ -128,6 +130,7 @@ class ContentService:
             select(CourseVersion)
             .where(CourseVersion.course_id == course_id)
             .order_by(CourseVersion.valid_from.desc())
+            .limit(1)
         )
         result = await db.execute(query)
         return result.scalar_one_or_none()
@@ -1,3 +1,4 @@
+import logging
 from datetime import datetime
 from typing import List, Optional, Tuple, Dict, Any
 from uuid import UUID
@@ -7,6 +8,7 @@ from sqlalchemy.orm import Session, selectinload, joinedload
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.exception_handlers import NotFoundException, ValidationError, PermissionError
+from app.core.tracing import trace_service
 from app.models.course import (
     Course,
     CourseStatus
@@ -26,6 +28,10 @@ from app.schemas.course_version import CourseContentCreate
 from app.schemas.module import ModuleCreate, ModuleUpdate
 from app.schemas.lesson import LessonCreate
 
+logger = logging.getLogger(__name__)
+
+
+@trace_service
 class CourseService:
     """Service for managing courses and their content."""
 
@@ -293,8 +299,8 @@ class CourseService:
                 pass
 
             return course
-        except Exception as e:
-            print(f"Error in get_course: {str(e)}")
+        except Exception:
+            logger.exception("Error in get_course")
             raise
 
     @staticmethod
@@ -390,8 +396,8 @@ class CourseService:
             
             return courses
             
-        except Exception as e:
-            print(f"Error in list_courses: {str(e)}")
+        except Exception:
+            logger.exception("Error in list_courses")
             raise
 
     @staticmethod
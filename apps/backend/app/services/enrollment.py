@@ -1,30 +1,37 @@
-from datetime import datetime
-from typing import List, Optional, Tuple
+from datetime import datetime, timezone
+from typing import AsyncIterator, List, Optional, Tuple
 from uuid import UUID
 
-from sqlalchemy import and_, or_, select
-from sqlalchemy.orm import Session, joinedload, selectinload
+from sqlalchemy import and_, case, cast, func, or_, select, update
+from sqlalchemy.dialects.postgresql import JSONB, insert as pg_insert
+from sqlalchemy.orm import Session, joinedload
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.exceptions import NotFoundException, ValidationError, PermissionError
+from app.core.tracing import trace_service
 from app.models.course import (
     Course
 )
 from app.models.enrollment import CourseEnrollment
+from app.models.lesson import Lesson
 from app.models.progress import UserProgress
-from app.models.purchase import CourseLicense
 from app.models.enums import EnrollmentStatus, EnrollmentType
-from app.models.user import User, UserRole
+from app.models.user import User, UserRole, StudentProfile
+from app.services.certificates import CertificateService
+from app.services.content import ContentService
+from app.services.purchase import PurchaseService
+from app.services.time_tracking import time_spent_accumulator
 from app.schemas.enrollment import (
     StudentEnrollmentCreate, IndividualEnrollmentCreate,
     EnrollmentUpdate, ProgressCreate
 )
 
+@trace_service
 class EnrollmentService:
     """Service for managing course enrollments and progress."""
 
     @staticmethod
     async def create_student_enrollment(
-        db: Session,
+        db: AsyncSession,
         current_user: User,
         enrollment_data: StudentEnrollmentCreate
     ) -> CourseEnrollment:
@@ -33,46 +40,51 @@ class EnrollmentService:
         if current_user.role not in [UserRole.SCHOOL_ADMIN, UserRole.TEACHER]:
             raise PermissionError("Only school admins and teachers can enroll students")
 
-        # Verify course license
-        license = db.query(CourseLicense).filter(
-            and_(
-                CourseLicense.course_id == enrollment_data.course_id,
-                CourseLicense.school_id == current_user.school_id,
-                CourseLicense.is_active == True
-            )
-        ).first()
-        if not license:
-            raise ValidationError("School does not have a license for this course")
-
         # Verify student belongs to school
-        student = db.query(User).filter(
-            and_(
-                User.id == enrollment_data.student_id,
-                User.school_id == current_user.school_id,
-                User.role == UserRole.STUDENT
+        student = await db.scalar(
+            select(StudentProfile).where(
+                and_(
+                    StudentProfile.id == enrollment_data.student_id,
+                    StudentProfile.school_id == current_user.school_id
+                )
             )
-        ).first()
+        )
         if not student:
             raise ValidationError("Student not found in school")
 
         # Check for existing enrollment
-        existing = db.query(CourseEnrollment).filter(
-            and_(
-                CourseEnrollment.course_id == enrollment_data.course_id,
-                CourseEnrollment.student_id == enrollment_data.student_id
+        existing = await db.scalar(
+            select(CourseEnrollment.id).where(
+                and_(
+                    CourseEnrollment.course_id == enrollment_data.course_id,
+                    CourseEnrollment.student_id == enrollment_data.student_id
+                )
             )
-        ).first()
+        )
         if existing:
             raise ValidationError("Student is already enrolled in this course")
 
+        version = await ContentService.get_latest_course_version(db, enrollment_data.course_id)
+        if not version:
+            raise ValidationError("Course has no published version")
+
+        # Take a seat on the school's license; fails if the license is full
+        license_id = await PurchaseService.reserve_license_seat(
+            db, enrollment_data.course_id, current_user.school_id
+        )
+
         # Create enrollment
         enrollment = CourseEnrollment(
-            **enrollment_data.model_dump(),
+            course_id=enrollment_data.course_id,
+            version_id=version.id,
+            student_id=enrollment_data.student_id,
+            license_id=license_id,
             enrollment_type=EnrollmentType.B2B,
-            status=EnrollmentStatus.ACTIVE,
+            status=enrollment_data.status,
             enrolled_by_id=current_user.id
         )
         db.add(enrollment)
+        await db.flush()
         return enrollment
 
     @staticmethod
@@ -117,15 +129,13 @@ class EnrollmentService:
 
     @staticmethod
     async def update_enrollment_status(
-        db: Session,
+        db: AsyncSession,
         current_user: User,
         enrollment_id: UUID,
         status: EnrollmentStatus
     ) -> CourseEnrollment:
-        """Update enrollment status."""
-        enrollment = db.query(CourseEnrollment).filter(
-            CourseEnrollment.id == enrollment_id
-        ).first()
+        """Update enrollment status, queueing a certificate on completion."""
+        enrollment = await db.get(CourseEnrollment, enrollment_id)
         if not enrollment:
             raise NotFoundException("Enrollment not found")
 
@@ -134,60 +144,231 @@ class EnrollmentService:
             pass  # Can update any enrollment
         elif current_user.role in [UserRole.SCHOOL_ADMIN, UserRole.TEACHER]:
             # Can only update B2B enrollments in their school
-            student = db.query(User).filter(User.id == enrollment.student_id).first()
+            student = await db.get(StudentProfile, enrollment.student_id) if enrollment.student_id else None
             if not student or student.school_id != current_user.school_id:
                 raise PermissionError("Cannot update enrollments outside your school")
         elif current_user.role == UserRole.INDIVIDUAL_USER:
             # Can only update own D2C enrollments
             if enrollment.individual_user_id != current_user.id:
                 raise PermissionError("Cannot update other users' enrollments")
+            # Learners complete a course through their lesson progress, which
+            # the event compactor folds into the enrollment
+            if status == EnrollmentStatus.COMPLETED:
+                raise PermissionError("Cannot mark your own enrollment as completed")
         else:
             raise PermissionError("Insufficient permissions")
 
-        enrollment.status = status
-        db.add(enrollment)
+        completing = (
+            status == EnrollmentStatus.COMPLETED
+            and enrollment.status != EnrollmentStatus.COMPLETED.value
+        )
+        enrollment.status = status.value
+        if completing:
+            enrollment.completed_at = enrollment.completed_at or datetime.now(timezone.utc)
+        await db.flush()
+        if completing:
+            await CertificateService.enqueue_completed(db, [enrollment.id])
         return enrollment
 
     @staticmethod
-    async def update_progress(
-        db: Session,
+    async def delete_enrollment(
+        db: AsyncSession,
         current_user: User,
-        progress_data: ProgressCreate
-    ) -> UserProgress:
-        """Update user progress in a course."""
-        # Verify enrollment exists and user has access
-        enrollment = db.query(CourseEnrollment).filter(
-            CourseEnrollment.id == progress_data.enrollment_id
-        ).first()
+        enrollment_id: UUID
+    ) -> bool:
+        """Delete an enrollment and give its license seat back."""
+        enrollment = await db.get(CourseEnrollment, enrollment_id)
         if not enrollment:
             raise NotFoundException("Enrollment not found")
 
-        if enrollment.student_id:
-            if current_user.role == UserRole.STUDENT and enrollment.student_id != current_user.id:
-                raise PermissionError("Cannot update progress for other students")
+        # Check permissions
+        if current_user.role == UserRole.SUPER_ADMIN:
+            pass  # Can delete any enrollment
+        elif current_user.role in [UserRole.SCHOOL_ADMIN, UserRole.TEACHER]:
+            # Can only delete B2B enrollments in their school
+            student = await db.get(StudentProfile, enrollment.student_id) if enrollment.student_id else None
+            if not student or student.school_id != current_user.school_id:
+                raise PermissionError("Cannot delete enrollments outside your school")
         else:
+            raise PermissionError("Insufficient permissions")
+
+        # Only active enrollments hold a seat
+        if enrollment.license_id and enrollment.is_active:
+            await PurchaseService.release_license_seat(db, enrollment.license_id)
+
+        await db.delete(enrollment)
+        await db.flush()
+        return True
+
+    @staticmethod
+    async def get_learner_enrollment(
+        db: AsyncSession,
+        current_user: User,
+        enrollment_id: UUID
+    ) -> CourseEnrollment:
+        """Get an enrollment the current user is the learner on."""
+        enrollment = await db.get(CourseEnrollment, enrollment_id)
+        if not enrollment:
+            raise NotFoundException("Enrollment not found")
+        if enrollment.individual_user_id:
             if enrollment.individual_user_id != current_user.id:
                 raise PermissionError("Cannot update progress for other users")
+        elif current_user.role == UserRole.STUDENT:
+            if enrollment.student_id != current_user.student_profile_id:
+                raise PermissionError("Cannot update progress for other students")
+        else:
+            raise PermissionError("Only the enrolled learner can report progress")
+        return enrollment
 
-        # Create or update progress
-        progress = db.query(UserProgress).filter(
-            and_(
-                UserProgress.enrollment_id == progress_data.enrollment_id,
-                UserProgress.lesson_id == progress_data.lesson_id
-            )
-        ).first()
+    @staticmethod
+    async def update_progress(
+        db: AsyncSession,
+        current_user: User,
+        progress_data: ProgressCreate
+    ) -> UserProgress:
+        """Update the learner's progress on a lesson and move the resume point."""
+        enrollment = await EnrollmentService.get_learner_enrollment(
+            db, current_user, progress_data.enrollment_id
+        )
 
-        if progress:
-            # Update existing progress
-            for field, value in progress_data.model_dump().items():
-                setattr(progress, field, value)
-        else:
-            # Create new progress
-            progress = UserProgress(**progress_data.model_dump())
-            
-        db.add(progress)
+        now = datetime.now(timezone.utc)
+        completed = progress_data.status == "completed"
+        # Scores are written by quiz grading only; a progress report cannot set one
+        metadata = (
+            {key: value for key, value in progress_data.data.items() if key != "score"}
+            if progress_data.data else None
+        )
+        stmt = pg_insert(UserProgress).values(
+            enrollment_id=enrollment.id,
+            content_type="lesson",
+            content_id=progress_data.lesson_id,
+            status=progress_data.status,
+            progress=1.0 if completed else progress_data.progress / 100,
+            started_at=now,
+            completed_at=now if completed else None,
+            last_interaction=now,
+            time_spent_seconds=progress_data.time_spent,
+            progress_metadata=metadata
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[
+                UserProgress.enrollment_id,
+                UserProgress.content_type,
+                UserProgress.content_id,
+            ],
+            set_={
+                # Completion is sticky and progress never moves back, as in the
+                # event compactor; a late report cannot undo a completed lesson
+                "status": case(
+                    (UserProgress.status == "completed", "completed"),
+                    else_=stmt.excluded.status
+                ),
+                "progress": func.greatest(UserProgress.progress, stmt.excluded.progress),
+                "completed_at": func.coalesce(UserProgress.completed_at, stmt.excluded.completed_at),
+                "last_interaction": stmt.excluded.last_interaction,
+                # Buffered time deltas may already have moved the counter past the client's total
+                "time_spent_seconds": func.greatest(
+                    UserProgress.time_spent_seconds, stmt.excluded.time_spent_seconds
+                ),
+                # Merge, keeping keys such as the quiz score written elsewhere
+                "progress_metadata": func.coalesce(
+                    UserProgress.progress_metadata, cast({}, JSONB)
+                ).op("||")(func.coalesce(stmt.excluded.progress_metadata, cast({}, JSONB))),
+                "updated_at": now,
+            }
+        ).returning(UserProgress)
+        progress = await db.scalar(stmt, execution_options={"populate_existing": True})
+
+        await EnrollmentService.advance_resume_point(
+            db, enrollment.id, progress_data.lesson_id, progress_data.last_position, now
+        )
         return progress
 
+    @staticmethod
+    async def advance_resume_point(
+        db: AsyncSession,
+        enrollment_id: UUID,
+        lesson_id: UUID,
+        position: Optional[str],
+        at: datetime
+    ) -> None:
+        """Point the enrollment's resume pointer at a lesson.
+        
+        Writes that arrive out of order never move the pointer backwards.
+        """
+        await db.execute(
+            update(CourseEnrollment)
+            .where(
+                CourseEnrollment.id == enrollment_id,
+                or_(
+                    CourseEnrollment.resume_updated_at.is_(None),
+                    CourseEnrollment.resume_updated_at <= at
+                )
+            )
+            .values(
+                resume_lesson_id=lesson_id,
+                resume_position=position,
+                resume_updated_at=at,
+                last_activity_at=func.greatest(CourseEnrollment.last_activity_at, at)
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+    @staticmethod
+    async def record_time_spent(
+        db: AsyncSession,
+        current_user: User,
+        enrollment_id: UUID,
+        lesson_id: UUID,
+        seconds: int
+    ) -> None:
+        """Buffer a time-spent delta; it reaches the progress rows on the next flush."""
+        await EnrollmentService.get_learner_enrollment(db, current_user, enrollment_id)
+        await time_spent_accumulator.add(enrollment_id, lesson_id, seconds)
+
+    @staticmethod
+    async def list_continue_learning(
+        db: AsyncSession,
+        current_user: User,
+        limit: int = 20
+    ) -> List[Tuple]:
+        """List the current user's active enrollments with their resume point.
+        
+        Most recently active first. One query, served by the partial
+        resume indexes on course_enrollments.
+        """
+        student_ids = select(StudentProfile.id).where(StudentProfile.user_id == current_user.id)
+        query = (
+            select(
+                CourseEnrollment.id.label("enrollment_id"),
+                CourseEnrollment.course_id,
+                Course.title.label("course_title"),
+                CourseEnrollment.status,
+                CourseEnrollment.progress,
+                CourseEnrollment.last_activity_at,
+                CourseEnrollment.resume_lesson_id,
+                CourseEnrollment.resume_position,
+                Lesson.title.label("resume_lesson_title"),
+                Lesson.module_id.label("resume_module_id")
+            )
+            .join(Course, Course.id == CourseEnrollment.course_id)
+            .outerjoin(Lesson, Lesson.id == CourseEnrollment.resume_lesson_id)
+            .where(
+                or_(
+                    CourseEnrollment.individual_user_id == current_user.id,
+                    CourseEnrollment.student_id.in_(student_ids)
+                ),
+                CourseEnrollment.status.in_([
+                    EnrollmentStatus.ENROLLED.value,
+                    EnrollmentStatus.IN_PROGRESS.value
+                ])
+            )
+            .order_by(CourseEnrollment.last_activity_at.desc().nulls_last())
+            .limit(limit)
+        )
+        result = await db.execute(query)
+        return result.all()
+
     @staticmethod
     async def list_enrollments(
         db: AsyncSession,
@@ -229,21 +410,22 @@ class EnrollmentService:
         return enrollments
 
     @staticmethod
-    async def get_enrollment_progress(
+    async def get_readable_enrollment(
         db: AsyncSession,
         current_user: User,
         enrollment_id: UUID
-    ) -> Tuple[CourseEnrollment, List[UserProgress]]:
-        """Get detailed progress for an enrollment."""
+    ) -> CourseEnrollment:
+        """Get an enrollment the current user may read (its progress, certificate, ...).
+        
+        Progress rows are not loaded here; use list_enrollment_progress or
+        stream_enrollment_progress to page through them.
+        """
 
-        # Fetch enrollment with related data eagerly
+        # Fetch enrollment with student info preloaded for the permission check
         result = await db.execute(
             select(CourseEnrollment)
             .where(CourseEnrollment.id == enrollment_id)
-            .options(
-                joinedload(CourseEnrollment.student),  # Ensure student info is preloaded
-                selectinload(CourseEnrollment.lesson_progresses)  # Preload progress records
-            )
+            .options(joinedload(CourseEnrollment.student))
         )
         enrollment = result.scalar_one_or_none()
         
@@ -256,9 +438,83 @@ class EnrollmentService:
         elif current_user.role in [UserRole.SCHOOL_ADMIN, UserRole.TEACHER]:
             if not enrollment.student or enrollment.student.school_id != current_user.school_id:
                 raise PermissionError("Cannot access enrollments outside your school")
-        elif enrollment.student_id == current_user.id or enrollment.individual_user_id == current_user.id:
+        elif (
+            (enrollment.student_id and enrollment.student_id == current_user.student_profile_id)
+            or enrollment.individual_user_id == current_user.id
+        ):
             pass  # Can access own enrollment
         else:
             raise PermissionError("Cannot access this enrollment")
 
-        return enrollment
\ No newline at end of file
+        return enrollment
+
+    @staticmethod
+    def _progress_query(
+        enrollment_id: UUID,
+        module_id: Optional[UUID] = None,
+        status: Optional[str] = None
+    ):
+        """Build the filtered, keyset-ordered progress query for an enrollment."""
+        query = (
+            select(UserProgress)
+            .where(UserProgress.enrollment_id == enrollment_id)
+            .order_by(UserProgress.id)
+        )
+        if module_id:
+            # The module's own row plus the rows of every lesson inside it
+            query = query.where(
+                or_(
+                    and_(
+                        UserProgress.content_type == "module",
+                        UserProgress.content_id == module_id
+                    ),
+                    and_(
+                        UserProgress.content_type == "lesson",
+                        UserProgress.content_id.in_(
+                            select(Lesson.id).where(Lesson.module_id == module_id)
+                        )
+                    )
+                )
+            )
+        if status:
+            query = query.where(UserProgress.status == status)
+        return query
+
+    @staticmethod
+    async def list_enrollment_progress(
+        db: AsyncSession,
+        enrollment_id: UUID,
+        module_id: Optional[UUID] = None,
+        status: Optional[str] = None,
+        cursor: Optional[UUID] = None,
+        limit: int = 100
+    ) -> Tuple[List[UserProgress], Optional[UUID]]:
+        """Get one page of progress rows and the cursor for the next page."""
+        query = EnrollmentService._progress_query(enrollment_id, module_id, status)
+        if cursor:
+            query = query.where(UserProgress.id > cursor)
+
+        # Fetch one extra row to know whether another page exists
+        result = await db.execute(query.limit(limit + 1))
+        items = list(result.scalars().all())
+        next_cursor = None
+        if len(items) > limit:
+            items = items[:limit]
+            next_cursor = items[-1].id
+        return items, next_cursor
+
+    @staticmethod
+    async def stream_enrollment_progress(
+        db: AsyncSession,
+        enrollment_id: UUID,
+        module_id: Optional[UUID] = None,
+        status: Optional[str] = None,
+        batch_size: int = 500
+    ) -> AsyncIterator[UserProgress]:
+        """Stream every matching progress row through a server-side cursor."""
+        query = EnrollmentService._progress_query(enrollment_id, module_id, status)
+        result = await db.stream_scalars(
+            query.execution_options(yield_per=batch_size)
+        )
+        async for progress in result:
+            yield progress
@@ -0,0 +1,158 @@
+"""Teacher gradebook: a class-by-lesson matrix of progress for one course."""
+
+from typing import Any, Dict, Optional
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.exceptions import NotFoundException, PermissionError, ValidationError
+from app.core.tracing import trace_service
+from app.models.enrollment import CourseEnrollment
+from app.models.enums import EnrollmentStatus
+from app.models.lesson import Lesson
+from app.models.module import Module
+from app.models.progress import UserProgress
+from app.models.user import StudentProfile, User, UserRole
+from app.services.content import ContentService
+
+# Index into this tuple is the value stored in the status matrix
+STATUS_CODES = ("not_started", "in_progress", "completed")
+_STATUS_INDEX = {name: code for code, name in enumerate(STATUS_CODES)}
+
+
+@trace_service
+class GradebookService:
+    """Service for building course gradebooks."""
+
+    @staticmethod
+    async def get_gradebook(
+        db: AsyncSession,
+        current_user: User,
+        course_id: UUID,
+        school_id: Optional[UUID] = None,
+        section: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Build the student × lesson gradebook of a course for one school.
+
+        Lessons come from the latest course version, in module and lesson
+        order. All lesson progress rows of the school's enrollments are read in
+        one query and pivoted into dense matrices, returned as nested lists
+        (rows are students, columns are lessons). Missing scores are None.
+        """
+        if current_user.role == UserRole.SUPER_ADMIN:
+            if school_id is None:
+                raise ValidationError("school_id is required")
+        elif current_user.role in [UserRole.SCHOOL_ADMIN, UserRole.TEACHER]:
+            if school_id is not None and school_id != current_user.school_id:
+                raise PermissionError("Cannot view gradebooks of other schools")
+            school_id = current_user.school_id
+        else:
+            raise PermissionError("Only school staff can view gradebooks")
+
+        version = await ContentService.get_latest_course_version(db, course_id)
+        if not version:
+            raise NotFoundException("Course content not found")
+
+        lessons = (await db.execute(
+            select(Lesson.id, Lesson.module_id, Lesson.title)
+            .join(Module, Module.id == Lesson.module_id)
+            .where(Module.content_id == version.content_id)
+            .order_by(Module.sequence_number, Lesson.sequence_number)
+        )).all()
+
+        student_query = (
+            select(
+                CourseEnrollment.id.label("enrollment_id"),
+                StudentProfile.id.label("student_id"),
+                StudentProfile.enrollment_number,
+                User.first_name,
+                User.last_name
+            )
+            .join(StudentProfile, StudentProfile.id == CourseEnrollment.student_id)
+            .join(User, User.id == StudentProfile.user_id)
+            .where(
+                CourseEnrollment.course_id == course_id,
+                StudentProfile.school_id == school_id,
+                # Dropped, suspended and deactivated enrollments would drag the averages down
+                CourseEnrollment.is_active.is_(True),
+                CourseEnrollment.status.not_in(
+                    [EnrollmentStatus.DROPPED.value, EnrollmentStatus.SUSPENDED.value]
+                )
+            )
+            .order_by(User.last_name, User.first_name, StudentProfile.id)
+        )
+        if section:
+            student_query = student_query.where(StudentProfile.section == section)
+        students = (await db.execute(student_query)).all()
+
+        row_index = {student.enrollment_id: i for i, student in enumerate(students)}
+        col_index = {lesson.id: j for j, lesson in enumerate(lessons)}
+        shape = (len(students), len(lessons))
+
+        status = np.zeros(shape, dtype=np.int8)
+        progress = np.zeros(shape, dtype=np.float64)
+        score = np.full(shape, np.nan, dtype=np.float64)
+
+        if students and lessons:
+            progress_rows = (await db.execute(
+                select(
+                    UserProgress.enrollment_id,
+                    UserProgress.content_id,
+                    UserProgress.status,
+                    UserProgress.progress,
+                    UserProgress.progress_metadata["score"].as_float()
+                )
+                .where(
+                    UserProgress.enrollment_id.in_(row_index.keys()),
+                    UserProgress.content_type == "lesson"
+                )
+            )).all()
+
+            if progress_rows:
+                enrollment_ids, lesson_ids, statuses, values, scores = zip(*progress_rows)
+                count = len(progress_rows)
+                rows = np.fromiter((row_index[e] for e in enrollment_ids), dtype=np.intp, count=count)
+                cols = np.fromiter((col_index.get(l, -1) for l in lesson_ids), dtype=np.intp, count=count)
+                # Progress on lessons dropped from the latest version has no column
+                keep = cols >= 0
+                rows, cols = rows[keep], cols[keep]
+
+                status[rows, cols] = np.fromiter(
+                    (_STATUS_INDEX.get(s, 0) for s in statuses), dtype=np.int8, count=count
+                )[keep]
+                progress[rows, cols] = np.fromiter(values, dtype=np.float64, count=count)[keep]
+                score[rows, cols] = np.array(scores, dtype=np.float64)[keep]
+
+        completed = status == _STATUS_INDEX["completed"]
+        scored = ~np.isnan(score)
+        scored_count = scored.sum(axis=1)
+        score_sum = np.where(scored, score, 0.0).sum(axis=1)
+        average_score = np.divide(
+            score_sum, scored_count, out=np.full(len(students), np.nan), where=scored_count > 0
+        )
+
+        return {
+            "course_id": course_id,
+            "school_id": school_id,
+            "version_id": version.id,
+            "status_codes": list(STATUS_CODES),
+            "students": [student._asdict() for student in students],
+            "lessons": [lesson._asdict() for lesson in lessons],
+            "status": status.tolist(),
+            "progress": np.round(progress, 4).tolist(),
+            "score": _nan_to_none(np.round(score, 4)),
+            "student_progress": (
+                np.round(progress.mean(axis=1), 4).tolist() if lessons else [0.0] * len(students)
+            ),
+            "student_average_score": _nan_to_none(np.round(average_score, 4)),
+            "lesson_completion_rate": (
+                np.round(completed.mean(axis=0), 4).tolist() if students else [0.0] * len(lessons)
+            ),
+        }
+
+
+def _nan_to_none(array: np.ndarray) -> list:
+    """Convert an array to nested lists with NaN replaced by None."""
+    return np.where(np.isnan(array), None, array).tolist()
@@ -0,0 +1,439 @@
+"""Append-only learning event log and its compaction into progress rows.
+
+Players report what the learner did as immutable events. Writing an event is
+a plain append to `learning_events`: small batches use one multi-row INSERT,
+large batches are streamed with COPY. Nothing on the write path touches the
+contended `user_progress` or `course_enrollments` rows.
+
+A background compactor folds new events into those tables incrementally. It
+keeps the id of the last event it consumed in `event_compaction_state`, locks
+that row with FOR UPDATE SKIP LOCKED so only one process compacts at a time,
+and advances it in the same transaction that applies the events, so every
+event is folded in exactly once.
+
+The mark is a transaction id, not an event id. Event ids are handed out
+before commit, so an append transaction that runs long (a large COPY, a
+lock wait) can commit ids lower than events already folded, and an id-based
+mark would skip them. Each event instead records the id of the transaction
+that inserted it (`xact_id`), and the compactor only consumes events of
+transactions older than the oldest one still running
+(`pg_snapshot_xmin`): those have all committed or aborted, and every
+transaction still to commit has a higher id.
+"""
+
+import json
+import logging
+from datetime import datetime, timezone
+from typing import List
+
+from sqlalchemy import BigInteger, Float, String, and_, case, cast, func, insert, literal, or_, select, update
+from sqlalchemy.dialects.postgresql import JSONB, UUID as PgUUID, insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.background import PeriodicTask
+from app.core.config import settings
+from app.core.exceptions import PermissionError
+from app.core.tracing import trace_service
+from app.db.session import AsyncSessionLocal
+from app.models.course_version import CourseVersion
+from app.models.enrollment import CourseEnrollment
+from app.models.enums import EnrollmentStatus, LearningEventType
+from app.models.learning_event import EventCompactionState, LearningEvent
+from app.models.lesson import Lesson, QuizAttempt
+from app.models.module import Module
+from app.models.progress import UserProgress
+from app.models.user import StudentProfile, User
+from app.schemas.progress import LearningEventCreate
+from app.services.certificates import CertificateService
+
+logger = logging.getLogger(__name__)
+
+COMPACTION_STATE_NAME = "user_progress"
+UUID_PATTERN = "^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$"
+COPY_COLUMNS = (
+    "enrollment_id",
+    "lesson_id",
+    "event_type",
+    "progress",
+    "score",
+    "time_spent_seconds",
+    "payload",
+    "occurred_at",
+)
+
+
+@trace_service
+class LearningEventService:
+    """Service for appending learning events."""
+
+    @staticmethod
+    async def record_events(
+        db: AsyncSession,
+        current_user: User,
+        events: List[LearningEventCreate]
+    ) -> int:
+        """Append a batch of events reported by the enrolled learner."""
+        enrollment_ids = {event.enrollment_id for event in events}
+        owned = await db.scalars(
+            select(CourseEnrollment.id)
+            .outerjoin(StudentProfile, StudentProfile.id == CourseEnrollment.student_id)
+            .where(
+                CourseEnrollment.id.in_(enrollment_ids),
+                or_(
+                    CourseEnrollment.individual_user_id == current_user.id,
+                    StudentProfile.user_id == current_user.id
+                )
+            )
+        )
+        if set(owned.all()) != enrollment_ids:
+            raise PermissionError("Only the enrolled learner can report learning events")
+
+        return await LearningEventService.append_events(db, events)
+
+    @staticmethod
+    async def append_events(db: AsyncSession, events: List[LearningEventCreate]) -> int:
+        """Append events without any ownership check. Returns rows written."""
+        if not events:
+            return 0
+        now = datetime.now(timezone.utc)
+        rows = [
+            {
+                "enrollment_id": event.enrollment_id,
+                "lesson_id": event.lesson_id,
+                "event_type": event.event_type.value,
+                "progress": event.progress,
+                "score": event.score,
+                "time_spent_seconds": event.time_spent_seconds,
+                "payload": event.payload,
+                "occurred_at": event.occurred_at or now,
+            }
+            for event in events
+        ]
+
+        if len(rows) >= settings.LEARNING_EVENT_COPY_THRESHOLD:
+            conn = await db.connection()
+            raw = await conn.get_raw_connection()
+            # The asyncpg jsonb codec installed by SQLAlchemy expects text
+            records = [
+                tuple(
+                    json.dumps(row[name]) if name == "payload" and row[name] is not None else row[name]
+                    for name in COPY_COLUMNS
+                )
+                for row in rows
+            ]
+            await raw.driver_connection.copy_records_to_table(
+                LearningEvent.__tablename__,
+                records=records,
+                columns=COPY_COLUMNS
+            )
+        else:
+            await db.execute(insert(LearningEvent).values(rows))
+        return len(rows)
+
+
+class LearningEventCompactor:
+    """Folds new learning events into UserProgress and CourseEnrollment."""
+
+    @staticmethod
+    async def compact(
+        db: AsyncSession,
+        batch_size: int = settings.EVENT_COMPACTION_BATCH_SIZE
+    ) -> int:
+        """Apply about `batch_size` events of finished transactions past the high-water mark.
+
+        Returns the number of events consumed, or 0 if there was nothing to do
+        or another process holds the compaction lock. The caller commits.
+        """
+        state = await db.scalar(
+            select(EventCompactionState)
+            .where(EventCompactionState.name == COMPACTION_STATE_NAME)
+            .with_for_update(skip_locked=True)
+        )
+        if state is None:
+            return 0
+
+        # Every transaction below the horizon has finished
+        horizon = cast(
+            cast(func.pg_snapshot_xmin(func.pg_current_snapshot()), String), BigInteger
+        )
+        window = (
+            select(LearningEvent.xact_id)
+            .where(LearningEvent.xact_id > state.high_water_mark, LearningEvent.xact_id < horizon)
+            .order_by(LearningEvent.xact_id)
+            .limit(batch_size)
+            .subquery()
+        )
+        stats = (
+            await db.execute(select(func.max(window.c.xact_id), func.count()).select_from(window))
+        ).one()
+        upper, consumed = stats
+        if upper is None:
+            return 0
+
+        # Whole transactions: the last one may run past `batch_size` events
+        in_window = and_(
+            LearningEvent.xact_id > state.high_water_mark,
+            LearningEvent.xact_id <= upper
+        )
+        await LearningEventCompactor._fold_lesson_progress(db, in_window)
+        await LearningEventCompactor._fold_enrollments(db, in_window)
+        await LearningEventCompactor._fold_resume_points(db, in_window)
+        # Enrollments that just completed get their certificate queued
+        await CertificateService.enqueue_completed(
+            db, select(LearningEvent.enrollment_id).where(in_window).distinct()
+        )
+
+        state.high_water_mark = upper
+        state.updated_at = func.now()
+        return consumed
+
+    @staticmethod
+    async def _fold_lesson_progress(db: AsyncSession, in_window) -> None:
+        """Upsert one lesson-level UserProgress row per (enrollment, lesson).
+
+        The best quiz score is kept in `progress_metadata["score"]`. A quiz
+        submission's score is read from its attempt when the event names one,
+        so an answer-key regrade between submission and compaction wins over
+        the score recorded in the event.
+        """
+        is_completed = LearningEvent.event_type == LearningEventType.COMPLETED.value
+        attempt_id = LearningEvent.payload["attempt_id"].astext
+        attempt = (
+            select(QuizAttempt.score)
+            .where(
+                QuizAttempt.id == case(
+                    (attempt_id.op("~*")(UUID_PATTERN), cast(attempt_id, PgUUID(as_uuid=True))),
+                    else_=None
+                ),
+                QuizAttempt.enrollment_id == LearningEvent.enrollment_id
+            )
+            .scalar_subquery()
+        )
+        events = (
+            select(
+                LearningEvent.enrollment_id,
+                LearningEvent.lesson_id,
+                func.bool_or(is_completed).label("completed"),
+                func.max(LearningEvent.progress).label("progress"),
+                func.min(LearningEvent.occurred_at).label("started_at"),
+                func.min(LearningEvent.occurred_at).filter(is_completed).label("completed_at"),
+                func.max(LearningEvent.occurred_at).label("last_interaction"),
+                func.sum(LearningEvent.time_spent_seconds).label("time_spent_seconds"),
+                func.max(
+                    case(
+                        (
+                            LearningEvent.event_type == LearningEventType.QUIZ_SUBMITTED.value,
+                            func.coalesce(attempt, LearningEvent.score)
+                        ),
+                        else_=LearningEvent.score
+                    )
+                ).label("score"),
+            )
+            .where(in_window)
+            .group_by(LearningEvent.enrollment_id, LearningEvent.lesson_id)
+            .subquery()
+        )
+
+        stmt = pg_insert(UserProgress).from_select(
+            [
+                UserProgress.enrollment_id,
+                UserProgress.content_type,
+                UserProgress.content_id,
+                UserProgress.status,
+                UserProgress.progress,
+                UserProgress.started_at,
+                UserProgress.completed_at,
+                UserProgress.last_interaction,
+                UserProgress.time_spent_seconds,
+                UserProgress.progress_metadata,
+            ],
+            select(
+                events.c.enrollment_id,
+                literal("lesson"),
+                events.c.lesson_id,
+                case((events.c.completed, "completed"), else_="in_progress"),
+                case((events.c.completed, 1.0), else_=func.coalesce(events.c.progress, 0.0)),
+                events.c.started_at,
+                events.c.completed_at,
+                events.c.last_interaction,
+                events.c.time_spent_seconds,
+                case(
+                    (events.c.score.is_not(None), func.jsonb_build_object("score", events.c.score)),
+                    else_=None
+                ),
+            )
+        )
+        excluded = stmt.excluded
+        best_score = func.greatest(
+            UserProgress.progress_metadata["score"].as_float(),
+            excluded.progress_metadata["score"].as_float()
+        )
+        await db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[
+                    UserProgress.enrollment_id,
+                    UserProgress.content_type,
+                    UserProgress.content_id,
+                ],
+                set_={
+                    "status": case(
+                        (
+                            or_(UserProgress.status == "completed", excluded.status == "completed"),
+                            "completed"
+                        ),
+                        else_="in_progress"
+                    ),
+                    "progress": func.greatest(UserProgress.progress, excluded.progress),
+                    "started_at": func.least(UserProgress.started_at, excluded.started_at),
+                    "completed_at": func.coalesce(UserProgress.completed_at, excluded.completed_at),
+                    "last_interaction": func.greatest(
+                        UserProgress.last_interaction, excluded.last_interaction
+                    ),
+                    "time_spent_seconds": UserProgress.time_spent_seconds + excluded.time_spent_seconds,
+                    # Keep the best quiz score seen so far alongside any other metadata
+                    "progress_metadata": case(
+                        (excluded.progress_metadata.is_(None), UserProgress.progress_metadata),
+                        else_=func.coalesce(
+                            UserProgress.progress_metadata, cast({}, JSONB)
+                        ).op("||")(func.jsonb_build_object("score", best_score))
+                    ),
+                    "updated_at": func.now(),
+                }
+            )
+        )
+
+    @staticmethod
+    async def _fold_enrollments(db: AsyncSession, in_window) -> None:
+        """Recompute progress and status of the enrollments that saw events."""
+        touched = (
+            select(
+                LearningEvent.enrollment_id,
+                func.max(LearningEvent.occurred_at).label("last_activity_at")
+            )
+            .where(in_window)
+            .group_by(LearningEvent.enrollment_id)
+            .subquery()
+        )
+        completed_lessons = (
+            select(func.count())
+            .where(
+                UserProgress.enrollment_id == touched.c.enrollment_id,
+                UserProgress.content_type == "lesson",
+                UserProgress.status == "completed"
+            )
+            .scalar_subquery()
+        )
+        total_lessons = (
+            select(func.count(Lesson.id))
+            .join(Module, Module.id == Lesson.module_id)
+            .join(CourseVersion, CourseVersion.content_id == Module.content_id)
+            .where(CourseVersion.id == CourseEnrollment.version_id)
+            .correlate(CourseEnrollment)
+            .scalar_subquery()
+        )
+        stats = (
+            select(
+                touched.c.enrollment_id,
+                touched.c.last_activity_at,
+                completed_lessons.label("completed"),
+                total_lessons.label("total"),
+            )
+            .join(CourseEnrollment, CourseEnrollment.id == touched.c.enrollment_id)
+            .subquery()
+        )
+
+        finished = and_(stats.c.total > 0, stats.c.completed >= stats.c.total)
+        active = CourseEnrollment.status.in_([
+            EnrollmentStatus.ENROLLED.value,
+            EnrollmentStatus.IN_PROGRESS.value
+        ])
+        await db.execute(
+            update(CourseEnrollment)
+            .where(CourseEnrollment.id == stats.c.enrollment_id)
+            .values(
+                progress=case(
+                    (
+                        stats.c.total > 0,
+                        func.least(
+                            1.0,
+                            cast(stats.c.completed, Float) / stats.c.total
+                        )
+                    ),
+                    else_=CourseEnrollment.progress
+                ),
+                last_activity_at=func.greatest(
+                    CourseEnrollment.last_activity_at, stats.c.last_activity_at
+                ),
+                status=case(
+                    (and_(active, finished), EnrollmentStatus.COMPLETED.value),
+                    (
+                        CourseEnrollment.status == EnrollmentStatus.ENROLLED.value,
+                        EnrollmentStatus.IN_PROGRESS.value
+                    ),
+                    else_=CourseEnrollment.status
+                ),
+                completed_at=case(
+                    (
+                        and_(active, finished, CourseEnrollment.completed_at.is_(None)),
+                        stats.c.last_activity_at
+                    ),
+                    else_=CourseEnrollment.completed_at
+                ),
+                updated_at=func.now()
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+
+    @staticmethod
+    async def _fold_resume_points(db: AsyncSession, in_window) -> None:
+        """Move each enrollment's resume pointer to its latest event's lesson.
+
+        The player position is taken from `payload["position"]`.
+        """
+        latest = (
+            select(
+                LearningEvent.enrollment_id,
+                LearningEvent.lesson_id,
+                LearningEvent.payload["position"].astext.label("position"),
+                LearningEvent.occurred_at
+            )
+            .where(in_window)
+            .distinct(LearningEvent.enrollment_id)
+            .order_by(LearningEvent.enrollment_id, LearningEvent.occurred_at.desc())
+            .subquery()
+        )
+        await db.execute(
+            update(CourseEnrollment)
+            .where(
+                CourseEnrollment.id == latest.c.enrollment_id,
+                or_(
+                    CourseEnrollment.resume_updated_at.is_(None),
+                    CourseEnrollment.resume_updated_at <= latest.c.occurred_at
+                )
+            )
+            .values(
+                resume_lesson_id=latest.c.lesson_id,
+                resume_position=func.left(latest.c.position, 100),
+                resume_updated_at=latest.c.occurred_at
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+async def compact_learning_events() -> int:
+    """Drain the event backlog in batches. Returns events consumed."""
+    consumed = 0
+    while True:
+        async with AsyncSessionLocal() as session:
+            batch = await LearningEventCompactor.compact(session)
+            await session.commit()
+        consumed += batch
+        if batch < settings.EVENT_COMPACTION_BATCH_SIZE:
+            return consumed
+
+
+learning_event_compactor = PeriodicTask(
+    "learning-event-compaction",
+    compact_learning_events,
+    settings.EVENT_COMPACTION_INTERVAL_SECONDS
+)
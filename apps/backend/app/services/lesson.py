@@ -8,6 +8,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from app.core.exception_handlers import NotFoundException, ValidationError, PermissionError
+from app.core.tracing import trace_service
 from app.models.module import Module
 from app.models.lesson import Lesson
 from app.models.enums import LessonStatus
@@ -15,6 +16,7 @@ from app.models.user import User, UserRole
 from app.schemas.lesson import LessonCreate, LessonUpdate, ResourceCreate
 
 
+@trace_service
 class LessonService:
     """Service for managing lessons and resources."""
     
@@ -8,6 +8,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from app.core.exception_handlers import NotFoundException, ValidationError, PermissionError
+from app.core.tracing import trace_service
 from app.models.course_version import CourseContent
 from app.models.module import Module
 from app.models.enums import ModuleStatus
@@ -15,6 +16,7 @@ from app.models.user import User, UserRole
 from app.schemas.module import ModuleCreate, ModuleUpdate
 
 
+@trace_service
 class ModuleService:
     """Service for managing course modules."""
     
@@ -71,7 +73,6 @@ class ModuleService:
             module_data_dict["sequence_number"] = next_seq
         else:
             module_data_dict = module_data.model_dump()
-        print("Module data dict: ", module_data_dict)
         # Create module
         module = Module(
             **module_data_dict
@@ -4,15 +4,15 @@ from datetime import datetime
 from typing import List, Optional, Dict, Any
 from uuid import UUID
 
-from sqlalchemy import select, func, and_, or_
+from sqlalchemy import select, update, func, and_, or_
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import joinedload
 
-from app.core.exception_handlers import NotFoundException, ValidationError, PermissionError
+from app.core.exception_handlers import NotFoundException, ValidationError, PermissionError, ConflictError
+from app.core.tracing import trace_service
 from app.models.purchase import CoursePurchase, CourseLicense
 from app.models.course import Course
 from app.models.school import School
-from app.models.enrollment import CourseEnrollment
 from app.models.user import User, UserRole
 from app.models.enums import PaymentStatus
 from app.schemas.purchase import (
@@ -21,6 +21,7 @@ from app.schemas.purchase import (
 )
 
 
+@trace_service
 class PurchaseService:
     """Service for managing course purchases and licenses."""
     
@@ -398,26 +399,87 @@ class PurchaseService:
         if not license:
             return None
             
-        # Count enrollments
-        count_query = (
-            select(func.count(CourseEnrollment.id))
-            .where(
-                CourseEnrollment.course_id == license.course_id,
-                CourseEnrollment.school_id == license.school_id,
-                CourseEnrollment.is_active == True
-            )
-        )
-        count_result = await db.execute(count_query)
-        enrollment_count = count_result.scalar_one()
-        
-        # Create response
+        # Seat counter is maintained by enrollment create/delete, no count needed
         license_dict = {
             "license": license,
-            "enrolled_student_count": enrollment_count
+            "enrolled_student_count": license.seats_used
         }
         
         return license_dict
     
+    @staticmethod
+    async def reserve_license_seat(
+        db: AsyncSession,
+        course_id: UUID,
+        school_id: UUID
+    ) -> UUID:
+        """Atomically take a seat on the school's valid license for a course.
+        
+        The seat check and increment happen in a single conditional UPDATE, so
+        concurrent enrollments can never push seats_used past max_students.
+        Returns the ID of the license the seat was taken on.
+        """
+        now = datetime.utcnow()
+        has_free_seat = or_(
+            CourseLicense.max_students.is_(None),
+            CourseLicense.seats_used < CourseLicense.max_students
+        )
+        target_license = (
+            select(CourseLicense.id)
+            .where(
+                CourseLicense.course_id == course_id,
+                CourseLicense.school_id == school_id,
+                CourseLicense.is_active == True,
+                CourseLicense.valid_from <= now,
+                or_(
+                    CourseLicense.valid_until.is_(None),
+                    CourseLicense.valid_until > now
+                ),
+                has_free_seat
+            )
+            .order_by(CourseLicense.valid_from.desc())
+            .limit(1)
+            .scalar_subquery()
+        )
+        # The seat condition is repeated on the outer UPDATE so Postgres re-checks
+        # it against the latest row version after waiting on a concurrent writer
+        query = (
+            update(CourseLicense)
+            .where(CourseLicense.id == target_license, has_free_seat)
+            .values(seats_used=CourseLicense.seats_used + 1)
+            .returning(CourseLicense.id)
+            .execution_options(synchronize_session=False)
+        )
+        result = await db.execute(query)
+        license_id = result.scalar_one_or_none()
+        if license_id:
+            return license_id
+            
+        license = await PurchaseService.check_license_validity(db, course_id, school_id)
+        if not license:
+            raise ValidationError("School does not have a license for this course")
+        raise ConflictError(
+            "No seats left on this course license",
+            data={"license_id": str(license.id), "max_students": license.max_students}
+        )
+    
+    @staticmethod
+    async def release_license_seat(
+        db: AsyncSession,
+        license_id: UUID
+    ) -> None:
+        """Give back a seat previously taken with reserve_license_seat."""
+        query = (
+            update(CourseLicense)
+            .where(
+                CourseLicense.id == license_id,
+                CourseLicense.seats_used > 0
+            )
+            .values(seats_used=CourseLicense.seats_used - 1)
+            .execution_options(synchronize_session=False)
+        )
+        await db.execute(query)
+    
     @staticmethod
     async def check_license_validity(
         db: AsyncSession,
@@ -439,6 +501,7 @@ class PurchaseService:
                 )
             )
             .order_by(CourseLicense.valid_from.desc())
+            .limit(1)
         )
         result = await db.execute(query)
         return result.scalar_one_or_none() 
\ No newline at end of file
@@ -0,0 +1,281 @@
+"""Quiz attempts: submission, grading and re-grading."""
+
+from typing import List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import Boolean, Float, Integer, cast, column, func, literal, select, update, values
+from sqlalchemy.dialects.postgresql import JSONB, UUID as PgUUID, insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.exceptions import ConflictError, NotFoundException, PermissionError, ValidationError
+from app.core.tracing import trace_service
+from app.models.enums import LearningEventType
+from app.models.lesson import LessonQuiz, QuizAttempt
+from app.models.progress import UserProgress
+from app.models.user import User, UserRole
+from app.schemas.progress import LearningEventCreate
+from app.schemas.quiz import QuizAnswerKeyUpdate, QuizSubmission
+from app.services.enrollment import EnrollmentService
+from app.services.learning_events import LearningEventService
+from app.services.quiz_grading import CompiledQuiz, compile_quiz, forget_quiz
+
+# A concurrent submission can take the attempt number we computed; retry with the next one
+ATTEMPT_INSERT_RETRIES = 3
+
+
+@trace_service
+class QuizService:
+    """Service for quiz attempts and grading."""
+
+    @staticmethod
+    async def get_quiz(db: AsyncSession, quiz_id: UUID) -> LessonQuiz:
+        """Get an active quiz."""
+        quiz = await db.get(LessonQuiz, quiz_id)
+        if not quiz or not quiz.is_active:
+            raise NotFoundException("Quiz not found")
+        return quiz
+
+    @staticmethod
+    async def submit_attempt(
+        db: AsyncSession,
+        current_user: User,
+        quiz_id: UUID,
+        submission: QuizSubmission
+    ) -> QuizAttempt:
+        """Grade and record an attempt, enforcing the quiz's max_attempts.
+
+        The attempt is inserted with the next attempt number only while that
+        number is within `max_attempts`; the unique (quiz, enrollment, number)
+        constraint turns a concurrent submission into a conflict rather than
+        an extra attempt. The result is appended to the learning event log so
+        it reaches lesson progress on the next compaction.
+        """
+        enrollment = await EnrollmentService.get_learner_enrollment(
+            db, current_user, submission.enrollment_id
+        )
+        quiz = await QuizService.get_quiz(db, quiz_id)
+
+        scores, correct, passed = compile_quiz(quiz).grade([submission.answers])
+        score, correct_count, is_passed = float(scores[0]), int(correct[0]), bool(passed[0])
+
+        attempts_so_far = (
+            select(func.coalesce(func.max(QuizAttempt.attempt_number), 0))
+            .where(QuizAttempt.quiz_id == quiz.id, QuizAttempt.enrollment_id == enrollment.id)
+            .scalar_subquery()
+        )
+        row = select(
+            literal(quiz.id, PgUUID(as_uuid=True)),
+            literal(enrollment.id, PgUUID(as_uuid=True)),
+            attempts_so_far + 1,
+            literal(submission.answers, JSONB),
+            literal(score, Float),
+            literal(correct_count, Integer),
+            literal(is_passed, Boolean)
+        )
+        if quiz.max_attempts is not None:
+            row = row.where(attempts_so_far < quiz.max_attempts)
+        stmt = (
+            pg_insert(QuizAttempt)
+            .from_select(
+                [
+                    QuizAttempt.quiz_id,
+                    QuizAttempt.enrollment_id,
+                    QuizAttempt.attempt_number,
+                    QuizAttempt.answers,
+                    QuizAttempt.score,
+                    QuizAttempt.correct_count,
+                    QuizAttempt.passed,
+                ],
+                row
+            )
+            .on_conflict_do_nothing(constraint="uq_quiz_attempts_quiz_enrollment_number")
+            .returning(QuizAttempt.id)
+        )
+
+        attempt_id = None
+        for _ in range(ATTEMPT_INSERT_RETRIES):
+            attempt_id = await db.scalar(stmt)
+            if attempt_id is not None:
+                break
+            used = await db.scalar(select(attempts_so_far))
+            if quiz.max_attempts is not None and used >= quiz.max_attempts:
+                raise ConflictError(
+                    "No attempts left on this quiz",
+                    data={"quiz_id": str(quiz.id), "max_attempts": quiz.max_attempts}
+                )
+        if attempt_id is None:
+            raise ConflictError("Another attempt was submitted at the same time, please retry")
+
+        events = [
+            LearningEventCreate(
+                enrollment_id=enrollment.id,
+                lesson_id=quiz.lesson_id,
+                event_type=LearningEventType.QUIZ_SUBMITTED,
+                score=score,
+                payload={"quiz_id": str(quiz.id), "attempt_id": str(attempt_id)}
+            )
+        ]
+        if is_passed:
+            events.append(LearningEventCreate(
+                enrollment_id=enrollment.id,
+                lesson_id=quiz.lesson_id,
+                event_type=LearningEventType.COMPLETED,
+                progress=1.0
+            ))
+        await LearningEventService.append_events(db, events)
+
+        return await db.get(QuizAttempt, attempt_id)
+
+    @staticmethod
+    async def list_attempts(
+        db: AsyncSession,
+        current_user: User,
+        quiz_id: UUID,
+        enrollment_id: UUID
+    ) -> Tuple[LessonQuiz, List[QuizAttempt]]:
+        """List the learner's attempts on a quiz, oldest first."""
+        await EnrollmentService.get_learner_enrollment(db, current_user, enrollment_id)
+        quiz = await QuizService.get_quiz(db, quiz_id)
+        result = await db.scalars(
+            select(QuizAttempt)
+            .where(QuizAttempt.quiz_id == quiz_id, QuizAttempt.enrollment_id == enrollment_id)
+            .order_by(QuizAttempt.attempt_number)
+        )
+        return quiz, list(result.all())
+
+    @staticmethod
+    async def update_answer_key(
+        db: AsyncSession,
+        current_user: User,
+        quiz_id: UUID,
+        update_data: QuizAnswerKeyUpdate
+    ) -> Tuple[LessonQuiz, int]:
+        """Replace a quiz's questions and re-grade every recorded attempt.
+
+        The number of questions cannot change, since stored answers are
+        positional. Returns the quiz and the number of attempts re-graded.
+        """
+        if current_user.role != UserRole.SUPER_ADMIN:
+            raise PermissionError("Only super admins can change answer keys")
+
+        quiz = await QuizService.get_quiz(db, quiz_id)
+        if len(update_data.questions) != len(quiz.questions):
+            raise ValidationError(
+                f"Answer key must keep all {len(quiz.questions)} questions; "
+                "create a new quiz to change the question count"
+            )
+        passing_score = (
+            update_data.passing_score if update_data.passing_score is not None else quiz.passing_score
+        )
+        compiled = CompiledQuiz(update_data.questions, passing_score)
+
+        quiz.questions = update_data.questions
+        quiz.passing_score = passing_score
+        await db.flush()
+        forget_quiz(quiz.id)
+
+        regraded = await QuizService.regrade_attempts(db, quiz, compiled)
+        await db.refresh(quiz)
+        return quiz, regraded
+
+    @staticmethod
+    async def regrade_attempts(
+        db: AsyncSession,
+        quiz: LessonQuiz,
+        compiled: Optional[CompiledQuiz] = None,
+        chunk_size: int = settings.QUIZ_REGRADE_CHUNK_SIZE
+    ) -> int:
+        """Re-score all attempts of a quiz against its current answer key.
+
+        Attempts are read in keyset-paginated chunks, graded as one NumPy batch
+        per chunk and written back with one UPDATE ... FROM (VALUES ...). The
+        best score kept on each learner's lesson progress is then recomputed,
+        and learners with an attempt that now passes get a COMPLETED event for
+        the lesson. Submissions not yet compacted take their score from the
+        attempt, so compaction does not bring back a pre-regrade score.
+        """
+        compiled = compiled or compile_quiz(quiz)
+        regraded = 0
+        newly_passed = set()
+        last_id: Optional[UUID] = None
+        while True:
+            query = (
+                select(
+                    QuizAttempt.id, QuizAttempt.answers, QuizAttempt.enrollment_id, QuizAttempt.passed
+                )
+                .where(QuizAttempt.quiz_id == quiz.id)
+                .order_by(QuizAttempt.id)
+                .limit(chunk_size)
+            )
+            if last_id is not None:
+                query = query.where(QuizAttempt.id > last_id)
+            rows = (await db.execute(query)).all()
+            if not rows:
+                break
+
+            attempt_ids, answers, enrollment_ids, was_passed = zip(*rows)
+            scores, correct, passed = compiled.grade(answers)
+            newly_passed.update(
+                enrollment_id
+                for enrollment_id, before, now in zip(enrollment_ids, was_passed, passed.tolist())
+                if now and not before
+            )
+            batch = values(
+                column("attempt_id", PgUUID(as_uuid=True)),
+                column("score", Float),
+                column("correct_count", Integer),
+                column("passed", Boolean),
+                name="regraded_attempts",
+            ).data(list(zip(attempt_ids, scores.tolist(), correct.tolist(), passed.tolist())))
+            await db.execute(
+                update(QuizAttempt)
+                .where(QuizAttempt.id == batch.c.attempt_id)
+                .values(
+                    score=batch.c.score,
+                    correct_count=batch.c.correct_count,
+                    passed=batch.c.passed,
+                    graded_at=func.now(),
+                    updated_at=func.now()
+                )
+                .execution_options(synchronize_session=False)
+            )
+
+            regraded += len(rows)
+            last_id = attempt_ids[-1]
+            if len(rows) < chunk_size:
+                break
+
+        best = (
+            select(QuizAttempt.enrollment_id, func.max(QuizAttempt.score).label("score"))
+            .where(QuizAttempt.quiz_id == quiz.id)
+            .group_by(QuizAttempt.enrollment_id)
+            .subquery()
+        )
+        await db.execute(
+            update(UserProgress)
+            .where(
+                UserProgress.enrollment_id == best.c.enrollment_id,
+                UserProgress.content_type == "lesson",
+                UserProgress.content_id == quiz.lesson_id
+            )
+            .values(
+                progress_metadata=func.coalesce(
+                    UserProgress.progress_metadata, cast({}, JSONB)
+                ).op("||")(func.jsonb_build_object("score", best.c.score)),
+                updated_at=func.now()
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+        await LearningEventService.append_events(db, [
+            LearningEventCreate(
+                enrollment_id=enrollment_id,
+                lesson_id=quiz.lesson_id,
+                event_type=LearningEventType.COMPLETED,
+                progress=1.0,
+                payload={"quiz_id": str(quiz.id), "reason": "regrade"}
+            )
+            for enrollment_id in newly_passed
+        ])
+        return regraded
@@ -0,0 +1,138 @@
+"""Vectorised quiz grading.
+
+A quiz's answer key is compiled once into a boolean matrix of shape
+(questions, options + 1) marking the correct options, plus a weight per
+question. A batch of submissions becomes a boolean tensor of shape
+(attempts, questions, options + 1) holding the selected options. A question
+counts as correct when the selected options exactly match the key, so
+grading the whole batch is a single comparison and reduction:
+
+    correct = (selected == key).all(axis=2)
+    score = correct @ weights / weights.sum()
+
+The extra last column catches out-of-range option indexes. It is never set
+in the key, so an invalid choice always makes the question wrong.
+
+Questions follow the stored `LessonQuiz.questions` format:
+`{"type": "multiple_choice", "options": [...], "correct_answer": 1}`.
+`correct_answer` may also be a list of indexes for multi-select questions.
+An optional `points` value weights the question; the default weight is 1.
+"""
+
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, List, Sequence, Tuple
+from uuid import UUID
+
+import numpy as np
+
+from app.core.exceptions import ValidationError
+from app.core.metrics import record_cache
+
+COMPILED_CACHE_SIZE = 1024
+
+
+def _as_indexes(value: Any) -> List[int]:
+    """Normalise an answer (index, list of indexes or None) to a list of ints."""
+    if value is None:
+        return []
+    if isinstance(value, bool):
+        # JSON true/false would otherwise silently become options 1 and 0
+        raise ValidationError("Answers must be option indexes")
+    if isinstance(value, int):
+        return [value]
+    if isinstance(value, list) and all(isinstance(v, int) and not isinstance(v, bool) for v in value):
+        return value
+    raise ValidationError("Answers must be option indexes")
+
+
+class CompiledQuiz:
+    """An answer key in array form."""
+
+    __slots__ = ("key", "weights", "total_weight", "passing_score")
+
+    def __init__(self, questions: Sequence[dict], passing_score: float) -> None:
+        if not questions:
+            raise ValidationError("Quiz has no questions")
+        option_count = max(len(q.get("options") or []) for q in questions)
+        self.key = np.zeros((len(questions), option_count + 1), dtype=bool)
+        for i, question in enumerate(questions):
+            options = len(question.get("options") or [])
+            correct = _as_indexes(question.get("correct_answer"))
+            if not correct or any(not 0 <= c < options for c in correct):
+                raise ValidationError(f"Question {i + 1} has an invalid correct_answer")
+            self.key[i, correct] = True
+        self.weights = np.array(
+            [float(q.get("points", 1)) for q in questions], dtype=np.float64
+        )
+        if (self.weights < 0).any() or self.weights.sum() <= 0:
+            raise ValidationError("Question points must be non-negative and not all zero")
+        self.total_weight = float(self.weights.sum())
+        self.passing_score = passing_score
+
+    @property
+    def question_count(self) -> int:
+        return self.key.shape[0]
+
+    def encode(self, submissions: Sequence[Sequence[Any]]) -> np.ndarray:
+        """Turn submissions into the (attempts, questions, options + 1) selection tensor."""
+        questions, width = self.key.shape
+        invalid = width - 1
+        selected = np.zeros((len(submissions), questions, width), dtype=bool)
+        attempt_idx: List[int] = []
+        question_idx: List[int] = []
+        option_idx: List[int] = []
+        for a, answers in enumerate(submissions):
+            if len(answers) != questions:
+                raise ValidationError(f"Expected {questions} answers, got {len(answers)}")
+            for q, answer in enumerate(answers):
+                for option in _as_indexes(answer):
+                    attempt_idx.append(a)
+                    question_idx.append(q)
+                    option_idx.append(option if 0 <= option < invalid else invalid)
+        if attempt_idx:
+            selected[attempt_idx, question_idx, option_idx] = True
+        return selected
+
+    def grade(
+        self,
+        submissions: Sequence[Sequence[Any]]
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Grade a batch. Returns (score, correct_count, passed) arrays."""
+        if not submissions:
+            empty = np.zeros(0)
+            return empty, empty.astype(np.int64), empty.astype(bool)
+        correct = (self.encode(submissions) == self.key).all(axis=2)
+        scores = (correct @ self.weights) / self.total_weight
+        # Guard against float noise pushing a perfect score past 1.0
+        scores = np.clip(np.round(scores, 6), 0.0, 1.0)
+        return scores, correct.sum(axis=1), scores >= self.passing_score
+
+
+_compiled: "OrderedDict[UUID, Tuple[datetime, CompiledQuiz]]" = OrderedDict()
+
+
+def compile_quiz(quiz) -> CompiledQuiz:
+    """Return the compiled answer key of a LessonQuiz.
+
+    Keys are cached per process and recompiled when the quiz's `updated_at`
+    changes, so an edited answer key is picked up on the next submission.
+    """
+    cached = _compiled.get(quiz.id)
+    if cached is not None and cached[0] == quiz.updated_at:
+        _compiled.move_to_end(quiz.id)
+        record_cache("quiz_key", "local", True)
+        return cached[1]
+    record_cache("quiz_key", "local", False)
+
+    compiled = CompiledQuiz(quiz.questions, quiz.passing_score)
+    _compiled[quiz.id] = (quiz.updated_at, compiled)
+    _compiled.move_to_end(quiz.id)
+    while len(_compiled) > COMPILED_CACHE_SIZE:
+        _compiled.popitem(last=False)
+    return compiled
+
+
+def forget_quiz(quiz_id: UUID) -> None:
+    """Drop a quiz's compiled key from this process's cache."""
+    _compiled.pop(quiz_id, None)
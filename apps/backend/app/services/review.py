@@ -9,12 +9,15 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import joinedload
 
 from app.core.exception_handlers import NotFoundException, ValidationError, PermissionError
+from app.core.tracing import trace_service
+from app.db.routing import replica_reads
 from app.models.review import CourseReview, ReviewStatus
 from app.models.enrollment import CourseEnrollment
 from app.models.user import User, UserRole
 from app.schemas.review import ReviewCreate, ReviewUpdate, ReviewStats
 
 
+@trace_service
 class ReviewService:
     """Service for managing course reviews."""
     
@@ -184,6 +187,7 @@ class ReviewService:
         return result.scalar_one_or_none()
     
     @staticmethod
+    @replica_reads
     async def get_review_stats(
         db: AsyncSession,
         course_id: UUID
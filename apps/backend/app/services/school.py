@@ -8,12 +8,14 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import joinedload
 
 from app.core.exception_handlers import NotFoundException, ValidationError, PermissionError
+from app.core.tracing import trace_service
 from app.models.school import School
 from app.models.user import User, UserRole
 from app.schemas.school import SchoolCreate, SchoolUpdate
-from app.security.authentication import get_password_hash
+from app.security.password import get_password_hash_async
 
 
+@trace_service
 class SchoolService:
     """Service for managing schools and school memberships."""
     
@@ -88,7 +90,7 @@ class SchoolService:
         admin_data = school_data.admin.model_dump()
         admin = User(
             email=admin_data["email"],
-            hashed_password=get_password_hash(admin_data["password"]),
+            password=await get_password_hash_async(admin_data["password"]),
             first_name=admin_data["first_name"],
             last_name=admin_data["last_name"],
             role=UserRole.SCHOOL_ADMIN,
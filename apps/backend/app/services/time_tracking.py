@@ -0,0 +1,200 @@
+"""Buffered accumulation of time spent on lessons.
+
+Players report small time deltas many times a minute. Instead of rewriting a
+progress row for every delta, deltas are summed per (enrollment, lesson) in a
+Redis hash with HINCRBY and a background flusher periodically drains the hash
+into `user_progress` and `lesson_progress` with one batched
+`UPDATE ... FROM (VALUES ...)` per table.
+
+Draining is crash-safe. The pending hash is atomically RENAMEd to a
+per-batch draining key, so new deltas land in a fresh hash while the batch is
+applied. The batch ID is written to `time_spent_flushes` in the same
+transaction as the updates, and the draining key is deleted only after
+commit. A draining key left behind by a crash is picked up by the next flush;
+if its batch ID is already in the ledger it is dropped, otherwise it is
+applied.
+
+Without Redis the deltas are kept in process memory. That fallback is
+best-effort: deltas buffered since the last flush are lost if the process dies.
+"""
+
+import asyncio
+import logging
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, Tuple
+from uuid import UUID, uuid4
+
+from sqlalchemy import Integer, and_, column, delete, or_, update, values
+from sqlalchemy.dialects.postgresql import UUID as PgUUID, insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.background import PeriodicTask
+from app.core.config import settings
+from app.core.redis import get_redis
+from app.db.session import AsyncSessionLocal
+from app.models.enrollment import CourseEnrollment
+from app.models.progress import LessonProgress, TimeSpentFlush, UserProgress
+
+logger = logging.getLogger(__name__)
+
+PENDING_KEY = f"{settings.CACHE_KEY_PREFIX}time_spent:pending"
+DRAINING_KEY_PREFIX = f"{settings.CACHE_KEY_PREFIX}time_spent:draining:"
+LEDGER_RETENTION = timedelta(days=7)
+
+Deltas = Dict[Tuple[UUID, UUID], int]
+
+
+class TimeSpentAccumulator:
+    """Buffers time-spent deltas and flushes them to Postgres in batches."""
+
+    def __init__(self) -> None:
+        self._local: Deltas = defaultdict(int)
+        self._lock = asyncio.Lock()
+
+    async def add(self, enrollment_id: UUID, lesson_id: UUID, seconds: int) -> None:
+        """Record `seconds` spent by an enrollment on a lesson."""
+        if seconds <= 0:
+            return
+        redis = await get_redis()
+        if redis is not None:
+            await redis.hincrby(PENDING_KEY, f"{enrollment_id}:{lesson_id}", seconds)
+            return
+        async with self._lock:
+            self._local[(enrollment_id, lesson_id)] += seconds
+
+    async def flush(self) -> int:
+        """Drain buffered deltas into the database. Returns rows applied."""
+        redis = await get_redis()
+        if redis is None:
+            return await self._flush_local()
+
+        applied = 0
+        # Batches orphaned by a crash mid-flush are finished first
+        async for key in redis.scan_iter(match=f"{DRAINING_KEY_PREFIX}*"):
+            applied += await self._flush_draining_key(redis, key)
+
+        batch_key = f"{DRAINING_KEY_PREFIX}{uuid4()}"
+        try:
+            await redis.rename(PENDING_KEY, batch_key)
+        except Exception:
+            # Nothing buffered since the last flush
+            return applied
+        applied += await self._flush_draining_key(redis, batch_key)
+        return applied
+
+    async def _flush_draining_key(self, redis, key: str) -> int:
+        """Apply one drained batch exactly once, then drop it from Redis."""
+        batch_id = UUID(key[len(DRAINING_KEY_PREFIX):])
+        raw = await redis.hgetall(key)
+        deltas: Deltas = {}
+        for field, value in raw.items():
+            enrollment_id, lesson_id = field.split(":", 1)
+            deltas[(UUID(enrollment_id), UUID(lesson_id))] = int(value)
+
+        applied = 0
+        if deltas:
+            async with AsyncSessionLocal() as session:
+                applied = await self.apply_batch(session, batch_id, deltas)
+                await session.commit()
+        await redis.delete(key)
+        return applied
+
+    async def _flush_local(self) -> int:
+        """Drain the in-process buffer."""
+        async with self._lock:
+            deltas, self._local = self._local, defaultdict(int)
+        if not deltas:
+            return 0
+        try:
+            async with AsyncSessionLocal() as session:
+                applied = await self.apply_batch(session, uuid4(), deltas)
+                await session.commit()
+            return applied
+        except Exception:
+            # Put the deltas back so the next flush retries them
+            async with self._lock:
+                for key, seconds in deltas.items():
+                    self._local[key] += seconds
+            raise
+
+    @staticmethod
+    async def apply_batch(
+        db: AsyncSession,
+        batch_id: UUID,
+        deltas: Deltas
+    ) -> int:
+        """Add a batch of deltas to the progress tables.
+
+        Returns 0 without touching progress rows if the batch was already
+        applied. Rows that do not exist yet are skipped; the progress row is
+        created when the learner starts the lesson.
+        """
+        claimed = await db.execute(
+            pg_insert(TimeSpentFlush)
+            .values(id=batch_id, row_count=len(deltas))
+            .on_conflict_do_nothing(index_elements=[TimeSpentFlush.id])
+            .returning(TimeSpentFlush.id)
+        )
+        if claimed.scalar_one_or_none() is None:
+            return 0
+
+        now = datetime.utcnow()
+        batch = values(
+            column("enrollment_id", PgUUID(as_uuid=True)),
+            column("lesson_id", PgUUID(as_uuid=True)),
+            column("delta", Integer),
+            name="time_deltas",
+        ).data([
+            (enrollment_id, lesson_id, seconds)
+            for (enrollment_id, lesson_id), seconds in deltas.items()
+        ])
+
+        await db.execute(
+            update(UserProgress)
+            .where(
+                UserProgress.enrollment_id == batch.c.enrollment_id,
+                UserProgress.content_type == "lesson",
+                UserProgress.content_id == batch.c.lesson_id
+            )
+            .values(
+                time_spent_seconds=UserProgress.time_spent_seconds + batch.c.delta,
+                last_interaction=now
+            )
+            .execution_options(synchronize_session=False)
+        )
+        await db.execute(
+            update(LessonProgress)
+            .where(
+                CourseEnrollment.id == batch.c.enrollment_id,
+                LessonProgress.lesson_id == batch.c.lesson_id,
+                or_(
+                    and_(
+                        CourseEnrollment.student_id.is_not(None),
+                        LessonProgress.student_id == CourseEnrollment.student_id
+                    ),
+                    and_(
+                        CourseEnrollment.individual_user_id.is_not(None),
+                        LessonProgress.individual_user_id == CourseEnrollment.individual_user_id
+                    )
+                )
+            )
+            .values(
+                time_spent_seconds=LessonProgress.time_spent_seconds + batch.c.delta,
+                last_interaction=now
+            )
+            .execution_options(synchronize_session=False)
+        )
+        await db.execute(
+            delete(TimeSpentFlush).where(TimeSpentFlush.created_at < now - LEDGER_RETENTION)
+        )
+        return len(deltas)
+
+
+time_spent_accumulator = TimeSpentAccumulator()
+time_spent_flusher = PeriodicTask(
+    "time-spent-flush",
+    time_spent_accumulator.flush,
+    settings.TIME_SPENT_FLUSH_INTERVAL_SECONDS,
+    run_on_stop=True
+)
@@ -8,12 +8,15 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import joinedload
 
 from app.core.exception_handlers import NotFoundException, ValidationError, PermissionError
+from app.core.tracing import trace_service
 from app.models.user import User, UserRole
 from app.models.school import School
-from app.security.password import get_password_hash
+from app.security.password import get_password_hash_async
+from app.security.principal import principal_cache
 from app.schemas.user import UserCreate, UserUpdate
 
 
+@trace_service
 class UserService:
     """Service for managing users."""
     
@@ -28,7 +31,7 @@ class UserService:
         
         if with_school:
             query = query.options(
-                joinedload(User.schools)
+                joinedload(User.school)
             )
             
         result = await db.execute(query)
@@ -88,7 +91,7 @@ class UserService:
         user_dict = user_data.model_dump(exclude={"password"})
         user = User(
             **user_dict,
-            hashed_password=get_password_hash(user_data.password) if user_data.password else None,
+            password=await get_password_hash_async(user_data.password) if user_data.password else None,
             is_active=True,
             school_id=school_id
         )
@@ -142,12 +145,13 @@ class UserService:
         
         # Handle password update
         if "password" in update_data and update_data["password"]:
-            user.hashed_password = get_password_hash(update_data.pop("password"))
+            user.password = await get_password_hash_async(update_data.pop("password"))
             
         # Update other fields
         for field, value in update_data.items():
             setattr(user, field, value)
-            
+
+        await principal_cache.invalidate_on_commit(db, user.id)
         return user
     
     @staticmethod
@@ -191,7 +195,8 @@ class UserService:
             
         # Soft delete
         user.is_active = False
-        
+
+        await principal_cache.invalidate_on_commit(db, user.id)
         return True
     
     @staticmethod
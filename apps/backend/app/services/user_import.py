@@ -0,0 +1,241 @@
+"""Bulk user import for school onboarding.
+
+An import file (CSV with a header row, or NDJSON with one object per line)
+is validated row by row; bad rows are reported and skipped rather than
+failing the whole file. Existing emails are found with one set query per
+chunk, passwords are hashed across the shared process pool, and users and
+their student/teacher profiles are written with multi-row INSERTs.
+
+Rows are numbered from 1 in file order, not counting the CSV header.
+"""
+
+import asyncio
+import csv
+import io
+import json
+from datetime import date
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from uuid import UUID, uuid4
+
+from pydantic import ValidationError as PydanticValidationError
+from sqlalchemy import func, insert, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.exceptions import NotFoundException, PermissionError, ValidationError
+from app.core.process_pool import run_in_process
+from app.core.tracing import trace_service
+from app.models.school import School
+from app.models.user import StudentProfile, TeacherProfile, User, UserRole
+from app.schemas.user import UserImportResult, UserImportRow, UserImportRowError
+from app.security.password import current_bcrypt_rounds
+from app.utils.password_batch import hash_passwords
+
+IMPORTABLE_ROLES = {UserRole.STUDENT, UserRole.TEACHER, UserRole.SCHOOL_ADMIN}
+# Bound query parameters stay well below Postgres' 32767 limit
+EMAIL_LOOKUP_CHUNK = 5000
+
+
+def parse_import_file(content: bytes, file_format: str) -> List[Dict[str, Any]]:
+    """Split an import file into raw row dicts. `file_format` is csv or ndjson."""
+    text = content.decode("utf-8-sig")
+    if file_format == "csv":
+        return [dict(row) for row in csv.DictReader(io.StringIO(text))]
+    if file_format == "ndjson":
+        rows = []
+        for line_number, line in enumerate(text.splitlines(), start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValidationError(f"Line {line_number} is not valid JSON: {e.msg}")
+            if not isinstance(row, dict):
+                raise ValidationError(f"Line {line_number} is not a JSON object")
+            rows.append(row)
+        return rows
+    raise ValidationError("Import format must be csv or ndjson")
+
+
+def _chunks(items: List[Any], size: int) -> Iterator[List[Any]]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _first_error(error: PydanticValidationError) -> str:
+    detail = error.errors()[0]
+    location = ".".join(str(part) for part in detail.get("loc", ()))
+    message = detail.get("msg", "invalid value")
+    return f"{location}: {message}" if location else message
+
+
+@trace_service
+class UserImportService:
+    """Service for importing users in bulk."""
+
+    @staticmethod
+    async def import_users(
+        db: AsyncSession,
+        current_user: User,
+        school_id: Optional[UUID],
+        raw_rows: List[Dict[str, Any]],
+        dry_run: bool = False
+    ) -> UserImportResult:
+        """Import users into a school on behalf of an admin.
+
+        School admins import into their own school and cannot create other
+        school admins; super admins must name the school.
+        """
+        if current_user.role == UserRole.SUPER_ADMIN:
+            if school_id is None:
+                raise ValidationError("school_id is required")
+            allowed_roles = IMPORTABLE_ROLES
+        elif current_user.role == UserRole.SCHOOL_ADMIN:
+            if school_id is not None and school_id != current_user.school_id:
+                raise PermissionError("Cannot import users into other schools")
+            school_id = current_user.school_id
+            allowed_roles = IMPORTABLE_ROLES - {UserRole.SCHOOL_ADMIN}
+        else:
+            raise PermissionError("Only admins can import users")
+
+        return await UserImportService.import_rows(
+            db, school_id, raw_rows, allowed_roles=allowed_roles, dry_run=dry_run
+        )
+
+    @staticmethod
+    async def import_rows(
+        db: AsyncSession,
+        school_id: UUID,
+        raw_rows: List[Dict[str, Any]],
+        allowed_roles=IMPORTABLE_ROLES,
+        dry_run: bool = False
+    ) -> UserImportResult:
+        """Validate and insert rows into `school_id` without permission checks.
+
+        Nothing is committed; the caller owns the transaction.
+        """
+        if len(raw_rows) > settings.USER_IMPORT_MAX_ROWS:
+            raise ValidationError(
+                f"Import files are limited to {settings.USER_IMPORT_MAX_ROWS} rows"
+            )
+        school = await db.get(School, school_id)
+        if not school or not school.is_active:
+            raise NotFoundException("School not found")
+
+        errors: List[UserImportRowError] = []
+        valid: List[Tuple[int, UserImportRow]] = []
+        seen = set()
+        for number, raw in enumerate(raw_rows, start=1):
+            email = raw.get("email") if isinstance(raw.get("email"), str) else None
+            try:
+                row = UserImportRow.model_validate(raw)
+            except PydanticValidationError as e:
+                errors.append(UserImportRowError(row=number, email=email, error=_first_error(e)))
+                continue
+            if row.role not in allowed_roles:
+                errors.append(UserImportRowError(
+                    row=number, email=row.email, error=f"Cannot import users with role {row.role.value}"
+                ))
+            elif row.email.lower() in seen:
+                errors.append(UserImportRowError(
+                    row=number, email=row.email, error="Email appears earlier in the file"
+                ))
+            else:
+                # Stored as given; compared case-insensitively, like the check below
+                seen.add(row.email.lower())
+                valid.append((number, row))
+
+        existing = set()
+        for emails in _chunks(sorted(seen), EMAIL_LOOKUP_CHUNK):
+            existing.update(
+                (await db.scalars(select(func.lower(User.email)).where(func.lower(User.email).in_(emails)))).all()
+            )
+        if existing:
+            errors.extend(
+                UserImportRowError(row=number, email=row.email, error="Email already registered")
+                for number, row in valid if row.email.lower() in existing
+            )
+            valid = [(number, row) for number, row in valid if row.email.lower() not in existing]
+
+        if dry_run or not valid:
+            errors.sort(key=lambda e: e.row)
+            return UserImportResult(total=len(raw_rows), created=0, dry_run=dry_run, errors=errors)
+
+        hashes = await UserImportService._hash_passwords([row.password for _, row in valid])
+
+        created = 0
+        today = date.today()
+        for batch in _chunks(list(zip(valid, hashes)), settings.USER_IMPORT_BATCH_SIZE):
+            users = [
+                {
+                    "id": uuid4(),
+                    "email": row.email,
+                    "password": password_hash,
+                    "first_name": row.first_name,
+                    "last_name": row.last_name,
+                    "role": row.role.value,
+                    "school_id": school_id,
+                    "is_active": True,
+                    "is_deleted": False,
+                }
+                for (_, row), password_hash in batch
+            ]
+            # A concurrent signup can take an email after the lookup above
+            inserted = set((await db.scalars(
+                pg_insert(User)
+                .values(users)
+                .on_conflict_do_nothing(index_elements=[User.email])
+                .returning(User.id)
+            )).all())
+
+            students, teachers = [], []
+            for ((number, row), _), user in zip(batch, users):
+                if user["id"] not in inserted:
+                    errors.append(UserImportRowError(
+                        row=number, email=row.email, error="Email already registered"
+                    ))
+                    continue
+                created += 1
+                if row.role == UserRole.STUDENT:
+                    students.append({
+                        "id": uuid4(),
+                        "user_id": user["id"],
+                        "school_id": school_id,
+                        "enrollment_number": row.enrollment_number,
+                        "grade_level": row.grade_level,
+                        "section": row.section,
+                        "admission_date": row.admission_date or today,
+                        "is_active": True,
+                        "is_deleted": False,
+                    })
+                elif row.role == UserRole.TEACHER:
+                    teachers.append({
+                        "id": uuid4(),
+                        "user_id": user["id"],
+                        "school_id": school_id,
+                        "employee_id": row.employee_id,
+                        "department": row.department,
+                        "joining_date": row.joining_date or today,
+                        "is_active": True,
+                        "is_deleted": False,
+                    })
+            if students:
+                await db.execute(insert(StudentProfile).values(students))
+            if teachers:
+                await db.execute(insert(TeacherProfile).values(teachers))
+
+        errors.sort(key=lambda e: e.row)
+        return UserImportResult(total=len(raw_rows), created=created, errors=errors)
+
+    @staticmethod
+    async def _hash_passwords(passwords: List[str]) -> List[str]:
+        """Hash passwords across the process pool, preserving order."""
+        rounds = current_bcrypt_rounds()
+        # A few chunks per worker keeps every worker busy to the end
+        chunk_size = max(1, -(-len(passwords) // (settings.PROCESS_POOL_MAX_WORKERS * 4)))
+        results = await asyncio.gather(*(
+            run_in_process(hash_passwords, chunk, rounds)
+            for chunk in _chunks(passwords, chunk_size)
+        ))
+        return [password_hash for chunk in results for password_hash in chunk]
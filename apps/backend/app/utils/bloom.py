@@ -0,0 +1,54 @@
+"""A small Bloom filter.
+
+Answers "definitely absent" or "possibly present" for string keys. Sized from
+the expected number of keys and the target false-positive rate; bit
+positions come from one BLAKE2b digest split into two 64-bit halves and
+combined by double hashing (Kirsch–Mitzenmacher).
+"""
+
+import hashlib
+import math
+from typing import Iterable
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings."""
+
+    __slots__ = ("capacity", "size", "hash_count", "count", "_bits")
+
+    def __init__(self, capacity: int, error_rate: float = 0.001) -> None:
+        if capacity < 1:
+            capacity = 1
+        if not 0 < error_rate < 1:
+            raise ValueError("error_rate must be between 0 and 1")
+        self.capacity = capacity
+        # Optimal bit count and hash count for `capacity` keys at `error_rate`
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.count = 0
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.hash_count):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, key: str) -> None:
+        for position in self._positions(key):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def update(self, keys: Iterable[str]) -> None:
+        for key in keys:
+            self.add(key)
+
+    @property
+    def is_full(self) -> bool:
+        """Whether more keys were added than the filter was sized for."""
+        return self.count > self.capacity
+
+    def __contains__(self, key: str) -> bool:
+        bits = self._bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
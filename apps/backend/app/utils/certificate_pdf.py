@@ -0,0 +1,103 @@
+"""Certificate rendering.
+
+Runs inside process pool workers, so this module deliberately imports nothing
+from the application beyond the standard library. The PDF is written by hand:
+a single landscape A4 page using the standard Helvetica fonts, which every PDF
+viewer provides, so no rendering library is needed.
+"""
+
+import os
+from typing import List, Optional, Sequence, Tuple
+
+PAGE_WIDTH = 842
+PAGE_HEIGHT = 595
+
+# (certificate_id, student_name, course_title, completed_on)
+CertificateItem = Tuple[str, str, str, str]
+
+
+def _escape(text: str) -> str:
+    """Escape a string for use in a PDF literal string."""
+    text = text.encode("latin-1", "replace").decode("latin-1")
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def _centered_text(font: str, size: int, y: int, text: str) -> str:
+    """A line of text centred on the page.
+
+    Helvetica averages about half an em per character, which is close enough
+    to centre a line without shipping font metrics.
+    """
+    x = max(36, int((PAGE_WIDTH - len(text) * size * 0.5) / 2))
+    return f"BT /{font} {size} Tf {x} {y} Td ({_escape(text)}) Tj ET"
+
+
+def render_certificate_pdf(
+    certificate_id: str,
+    student_name: str,
+    course_title: str,
+    completed_on: str
+) -> bytes:
+    """Render a one-page certificate of completion."""
+    content = "\n".join([
+        "2 w 30 30 782 535 re S",
+        "0.5 w 40 40 762 515 re S",
+        _centered_text("F2", 36, 440, "Certificate of Completion"),
+        _centered_text("F1", 16, 380, "This certifies that"),
+        _centered_text("F2", 28, 330, student_name),
+        _centered_text("F1", 16, 280, "has successfully completed"),
+        _centered_text("F2", 22, 235, course_title),
+        _centered_text("F1", 14, 170, f"Completed on {completed_on}"),
+        _centered_text("F1", 10, 70, f"Certificate ID: {certificate_id}"),
+    ]).encode("latin-1")
+
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        (
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {PAGE_WIDTH} {PAGE_HEIGHT}] "
+            f"/Resources << /Font << /F1 5 0 R /F2 6 0 R >> >> /Contents 4 0 R >>"
+        ).encode("latin-1"),
+        b"<< /Length %d >>\nstream\n" % len(content) + content + b"\nendstream",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold >>",
+    ]
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        out += b"%010d 00000 n \n" % offset
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+def render_certificates(
+    directory: str,
+    items: Sequence[CertificateItem]
+) -> List[Tuple[str, Optional[str]]]:
+    """Render a batch of certificates into `directory`.
+
+    Each file is written to a temporary name and renamed into place, so a
+    half-written certificate is never served. Returns (certificate_id, error)
+    per item; error is None on success. One failing item does not stop the
+    rest of the batch.
+    """
+    os.makedirs(directory, exist_ok=True)
+    results: List[Tuple[str, Optional[str]]] = []
+    for certificate_id, student_name, course_title, completed_on in items:
+        path = os.path.join(directory, f"{certificate_id}.pdf")
+        try:
+            pdf = render_certificate_pdf(certificate_id, student_name, course_title, completed_on)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(pdf)
+            os.replace(tmp_path, path)
+            results.append((certificate_id, None))
+        except Exception as e:
+            results.append((certificate_id, str(e) or e.__class__.__name__))
+    return results
@@ -0,0 +1,16 @@
+"""Batch password hashing.
+
+Runs inside process pool workers, so this module deliberately imports nothing
+from the application. Bulk imports hash here rather than in the login hashing
+thread pool, so onboarding a school cannot starve interactive logins.
+"""
+
+from typing import List, Sequence
+
+from passlib.hash import bcrypt
+
+
+def hash_passwords(passwords: Sequence[str], rounds: int) -> List[str]:
+    """bcrypt-hash each password at cost `rounds`, preserving order."""
+    hasher = bcrypt.using(rounds=rounds)
+    return [hasher.hash(password) for password in passwords]